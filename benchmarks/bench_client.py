@@ -0,0 +1,217 @@
+"""
+Benchmark the client against a local fake Odoo server.
+
+Starts ``benchmarks/fake_server.py`` in a child process and measures
+``authenticate``, ``execute_kw``, ``search_read`` of 10 to 100,000 rows and
+the ``get_pos_orders`` fan-out over 50 POS configurations. Every benchmark
+reports its throughput, p50 and p99 latency and the client's peak memory.
+
+Results can be saved as a baseline and later runs compared against it: a
+benchmark whose throughput, p50 latency or peak memory is worse than the
+baseline by more than the tolerance is reported as a regression and the
+script exits with status 1. Timings are only comparable on the same
+machine, so baselines are stored per runner (the host name unless
+``--runner`` names it) and options, and the comparison is skipped when the
+runner has no baseline yet. The baseline file is not versioned.
+
+Usage:
+    python benchmarks/bench_client.py [--latency 0.001] [--protocol xmlrpc]
+        [--rows 10,1000,10000,100000] [--quick] [--runner NAME]
+        [--save-baseline | --compare] [--baseline benchmarks/baseline.json]
+"""
+
+import argparse
+import gc
+import json
+import os
+import platform
+import sys
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from dgt_rpc import DgtPOSClient
+from dgt_rpc.recording import percentile
+from fake_server import ServerProcess
+
+DEFAULT_BASELINE = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'baseline.json')
+
+# Measures compared with the baseline, and whether higher values are better
+COMPARED = {'throughput': True, 'p50': False, 'peak_memory': False}
+
+
+def measure(func, iterations, warmup=1):
+    """
+    Time func over iterations and trace its peak memory on one extra run.
+
+    Returns:
+        dict: throughput in calls per second, p50 and p99 in seconds, peak_memory in bytes
+    """
+    for _ in range(warmup):
+        func()
+    gc.collect()
+    latencies = []
+    start = time.perf_counter()
+    for _ in range(iterations):
+        call_start = time.perf_counter()
+        func()
+        latencies.append(time.perf_counter() - call_start)
+    elapsed = time.perf_counter() - start
+
+    # Traced separately, tracing slows allocations down
+    gc.collect()
+    tracemalloc.start()
+    try:
+        func()
+        peak = tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+    return {
+        'iterations': iterations,
+        'throughput': iterations / elapsed,
+        'p50': percentile(latencies, 0.50),
+        'p99': percentile(latencies, 0.99),
+        'peak_memory': peak,
+    }
+
+
+def make_client(url, protocol):
+    return DgtPOSClient(url, 'bench', api_key='key', protocol=protocol)
+
+
+def run_benchmarks(url, options):
+    """Run every benchmark against the server at url and return their results by name."""
+    results = {}
+    scale = 0.2 if options.quick else 1.0
+
+    def iterations(count):
+        return max(3, int(count * scale))
+
+    client = make_client(url, options.protocol)
+    try:
+        def authenticate():
+            client.uid_cache.clear()
+            client.authenticate()
+
+        results['authenticate'] = measure(authenticate, iterations(500))
+        results['execute_kw'] = measure(
+            lambda: client.execute_kw('res.partner', 'search', [[]], {'limit': 10}), iterations(1000)
+        )
+        for rows in options.rows:
+            # Keep each search_read benchmark to a similar volume of rows
+            count = iterations(min(500, max(1, 50000 // rows)))
+            results[f'search_read_{rows}'] = measure(
+                lambda: client.search_read('pos.order', [], fields=None, limit=rows), count
+            )
+
+        pos_configs = client.get_pos_data('bench')
+
+        def fan_out():
+            for result in client.get_pos_orders_many(pos_configs, 'bench', limit=50, max_workers=8):
+                if result.error:
+                    raise result.error
+
+        results['get_pos_orders_fanout'] = measure(fan_out, iterations(50))
+    finally:
+        client.close()
+    return results
+
+
+def compare(results, baseline, tolerance):
+    """
+    Compare results with a baseline.
+
+    Returns:
+        list: Descriptions of the regressions
+    """
+    regressions = []
+    for name, result in results.items():
+        reference = baseline.get(name)
+        if reference is None:
+            continue
+        for measure_name, higher_is_better in COMPARED.items():
+            new, old = result[measure_name], reference[measure_name]
+            if not old:
+                continue
+            change = (old - new) / old if higher_is_better else (new - old) / old
+            if change > tolerance:
+                regressions.append(f"{name}: {measure_name} {_format(measure_name, old)} -> "
+                                   f"{_format(measure_name, new)} ({change:+.0%} worse)")
+    return regressions
+
+
+def _format(measure_name, value):
+    if measure_name == 'throughput':
+        return f"{value:,.1f}/s"
+    if measure_name == 'peak_memory':
+        return f"{value / 1e6:,.2f} MB"
+    return f"{value * 1000:,.2f} ms"
+
+
+def print_results(results, baseline):
+    print(f"{'benchmark':<26} {'calls/s':>10} {'p50 ms':>10} {'p99 ms':>10} {'peak MB':>9}  vs baseline")
+    for name, result in results.items():
+        line = (f"{name:<26} {result['throughput']:>10,.1f} {result['p50'] * 1000:>10.2f} "
+                f"{result['p99'] * 1000:>10.2f} {result['peak_memory'] / 1e6:>9.2f}")
+        reference = baseline.get(name) if baseline else None
+        if reference:
+            line += f"  {result['throughput'] / reference['throughput']:.2f}x throughput"
+        print(line)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[0])
+    parser.add_argument('--latency', type=float, default=0.0, help="seconds the server waits per call")
+    parser.add_argument('--protocol', default='xmlrpc', choices=['xmlrpc', 'jsonrpc'])
+    parser.add_argument('--rows', default='10,1000,10000,100000',
+                        help="comma-separated search_read sizes")
+    parser.add_argument('--quick', action='store_true', help="fewer iterations, rows capped at 10000")
+    parser.add_argument('--baseline', default=DEFAULT_BASELINE, help="baseline file")
+    parser.add_argument('--runner', default=platform.node() or 'local',
+                        help="name of the machine the baseline belongs to, the host name by default")
+    parser.add_argument('--save-baseline', action='store_true', help="store the results as the baseline")
+    parser.add_argument('--compare', action='store_true', help="exit with status 1 on regressions")
+    parser.add_argument('--tolerance', type=float, default=0.25,
+                        help="relative change counted as a regression")
+    options = parser.parse_args()
+    options.rows = [int(rows) for rows in options.rows.split(',')]
+    if options.quick:
+        options.rows = [rows for rows in options.rows if rows <= 10000]
+
+    with ServerProcess(latency=options.latency) as server:
+        results = run_benchmarks(server.url, options)
+
+    key = f"{options.runner}: {options.protocol}, latency {options.latency}{', quick' if options.quick else ''}"
+    baselines = {}
+    if os.path.exists(options.baseline):
+        with open(options.baseline, encoding='utf-8') as f:
+            baselines = json.load(f)
+    baseline = baselines.get(key)
+
+    print(f"{options.protocol}, server latency {options.latency * 1000:.1f} ms")
+    print_results(results, baseline)
+
+    if options.save_baseline:
+        baselines[key] = results
+        with open(options.baseline, 'w', encoding='utf-8') as f:
+            json.dump(baselines, f, indent=2, sort_keys=True)
+            f.write('\n')
+        print(f"Baseline saved to {options.baseline}")
+    elif options.compare:
+        if baseline is None:
+            print(f"\nNo baseline for {key!r} in {options.baseline}, comparison skipped; "
+                  f"record one with --save-baseline")
+            return
+        regressions = compare(results, baseline, options.tolerance)
+        if regressions:
+            print("\nRegressions:")
+            for regression in regressions:
+                print(f"  {regression}")
+            raise SystemExit(1)
+        print("\nNo regression")
+
+
+if __name__ == '__main__':
+    main()
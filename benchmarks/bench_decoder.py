@@ -0,0 +1,96 @@
+"""
+Benchmark the XML-RPC response decoders.
+
+Encodes a search_read-like result and decodes it with the stock
+``xmlrpc.client`` unmarshaller (fed 1 KiB at a time, as the stock transport
+does, and 64 KiB at a time) and with ``dgt_rpc.decoder``.
+
+Usage:
+    python benchmarks/bench_decoder.py [--rows 20000] [--repeat 5]
+"""
+
+import argparse
+import os
+import sys
+import time
+import tracemalloc
+import xmlrpc.client
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from dgt_rpc import decoder
+
+
+def make_response(rows):
+    """Build an XML-RPC response shaped like a pos.order search_read."""
+    records = [
+        {
+            'id': i,
+            'name': f'Shop/{i:06d}',
+            'date_order': '2024-03-01 10:15:00',
+            'amount_total': i * 1.25,
+            'amount_tax': i * 0.15,
+            'state': 'paid',
+            'config_id': [i % 40 + 1, f'POS {i % 40 + 1}'],
+            'partner_id': False,
+            'lines': [i * 3, i * 3 + 1, i * 3 + 2],
+            'note': None,
+        }
+        for i in range(rows)
+    ]
+    return xmlrpc.client.dumps((records,), methodresponse=True, allow_none=True).encode('utf-8')
+
+
+def decode(getparser, payload, chunk_size):
+    parser, target = getparser()
+    for start in range(0, len(payload), chunk_size):
+        parser.feed(payload[start:start + chunk_size])
+    parser.close()
+    return target.close()
+
+
+def peak_memory(func, *args):
+    """Peak traced memory while decoding, in bytes."""
+    tracemalloc.start()
+    try:
+        func(*args)
+        return tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[0])
+    parser.add_argument('--rows', type=int, default=20000)
+    parser.add_argument('--repeat', type=int, default=10)
+    options = parser.parse_args()
+
+    payload = make_response(options.rows)
+    expected = decode(xmlrpc.client.getparser, payload, 1024)
+    if decode(decoder.getparser, payload, 65536) != expected:
+        raise SystemExit("dgt_rpc.decoder output differs from xmlrpc.client")
+
+    cases = [
+        ('xmlrpc.client, 1 KiB feeds', xmlrpc.client.getparser, 1024),
+        ('xmlrpc.client, 64 KiB feeds', xmlrpc.client.getparser, 65536),
+        ('dgt_rpc.decoder, 64 KiB feeds', decoder.getparser, 65536),
+    ]
+    # Run the cases round-robin so CPU frequency changes hit all of them alike
+    timings = {label: [] for label, _, _ in cases}
+    for _ in range(options.repeat):
+        for label, getparser, chunk_size in cases:
+            start = time.process_time()
+            decode(getparser, payload, chunk_size)
+            timings[label].append(time.process_time() - start)
+
+    print(f"{options.rows} records, {len(payload) / 1e6:.1f} MB of XML, best of {options.repeat}")
+    baseline = min(timings[cases[0][0]])
+    for label, getparser, chunk_size in cases:
+        elapsed = min(timings[label])
+        memory = peak_memory(decode, getparser, payload, chunk_size)
+        print(f"{label:<32} {elapsed * 1000:8.1f} ms  {baseline / elapsed:5.2f}x  "
+              f"peak {memory / 1e6:6.1f} MB")
+
+
+if __name__ == '__main__':
+    main()
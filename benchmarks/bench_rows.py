@@ -0,0 +1,143 @@
+"""
+Compare the row types of read results: dict, slots and tuple.
+
+For each row type, measures the memory held by a result of ``--rows``
+pos.order-like records and the peak while decoding and converting it, the
+time to build it from decoded records, to
+access every field by attribute or key, and to convert it back to
+dictionaries. With ``--server``, also times ``search_read`` end to end
+against ``benchmarks/fake_server.py``.
+
+Usage:
+    python benchmarks/bench_rows.py [--rows 100000] [--repeat 5] [--server]
+"""
+
+import argparse
+import gc
+import os
+import sys
+import time
+import tracemalloc
+import xmlrpc.client
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from dgt_rpc import DgtClient
+from dgt_rpc.decoder import loads
+from dgt_rpc.rows import to_rows
+
+from fake_server import ServerProcess, make_rows
+
+ROW_TYPES = ('dict', 'slots', 'tuple')
+
+
+def make_response(count):
+    """An XML-RPC response holding count records."""
+    return xmlrpc.client.dumps((make_rows(count),), methodresponse=True, allow_none=True).encode('utf-8')
+
+
+def decoded_rows(response):
+    """Records as the fast decoder returns them, with distinct value objects."""
+    return loads(response)[0][0]
+
+
+def best_time(func, repeat):
+    """Best wall time of func over repeat runs."""
+    times = []
+    for _ in range(repeat):
+        gc.collect()
+        start = time.perf_counter()
+        func()
+        times.append(time.perf_counter() - start)
+    return min(times)
+
+
+def traced_memory(build):
+    """Bytes held by the result of build, values included, and peak bytes while building it."""
+    gc.collect()
+    tracemalloc.start()
+    try:
+        result = build()
+        size, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    del result
+    return size, peak
+
+
+def bench_in_memory(count, repeat):
+    results = {}
+    names = list(make_rows(1)[0])
+    response = make_response(count)
+    for row_type in ROW_TYPES:
+        records = decoded_rows(response)
+        rows = to_rows('pos.order', records, row_type)
+
+        def by_attribute():
+            total = 0.0
+            for row in rows:
+                total += row.amount_total
+            return total
+
+        def by_key():
+            for row in rows:
+                for name in names:
+                    row[name]
+
+        if row_type == 'dict':
+            def as_dict():
+                return [dict(row) for row in rows]
+        else:
+            def as_dict():
+                return [row._asdict() for row in rows]
+
+        memory, peak = traced_memory(lambda: to_rows('pos.order', decoded_rows(response), row_type))
+        results[row_type] = {
+            'memory': memory,
+            'peak': peak,
+            'build': best_time(lambda: to_rows('pos.order', records, row_type), repeat),
+            'attribute': best_time(by_attribute, repeat) if row_type != 'dict' else None,
+            'key': best_time(by_key, repeat),
+            'to_dict': best_time(as_dict, repeat),
+        }
+    return results
+
+
+def bench_server(count, repeat):
+    results = {}
+    with ServerProcess() as server:
+        client = DgtClient(server.url, 'bench', api_key='key', fast_decoder=True)
+        try:
+            for row_type in ROW_TYPES:
+                results[row_type] = best_time(
+                    lambda: client.search_read('pos.order', [], fields=None, limit=count, row_type=row_type),
+                    repeat,
+                )
+        finally:
+            client.close()
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[0])
+    parser.add_argument('--rows', type=int, default=100000)
+    parser.add_argument('--repeat', type=int, default=5)
+    parser.add_argument('--server', action='store_true', help="also time search_read against the fake server")
+    options = parser.parse_args()
+
+    results = bench_in_memory(options.rows, options.repeat)
+    print(f"{options.rows} rows of {len(make_rows(1)[0])} fields")
+    print(f"{'row type':<8} {'memory MB':>10} {'peak MB':>8} {'build ms':>9} {'attr ms':>9} {'key ms':>9} {'to dict ms':>11}")
+    for row_type, result in results.items():
+        attribute = f"{result['attribute'] * 1000:>9.1f}" if result['attribute'] is not None else f"{'-':>9}"
+        print(f"{row_type:<8} {result['memory'] / 1e6:>10.1f} {result['peak'] / 1e6:>8.1f} {result['build'] * 1000:>9.1f} {attribute} "
+              f"{result['key'] * 1000:>9.1f} {result['to_dict'] * 1000:>11.1f}")
+
+    if options.server:
+        print(f"\nsearch_read of {options.rows} rows, fast decoder")
+        for row_type, elapsed in bench_server(options.rows, options.repeat).items():
+            print(f"{row_type:<8} {elapsed * 1000:>9.1f} ms")
+
+
+if __name__ == '__main__':
+    main()
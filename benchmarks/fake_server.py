@@ -0,0 +1,159 @@
+"""
+A fake Odoo server for benchmarks.
+
+Serves ``/xmlrpc/2/common``, ``/xmlrpc/2/object`` and ``/jsonrpc`` like the
+test server, with a configurable latency added to every call and generated
+payloads: ``search_read`` returns as many ``pos.order``-like rows as its
+``limit`` asks for, ``get_pos_data`` a list of POS configurations and
+``get_pos_orders`` a page of orders.
+
+The server runs in a child process so its work does not compete with the
+client for the GIL or show up in the client's memory measurements.
+
+Usage:
+    python benchmarks/fake_server.py [--port 8069] [--latency 0.002]
+"""
+
+import argparse
+import multiprocessing
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from dgt_rpc.tests.server import LocalServer
+
+
+def make_rows(count):
+    """Build records shaped like a pos.order search_read."""
+    return [
+        {
+            'id': i,
+            'name': f'Shop/{i:06d}',
+            'date_order': '2024-03-01 10:15:00',
+            'amount_total': i * 1.25,
+            'amount_tax': i * 0.15,
+            'state': 'paid',
+            'config_id': [i % 40 + 1, f'POS {i % 40 + 1}'],
+            'partner_id': False,
+            'lines': [i * 3, i * 3 + 1, i * 3 + 2],
+            'note': None,
+        }
+        for i in range(1, count + 1)
+    ]
+
+
+class FakeOdooServer(LocalServer):
+    """
+    LocalServer answering with generated data after a fixed latency.
+
+    Generated payloads are built once per size, so the server's own cost stays
+    small next to the client's.
+    """
+
+    def __init__(self, latency=0.0, port=0, uid=2):
+        """
+        Initialize the server.
+
+        Args:
+            latency (float, optional): Seconds every call waits before answering
+            port (int, optional): Port to listen on, any free port if 0
+            uid (int, optional): UID returned by authenticate
+        """
+        super().__init__(handler=self._handle, uid=uid, port=port)
+        self.latency = latency
+        self._rows = {}
+        self.register_function(self._authenticate, 'authenticate')
+        self._uid = uid
+
+    def _authenticate(self, db, login, key, ctx=None):
+        self._wait()
+        return self._uid
+
+    def _wait(self):
+        if self.latency:
+            time.sleep(self.latency)
+
+    def _handle(self, model, method, args, kwargs):
+        self._wait()
+        if method == 'search_read':
+            return self._cached_rows(kwargs.get('limit') or 80)
+        if method == 'search':
+            return list(range(1, (kwargs.get('limit') or 80) + 1))
+        if method == 'read':
+            ids = args[0]
+            if not isinstance(ids, list) or not all(isinstance(i, int) for i in ids):
+                raise ValueError(f"read expects [ids], got {args!r}")
+            return make_rows(len(ids))
+        if method == 'get_pos_data':
+            return [
+                {'id': i, 'name': f'POS {i}', 'url': self.url, 'database': f'tenant_{i}'}
+                for i in range(1, 51)
+            ]
+        if method == 'get_pos_orders':
+            limit = args[2] if len(args) > 2 else 10
+            return self._cached_rows(limit)
+        return True
+
+    def _cached_rows(self, count):
+        rows = self._rows.get(count)
+        if rows is None:
+            rows = self._rows[count] = make_rows(count)
+        return rows
+
+    # The records list is not needed for benchmarks and would grow without bound
+    def _execute_kw(self, db, uid, key, model, method, args, kwargs=None):
+        return self.handler(model, method, args, kwargs or {})
+
+
+def _serve(latency, port, ready):
+    server = FakeOdooServer(latency=latency, port=port)
+    ready.put(server.url)
+    server.serve_forever(0.05)
+
+
+class ServerProcess:
+    """Runs a FakeOdooServer in a child process, as a context manager."""
+
+    def __init__(self, latency=0.0, port=0):
+        """
+        Initialize the process.
+
+        Args:
+            latency (float, optional): Seconds every call waits before answering
+            port (int, optional): Port to listen on, any free port if 0
+        """
+        self.latency = latency
+        self.port = port
+        self.process = None
+        self.url = None
+
+    def __enter__(self):
+        ready = multiprocessing.Queue()
+        self.process = multiprocessing.Process(target=_serve, args=(self.latency, self.port, ready), daemon=True)
+        self.process.start()
+        self.url = ready.get(timeout=30)
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.process.terminate()
+        self.process.join()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[0])
+    parser.add_argument('--port', type=int, default=8069)
+    parser.add_argument('--latency', type=float, default=0.0, help="seconds added to every call")
+    options = parser.parse_args()
+
+    server = FakeOdooServer(latency=options.latency, port=options.port)
+    print(f"Serving on {server.url}")
+    try:
+        server.serve_forever(0.05)
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,62 @@
+"""
+Replay a recording of RPC traffic and report latency percentiles.
+
+Recordings are written by ``dgt_rpc.TrafficRecorder``. Without ``--url`` the
+calls are sent to ``benchmarks/fake_server.py`` started in a child process;
+with it, to that server, for example a staging copy of production. Calls
+modifying data are replayed too unless ``--read-only`` is given.
+
+Usage:
+    python benchmarks/replay.py calls.jsonl.gz [--speed 1] [--concurrency 8]
+        [--read-only] [--latency 0.002]
+        [--url https://staging.example.com --db staging --username bot --api-key KEY]
+"""
+
+import argparse
+import os
+import sys
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from dgt_rpc import ConnectionPool, DgtClient, Replayer
+from fake_server import ServerProcess
+
+
+def replay(url, options):
+    pool = ConnectionPool(max_size=max(10, options.concurrency), max_per_host=options.concurrency)
+    client = DgtClient(url, options.db, username=options.username, api_key=options.api_key,
+                       pool=pool, protocol=options.protocol)
+    try:
+        speed = options.speed or None
+        return Replayer(client, speed=speed, concurrency=options.concurrency,
+                        read_only=options.read_only).run(options.recording)
+    finally:
+        client.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[0])
+    parser.add_argument('recording', help="recording file written by TrafficRecorder")
+    parser.add_argument('--speed', type=float, default=1.0,
+                        help="pace relative to the recording, 0 for as fast as possible")
+    parser.add_argument('--concurrency', type=int, default=8, help="maximum calls in flight")
+    parser.add_argument('--read-only', action='store_true', help="skip calls that may modify data")
+    parser.add_argument('--protocol', default='xmlrpc', choices=['xmlrpc', 'jsonrpc'])
+    parser.add_argument('--url', help="target server, the fake server if not given")
+    parser.add_argument('--db', default='bench')
+    parser.add_argument('--username', default='admin')
+    parser.add_argument('--api-key', default=os.environ.get('DGT_API_KEY', 'key'),
+                        help="defaults to the DGT_API_KEY environment variable")
+    parser.add_argument('--latency', type=float, default=0.0, help="seconds the fake server waits per call")
+    options = parser.parse_args()
+
+    if options.url:
+        report = replay(options.url, options)
+    else:
+        with ServerProcess(latency=options.latency) as server:
+            report = replay(server.url, options)
+    print(report)
+
+
+if __name__ == '__main__':
+    main()
@@ -1,3 +1,20 @@
 from .client import DgteraClient as DgtClient
 from .client import DgteraPOSClient as DgtPOSClient
-from .exceptions import DgtException
\ No newline at end of file
+from .exceptions import DgtException, BatchError
+from .pool import ConnectionPool
+from .cache import ResultCache
+from .metadata import FieldsCache
+from .records import RecordSet
+from .auth_cache import MemoryUidCache, FileUidCache
+from .retry import RetryPolicy, CircuitBreaker, CircuitOpenError
+from .singleflight import SingleFlight
+from .loader import ReadLoader, AsyncReadLoader
+from .metrics import Metrics, CallMetrics
+from .interceptors import Interceptor, RateLimiter
+from .recording import TrafficRecorder, Replayer, ReplayReport
+from .sync import IncrementalSync, SyncBatch, CheckpointStore, MemoryCheckpointStore, FileCheckpointStore
+from .mirror import Mirror
+from .columns import Columns
+from .registry import ClientRegistry
+from .async_client import AsyncDgteraClient as AsyncDgtClient
+from .async_client import AsyncDgteraPOSClient as AsyncDgtPOSClient
@@ -0,0 +1,172 @@
+"""
+Server-side aggregation with read_group.
+
+``DgteraClient.aggregate`` asks Odoo's ``read_group`` for totals per group
+instead of reading every record, so only the aggregates cross the wire. This
+module validates the group-by and measure specifications against the
+model's fields and flattens the groups Odoo returns into plain rows:
+
+- a plain group-by field keeps its name; many2one fields give the related
+  ID, and its display name under ``<field>_name``
+- a date group-by such as ``date_order:month`` gives the first day of the
+  period, as the server computed it: ``YYYY-MM-DD`` for date fields and a
+  UTC ``YYYY-MM-DD HH:MM:SS`` for datetime fields
+- each measure keeps its field name, and the number of records of the
+  group is under ``count``
+"""
+
+import logging
+
+from .exceptions import DgtException
+
+logger = logging.getLogger(__name__)
+
+# Aggregate functions read_group accepts
+AGGREGATES = frozenset({'sum', 'avg', 'min', 'max', 'count', 'count_distinct',
+                        'bool_and', 'bool_or', 'array_agg'})
+
+# Granularities of date and datetime group-bys
+GRANULARITIES = ('day', 'week', 'month', 'quarter', 'year')
+
+NUMERIC_TYPES = frozenset({'integer', 'float', 'monetary'})
+
+
+def parse_groupby(described, groupby):
+    """
+    Validate group-by specifications.
+
+    Args:
+        described (dict): The fields_get result of the model
+        groupby (list): Field names, with ``:<granularity>`` for date fields
+
+    Returns:
+        list: ``(spec, field, granularity)`` triples, granularity None for plain fields
+
+    Raises:
+        DgtException: If a field does not exist or a granularity is invalid
+    """
+    if isinstance(groupby, str):
+        groupby = [groupby]
+    parsed = []
+    for spec in groupby:
+        field, _, granularity = spec.partition(':')
+        if field not in described:
+            raise DgtException(f"Invalid group-by field {field!r}")
+        field_type = described[field].get('type')
+        if granularity:
+            if field_type not in ('date', 'datetime'):
+                raise DgtException(f"Granularity on {field!r}, which is not a date field")
+            if granularity not in GRANULARITIES:
+                raise DgtException(f"Invalid granularity {granularity!r}, expected one of {', '.join(GRANULARITIES)}")
+        elif field_type in ('date', 'datetime'):
+            # read_group groups dates by month when no granularity is given
+            granularity = 'month'
+            spec = f'{field}:month'
+        parsed.append((spec, field, granularity or None))
+    return parsed
+
+
+def parse_measures(described, measures):
+    """
+    Validate measure specifications.
+
+    Args:
+        described (dict): The fields_get result of the model
+        measures (list): ``'<field>:<aggregate>'`` strings; a bare field name uses
+            the field's default aggregate, and ``'count'`` counts the records
+
+    Returns:
+        list: ``(field, aggregate)`` pairs, aggregate None for the default;
+            the record count is not included, it is always returned
+
+    Raises:
+        DgtException: If a field does not exist or an aggregate is invalid
+    """
+    if isinstance(measures, str):
+        measures = [measures]
+    parsed = []
+    for spec in measures:
+        if spec in ('count', '__count'):
+            continue
+        field, _, aggregate = spec.partition(':')
+        if field not in described:
+            raise DgtException(f"Invalid measure field {field!r}")
+        if aggregate and aggregate not in AGGREGATES:
+            raise DgtException(f"Invalid aggregate {aggregate!r}, expected one of {', '.join(sorted(AGGREGATES))}")
+        if not aggregate and described[field].get('type') not in NUMERIC_TYPES:
+            raise DgtException(f"Measure {field!r} is not numeric, give its aggregate as '{field}:<aggregate>'")
+        parsed.append((field, aggregate or None))
+    return parsed
+
+
+def period_start(group, spec, field):
+    """
+    First day of a date group's period.
+
+    Taken from ``__range`` (Odoo 16 and later) or from the group's
+    ``__domain``, whose ``>=`` term on the field bounds the period.
+
+    Returns:
+        str: The start, None for the group of records without a date
+    """
+    bounds = (group.get('__range') or {}).get(spec)
+    if bounds:
+        return bounds.get('from') or None
+    for term in group.get('__domain') or ():
+        if isinstance(term, (list, tuple)) and len(term) == 3 and term[0] == field and term[1] == '>=':
+            return term[2]
+    return None
+
+
+def flatten(group, levels, described, row):
+    """
+    Add the group-by values of a read_group group to a row.
+
+    Args:
+        group (dict): The group returned by read_group
+        levels (list): ``(spec, field, granularity)`` triples present in the group
+        described (dict): The fields_get result of the model
+        row (dict): The row, updated in place
+    """
+    for spec, field, granularity in levels:
+        value = group.get(spec, group.get(field))
+        field_type = described[field].get('type')
+        if granularity:
+            row[spec] = period_start(group, spec, field) if value is not False else None
+        elif field_type == 'many2one':
+            row[field] = value[0] if value else None
+            row[f'{field}_name'] = value[1] if value else None
+        elif field_type == 'boolean':
+            row[field] = bool(value)
+        else:
+            row[field] = None if value is False else value
+
+
+def column_types(described, levels, measures):
+    """
+    Columns types of flat aggregate rows, for dgt_rpc.columns.Columns.
+
+    Returns:
+        dict: Row key to Odoo field type, in row order
+    """
+    types = {}
+    for spec, field, granularity in levels:
+        field_type = described[field].get('type')
+        if granularity:
+            types[spec] = field_type
+        elif field_type == 'many2one':
+            types[field] = 'integer'
+            types[f'{field}_name'] = 'char'
+        else:
+            types[field] = field_type
+    for field, aggregate in measures:
+        if aggregate in ('count', 'count_distinct'):
+            types[field] = 'integer'
+        elif aggregate == 'avg':
+            types[field] = 'float'
+        elif aggregate in (None, 'sum', 'min', 'max'):
+            types[field] = described[field].get('type')
+        else:
+            types[field] = None
+    types['count'] = 'integer'
+    return types
@@ -0,0 +1,661 @@
+"""
+Asyncio clients for the DGT RPC library.
+
+``AsyncDgteraClient`` and ``AsyncDgteraPOSClient`` mirror the blocking clients
+in ``client.py`` but every network call is awaitable. Requests go over a small
+HTTP/1.1 implementation built on asyncio streams with its own keep-alive
+connection pool, so no third-party HTTP library is needed.
+"""
+
+import asyncio
+import gzip
+import logging
+import ssl
+import time
+import urllib.parse
+import xmlrpc.client
+from collections import deque
+
+from .auth_cache import MemoryUidCache, is_access_denied
+from .client import PosOrdersResult
+from .exceptions import DgtException
+
+logger = logging.getLogger(__name__)
+
+USER_AGENT = f"dgt_rpc-async (Python-xmlrpc/{xmlrpc.client.__version__})"
+
+
+class AsyncHTTPConnection:
+    """A single keep-alive HTTP/1.1 connection on top of asyncio streams."""
+
+    def __init__(self, host, reader, writer):
+        self.host = host
+        self.reader = reader
+        self.writer = writer
+
+    @classmethod
+    async def open(cls, scheme, host, timeout=None, ssl_context=None):
+        """
+        Open a connection to a host.
+
+        Args:
+            scheme (str): 'http' or 'https'
+            host (str): Host name, optionally with a port
+            timeout (float, optional): Connect timeout in seconds
+            ssl_context (ssl.SSLContext, optional): Context used for HTTPS
+
+        Returns:
+            AsyncHTTPConnection: The open connection
+        """
+        parts = urllib.parse.urlsplit(f'//{host}')
+        if scheme == 'https':
+            port = parts.port or 443
+            context = ssl_context or ssl.create_default_context()
+        else:
+            port = parts.port or 80
+            context = None
+        reader, writer = await asyncio.wait_for(
+            asyncio.open_connection(parts.hostname, port, ssl=context), timeout
+        )
+        return cls(host, reader, writer)
+
+    async def request(self, path, body, headers):
+        """
+        Send a POST request and read the whole response.
+
+        Args:
+            path (str): Request path
+            body (bytes): Request body
+            headers (list): (name, value) pairs to send
+
+        Returns:
+            tuple: Status code, reason, lower-cased header dict, body bytes and
+                a flag telling whether the server will close the connection
+        """
+        lines = [f'POST {path} HTTP/1.1', f'Host: {self.host}']
+        lines.extend(f'{name}: {value}' for name, value in headers)
+        lines.append(f'Content-Length: {len(body)}')
+        self.writer.write(('\r\n'.join(lines) + '\r\n\r\n').encode('latin-1') + body)
+        await self.writer.drain()
+
+        status_line = await self.reader.readline()
+        if not status_line:
+            raise ConnectionResetError("Server closed the connection")
+        version, status, reason = (status_line.decode('latin-1').rstrip('\r\n').split(' ', 2) + [''])[:3]
+
+        response_headers = {}
+        while True:
+            line = await self.reader.readline()
+            if line in (b'\r\n', b'\n', b''):
+                break
+            name, _, value = line.decode('latin-1').partition(':')
+            response_headers[name.strip().lower()] = value.strip()
+
+        connection = response_headers.get('connection', '').lower()
+        will_close = connection == 'close' or (version == 'HTTP/1.0' and connection != 'keep-alive')
+
+        if 'chunked' in response_headers.get('transfer-encoding', '').lower():
+            data = await self._read_chunked()
+        elif 'content-length' in response_headers:
+            data = await self.reader.readexactly(int(response_headers['content-length']))
+        else:
+            data = await self.reader.read()
+            will_close = True
+
+        return int(status), reason, response_headers, data, will_close
+
+    async def _read_chunked(self):
+        """Read a body sent with chunked transfer encoding."""
+        chunks = []
+        while True:
+            size_line = await self.reader.readline()
+            size = int(size_line.split(b';', 1)[0].strip(), 16)
+            if not size:
+                # Skip trailers up to the final empty line
+                while (await self.reader.readline()) not in (b'\r\n', b'\n', b''):
+                    pass
+                return b''.join(chunks)
+            chunks.append(await self.reader.readexactly(size))
+            await self.reader.readexactly(2)
+
+    def is_healthy(self):
+        """An idle connection is usable as long as neither side has closed it."""
+        return not self.writer.is_closing() and not self.reader.at_eof()
+
+    def close(self):
+        """Close the underlying stream."""
+        self.writer.close()
+
+
+class AsyncConnectionPool:
+    """
+    A pool of keep-alive connections for asyncio clients.
+
+    Like ``ConnectionPool`` it is keyed by ``(scheme, host)``, bounds the
+    number of idle connections, caps concurrent connections per host and
+    closes connections that stay idle too long.
+    """
+
+    def __init__(self, max_size=100, max_per_host=10, idle_timeout=60.0,
+                 timeout=None, ssl_context=None):
+        """
+        Initialize the connection pool.
+
+        Args:
+            max_size (int, optional): Maximum number of idle connections kept open
+            max_per_host (int, optional): Maximum number of connections in use per host
+            idle_timeout (float, optional): Seconds after which an idle connection is closed
+            timeout (float, optional): Connect timeout in seconds
+            ssl_context (ssl.SSLContext, optional): Context used for HTTPS connections
+        """
+        self.max_size = max_size
+        self.max_per_host = max_per_host
+        self.idle_timeout = idle_timeout
+        self.timeout = timeout
+        self.ssl_context = ssl_context
+        self._idle = {}
+        self._active = {}
+        self._idle_count = 0
+        self._cond = None
+        self.created = 0
+        self.reused = 0
+
+    def _condition(self):
+        # Created lazily so the pool can be built outside a running loop
+        if self._cond is None:
+            self._cond = asyncio.Condition()
+        return self._cond
+
+    async def acquire(self, scheme, host):
+        """
+        Get a connection to a host, reusing an idle one when possible.
+
+        Args:
+            scheme (str): 'http' or 'https'
+            host (str): Host name, optionally with a port
+
+        Returns:
+            tuple: The connection and a flag telling whether it was reused
+        """
+        key = (scheme, host)
+        cond = self._condition()
+        async with cond:
+            while True:
+                self._evict_expired()
+                idle = self._idle.get(key)
+                while idle:
+                    conn, _ = idle.pop()
+                    self._idle_count -= 1
+                    if conn.is_healthy():
+                        self._active[key] = self._active.get(key, 0) + 1
+                        self.reused += 1
+                        return conn, True
+                    conn.close()
+
+                if self._active.get(key, 0) < self.max_per_host:
+                    self._active[key] = self._active.get(key, 0) + 1
+                    self.created += 1
+                    break
+                await cond.wait()
+
+        try:
+            conn = await AsyncHTTPConnection.open(scheme, host, self.timeout, self.ssl_context)
+        except BaseException:
+            await self.release(scheme, host, None, reusable=False)
+            raise
+        return conn, False
+
+    async def release(self, scheme, host, conn, reusable=True):
+        """
+        Return a connection to the pool.
+
+        Args:
+            scheme (str): 'http' or 'https'
+            host (str): Host name the connection was acquired for
+            conn (AsyncHTTPConnection): The connection, or None if opening it failed
+            reusable (bool, optional): False if the connection must be closed
+        """
+        key = (scheme, host)
+        cond = self._condition()
+        async with cond:
+            self._active[key] -= 1
+            if not self._active[key]:
+                del self._active[key]
+
+            if conn is not None:
+                if reusable and conn.is_healthy():
+                    if self._idle_count >= self.max_size:
+                        self._evict_oldest()
+                    self._idle.setdefault(key, deque()).append((conn, time.monotonic()))
+                    self._idle_count += 1
+                else:
+                    conn.close()
+            cond.notify()
+
+    async def close(self):
+        """Close all idle connections."""
+        async with self._condition():
+            for idle in self._idle.values():
+                for conn, _ in idle:
+                    conn.close()
+            self._idle.clear()
+            self._idle_count = 0
+
+    def idle_count(self):
+        """Return the number of idle connections."""
+        return self._idle_count
+
+    def _evict_expired(self):
+        if self.idle_timeout is None:
+            return
+        cutoff = time.monotonic() - self.idle_timeout
+        for key in list(self._idle):
+            idle = self._idle[key]
+            while idle and idle[0][1] < cutoff:
+                conn, _ = idle.popleft()
+                self._idle_count -= 1
+                conn.close()
+            if not idle:
+                del self._idle[key]
+
+    def _evict_oldest(self):
+        oldest_key = min(self._idle, key=lambda k: self._idle[k][0][1])
+        conn, _ = self._idle[oldest_key].popleft()
+        self._idle_count -= 1
+        if not self._idle[oldest_key]:
+            del self._idle[oldest_key]
+        conn.close()
+
+
+class AsyncTransport:
+    """Sends XML-RPC requests over an AsyncConnectionPool."""
+
+    def __init__(self, pool, scheme, host, timeout=None):
+        """
+        Initialize the transport.
+
+        Args:
+            pool (AsyncConnectionPool): Pool to borrow connections from
+            scheme (str): 'http' or 'https'
+            host (str): Host name, optionally with a port
+            timeout (float, optional): Seconds to wait for a response
+        """
+        self.pool = pool
+        self.scheme = scheme
+        self.host = host
+        self.timeout = timeout
+
+    async def call(self, handler, method, params):
+        """
+        Call a remote XML-RPC method.
+
+        Args:
+            handler (str): Endpoint path, e.g. '/xmlrpc/2/object'
+            method (str): Remote method name
+            params (tuple): Method parameters
+
+        Returns:
+            The decoded result
+
+        Raises:
+            xmlrpc.client.Fault: If the server returned a fault
+            xmlrpc.client.ProtocolError: If the server answered with an HTTP error
+        """
+        body = xmlrpc.client.dumps(params, method, allow_none=True).encode('utf-8')
+        headers = [
+            ('Content-Type', 'text/xml'),
+            ('Accept-Encoding', 'gzip'),
+            ('User-Agent', USER_AGENT),
+        ]
+
+        for attempt in (0, 1):
+            conn, reused = await self.pool.acquire(self.scheme, self.host)
+            reusable = False
+            try:
+                status, reason, response_headers, data, will_close = await asyncio.wait_for(
+                    conn.request(handler, body, headers), self.timeout
+                )
+                reusable = not will_close
+                break
+            except (ConnectionError, asyncio.IncompleteReadError):
+                if attempt or not reused:
+                    raise
+                logger.debug(f"Reused connection to {self.host} went stale, retrying")
+            finally:
+                await self.pool.release(self.scheme, self.host, conn, reusable)
+
+        if status != 200:
+            raise xmlrpc.client.ProtocolError(self.host + handler, status, reason, response_headers)
+        if response_headers.get('content-encoding') == 'gzip':
+            data = gzip.decompress(data)
+
+        result, _ = xmlrpc.client.loads(data)
+        return result[0]
+
+
+class AsyncDgteraClient:
+    """
+    An asyncio client for interacting with Odoo instances via XML-RPC.
+
+    This is the awaitable counterpart of ``DgteraClient``; one instance can
+    serve many concurrent tasks.
+    """
+
+    def __init__(self, url, db=None, username=None, password=None, api_key=None,
+                 pool=None, timeout=None, uid_cache=None):
+        """
+        Initialize the Odoo client.
+
+        Args:
+            url (str): The base URL of the Odoo instance (e.g., 'https://example.odoo.com')
+            db (str, optional): The database name
+            username (str, optional): The username for authentication
+            password (str, optional): The password for authentication
+            api_key (str, optional): API key for authentication (alternative to username/password)
+            pool (AsyncConnectionPool, optional): Connection pool, may be shared between
+                clients. A private pool is created if not specified
+            timeout (float, optional): Seconds to wait for each response
+            uid_cache (UidCache, optional): Cache of authenticated UIDs. A private
+                MemoryUidCache is created if not specified
+        """
+        self.url = url.rstrip('/')
+        self.db = db
+        self.username = username
+        self.password = password
+        self.api_key = api_key
+        self.uid = None
+        self.uid_cache = uid_cache if uid_cache is not None else MemoryUidCache()
+        self._uid_cache_key = None
+        self._owns_pool = pool is None
+        self.pool = pool if pool is not None else AsyncConnectionPool()
+        parts = urllib.parse.urlsplit(self.url)
+        self._path = parts.path
+        self.transport = AsyncTransport(self.pool, parts.scheme or 'http', parts.netloc, timeout)
+        self._auth_lock = None
+
+    async def close(self):
+        """Close the idle connections of the client's own pool."""
+        if self._owns_pool:
+            await self.pool.close()
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, exc_type, exc_value, traceback):
+        await self.close()
+
+    async def authenticate(self, db=None, username=None, password=None, api_key=None, context=None):
+        """
+        Authenticate with the Odoo server.
+
+        Args:
+            db (str, optional): Database name (overrides instance attribute)
+            username (str, optional): Username (overrides instance attribute)
+            password (str, optional): Password (overrides instance attribute)
+            api_key (str, optional): API key (overrides instance attribute)
+            context (dict, optional): Additional context for authentication
+
+        Returns:
+            int: User ID if authentication successful
+
+        Raises:
+            DgtException: If authentication fails
+        """
+        db = db or self.db
+        context = context or {}
+
+        try:
+            if api_key or self.api_key:
+                key = api_key or self.api_key
+                cache_key = (self.url, db, key)
+                login = 'admin'
+            else:
+                username = username or self.username
+                key = password or self.password
+                cache_key = (self.url, db, username, key)
+                login = username
+
+            cached_uid = self.uid_cache.get(cache_key)
+            if cached_uid is not None:
+                logger.debug("Using cached UID")
+                self.uid = cached_uid
+                self._uid_cache_key = cache_key
+                return self.uid
+
+            uid = await self.transport.call(
+                f'{self._path}/xmlrpc/2/common', 'authenticate', (db, login, key, context)
+            )
+
+            if not uid:
+                raise DgtException("Authentication failed")
+
+            logger.debug(f"Successfully authenticated, UID: {uid}")
+            self.uid_cache[cache_key] = uid
+            self.uid = uid
+            self._uid_cache_key = cache_key
+            return uid
+
+        except DgtException:
+            raise
+        except xmlrpc.client.Error as e:
+            raise DgtException.from_xmlrpc_exception(e)
+        except Exception as e:
+            raise DgtException(f"Authentication error", e)
+
+    async def _ensure_authenticated(self):
+        """Authenticate once even when many tasks start calling at the same time."""
+        if self.uid:
+            return
+        if self._auth_lock is None:
+            self._auth_lock = asyncio.Lock()
+        async with self._auth_lock:
+            if not self.uid:
+                await self.authenticate()
+
+    async def execute(self, model, method, args=None, **kwargs):
+        """
+        Execute a method on an Odoo model.
+
+        Args:
+            model (str): The model name (e.g., 'res.partner')
+            method (str): The method to call (e.g., 'search', 'read', 'write')
+            args (list, optional): Positional arguments to pass to the method
+            **kwargs: Additional parameters for the method
+
+        Returns:
+            The result of the method call
+
+        Raises:
+            DgtException: If the execution fails
+        """
+        if args is None:
+            args = []
+        return await self.execute_kw(model, method, [args], kwargs)
+
+    async def execute_kw(self, model, method, args=None, kwargs=None):
+        """
+        Execute a method on an Odoo model with full control over arguments.
+
+        Args:
+            model (str): The model name
+            method (str): The method to call
+            args (list, optional): Positional arguments to pass to the method
+            kwargs (dict, optional): Keyword arguments to pass to the method
+
+        Returns:
+            The result of the method call
+
+        Raises:
+            DgtException: If the execution fails
+        """
+        if args is None:
+            args = []
+        if kwargs is None:
+            kwargs = {}
+
+        try:
+            await self._ensure_authenticated()
+
+            return await self.transport.call(
+                f'{self._path}/xmlrpc/2/object', 'execute_kw',
+                (self.db, self.uid, self.password or self.api_key, model, method, args, kwargs)
+            )
+        except DgtException:
+            raise
+        except xmlrpc.client.Error as e:
+            if is_access_denied(e):
+                # Drop the refused UID so the next call authenticates again
+                if self._uid_cache_key is not None:
+                    self.uid_cache.delete(self._uid_cache_key)
+                    self._uid_cache_key = None
+                self.uid = None
+            raise DgtException.from_xmlrpc_exception(e)
+        except Exception as e:
+            raise DgtException(f"Error executing {method} on {model}", e)
+
+    async def search(self, model, domain, offset=0, limit=None, order=None):
+        """
+        Search for records of a model.
+
+        Args:
+            model (str): The model name
+            domain (list): The search domain
+            offset (int, optional): Number of records to skip
+            limit (int, optional): Maximum number of records to return
+            order (str, optional): Field(s) to sort by
+
+        Returns:
+            list: Record IDs matching the domain
+        """
+        kwargs = {
+            'offset': offset,
+            'limit': limit,
+            'order': order
+        }
+        return await self.execute_kw(model, 'search', [domain], kwargs)
+
+    async def read(self, model, ids, fields=None):
+        """
+        Read records of a model.
+
+        Args:
+            model (str): The model name
+            ids (list): List of record IDs to read
+            fields (list, optional): List of fields to read, reads all if not specified
+
+        Returns:
+            list: List of dictionaries containing the read data
+        """
+        kwargs = {}
+        if fields:
+            kwargs['fields'] = fields
+        return await self.execute_kw(model, 'read', [ids], kwargs)
+
+    async def search_read(self, model, domain, fields=None, offset=0, limit=None, order=None):
+        """
+        Search and read records in a single call.
+
+        Args:
+            model (str): The model name
+            domain (list): The search domain
+            fields (list, optional): List of fields to read
+            offset (int, optional): Number of records to skip
+            limit (int, optional): Maximum number of records to return
+            order (str, optional): Field(s) to sort by
+
+        Returns:
+            list: List of dictionaries containing the read data
+        """
+        kwargs = {
+            'offset': offset,
+            'limit': limit,
+            'order': order
+        }
+        if fields:
+            kwargs['fields'] = fields
+        return await self.execute_kw(model, 'search_read', [domain], kwargs)
+
+
+class AsyncDgteraPOSClient(AsyncDgteraClient):
+    """
+    An asyncio client for working with Odoo POS systems.
+
+    This is the awaitable counterpart of ``DgteraPOSClient``.
+    """
+
+    async def get_pos_data(self, db, include_inactive=True):
+        """
+        Get POS configuration data.
+
+        Args:
+            db (str): The database to get POS data for
+            include_inactive (bool, optional): Whether to include inactive POS configs
+
+        Returns:
+            list: List of POS configurations
+        """
+        return await self.execute_kw("pos.config", "get_pos_data", [db, include_inactive])
+
+    async def get_pos_orders(self, pos_config, db, limit=10, include_lines=False):
+        """
+        Get orders for a POS configuration.
+
+        Args:
+            pos_config (dict or int): POS configuration dictionary or ID
+            db (str): The database name
+            limit (int, optional): Maximum number of orders to retrieve
+            include_lines (bool, optional): Whether to include order lines
+
+        Returns:
+            dict: Dictionary with order data
+        """
+        pos_id = pos_config.get('id') if isinstance(pos_config, dict) else pos_config
+
+        return await self.execute_kw("pos.order", "get_pos_orders", [pos_id, db, limit, include_lines])
+
+    async def get_pos_orders_many(self, pos_configs, db, limit=10, include_lines=False, max_concurrency=None):
+        """
+        Get orders for many POS configurations concurrently.
+
+        Results are yielded as soon as each call completes, not in input
+        order. A failing configuration produces a result carrying the error
+        instead of aborting the whole batch.
+
+        Args:
+            pos_configs (list): POS configuration dictionaries or IDs
+            db (str): The database name
+            limit (int, optional): Maximum number of orders to retrieve per POS
+            include_lines (bool, optional): Whether to include order lines
+            max_concurrency (int, optional): Maximum number of calls in flight,
+                defaults to the connection pool's per-host limit
+
+        Yields:
+            PosOrdersResult: The POS configuration with either its orders or the error
+
+        Raises:
+            DgtException: If authentication fails
+        """
+        pos_configs = list(pos_configs)
+        if not pos_configs:
+            return
+
+        await self._ensure_authenticated()
+        semaphore = asyncio.Semaphore(max_concurrency or self.pool.max_per_host)
+
+        async def fetch(pos_config):
+            async with semaphore:
+                try:
+                    orders = await self.get_pos_orders(pos_config, db, limit, include_lines)
+                except DgtException as e:
+                    logger.debug(f"Fetching orders failed for POS {pos_config}: {e}")
+                    return PosOrdersResult(pos_config, None, e)
+                return PosOrdersResult(pos_config, orders, None)
+
+        tasks = [asyncio.ensure_future(fetch(pos_config)) for pos_config in pos_configs]
+        try:
+            for next_done in asyncio.as_completed(tasks):
+                yield await next_done
+        finally:
+            # Cancel outstanding calls if the caller stops iterating early
+            for task in tasks:
+                task.cancel()
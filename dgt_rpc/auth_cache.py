@@ -0,0 +1,367 @@
+"""
+Caches of authenticated user IDs.
+
+Authenticating costs a round trip to ``/xmlrpc/2/common`` per database. A
+client remembers the UID it got in its ``uid_cache``; the backends in this
+module bound that cache and, with FileUidCache, share it between processes so
+short-lived workers and cron jobs skip authentication on a cold start.
+
+Credentials never leave the process in clear: entries are keyed on an
+HMAC-SHA256 of ``(url, db, login, secret)`` under a random key of the cache.
+FileUidCache keeps that key in a ``.key`` file readable by its owner only,
+so a copy of the cache file alone cannot be used to guess the passwords.
+"""
+
+import hashlib
+import hmac
+import json
+import logging
+import os
+import tempfile
+import threading
+import time
+import xmlrpc.client
+from collections import OrderedDict
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+    import msvcrt
+
+logger = logging.getLogger(__name__)
+
+# Bytes of the random keys digests are made with
+SECRET_SIZE = 32
+
+
+def hash_key(key, secret):
+    """
+    Digest a cache key holding credentials.
+
+    Args:
+        key (tuple): The key, e.g. ``(url, db, login, secret)``
+        secret (bytes): Key of the HMAC, random and private to the cache
+
+    Returns:
+        str: Hex HMAC-SHA256 digest of the key
+    """
+    message = json.dumps(list(key), default=str).encode('utf-8')
+    return hmac.new(secret, message, hashlib.sha256).hexdigest()
+
+
+def is_access_denied(exception):
+    """
+    Check whether a call failed because its credentials were refused.
+
+    Args:
+        exception (Exception): The error raised by the call
+
+    Returns:
+        bool: True for Odoo's AccessDenied faults and HTTP 401 and 403
+    """
+    if isinstance(exception, xmlrpc.client.Fault):
+        text = str(exception.faultString)
+        return exception.faultCode in (3, 'AccessDenied') or 'AccessDenied' in text or 'Access Denied' in text
+    if isinstance(exception, xmlrpc.client.ProtocolError):
+        return exception.errcode in (401, 403)
+    return False
+
+
+class UidCache:
+    """
+    Base class of the UID cache backends.
+
+    Subclasses implement ``get``, ``set``, ``delete`` and ``clear``. The
+    ``in`` and ``[]`` operators are provided so a backend can replace the
+    plain dictionary clients used before.
+    """
+
+    def get(self, key, default=None):
+        """
+        Look up a UID.
+
+        Args:
+            key (tuple): The credentials key
+            default (optional): Returned when there is no valid entry
+
+        Returns:
+            int: The cached UID or default
+        """
+        raise NotImplementedError
+
+    def set(self, key, uid):
+        """
+        Store a UID.
+
+        Args:
+            key (tuple): The credentials key
+            uid (int): The authenticated user ID
+        """
+        raise NotImplementedError
+
+    def delete(self, key):
+        """
+        Forget a UID, for example after its credentials were revoked.
+
+        Args:
+            key (tuple): The credentials key
+        """
+        raise NotImplementedError
+
+    def clear(self):
+        """Forget all UIDs."""
+        raise NotImplementedError
+
+    def __contains__(self, key):
+        return self.get(key) is not None
+
+    def __getitem__(self, key):
+        uid = self.get(key)
+        if uid is None:
+            raise KeyError(key)
+        return uid
+
+    def __setitem__(self, key, uid):
+        self.set(key, uid)
+
+    def __delitem__(self, key):
+        self.delete(key)
+
+
+class MemoryUidCache(UidCache):
+    """A bounded, thread-safe in-process UID cache with LRU eviction and a TTL."""
+
+    def __init__(self, max_size=1024, ttl=None):
+        """
+        Initialize the cache.
+
+        Args:
+            max_size (int, optional): Maximum number of UIDs kept
+            ttl (float, optional): Seconds a UID stays valid, forever if not specified
+        """
+        self.max_size = max_size
+        self.ttl = ttl
+        self._secret = os.urandom(SECRET_SIZE)
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key, default=None):
+        digest = hash_key(key, self._secret)
+        with self._lock:
+            entry = self._entries.get(digest)
+            if entry is None:
+                return default
+            uid, stored = entry
+            if self.ttl is not None and stored + self.ttl <= time.monotonic():
+                del self._entries[digest]
+                return default
+            self._entries.move_to_end(digest)
+            return uid
+
+    def set(self, key, uid):
+        digest = hash_key(key, self._secret)
+        with self._lock:
+            self._entries[digest] = (uid, time.monotonic())
+            self._entries.move_to_end(digest)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+
+    def delete(self, key):
+        with self._lock:
+            self._entries.pop(hash_key(key, self._secret), None)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self):
+        return len(self._entries)
+
+
+class FileUidCache(UidCache):
+    """
+    A UID cache stored in a JSON file shared by processes.
+
+    Readers and writers lock a sidecar ``.lock`` file, and the data file is
+    replaced atomically, so concurrent processes never see a partial file.
+    Entries are keyed with a random secret kept in a sidecar ``.key`` file,
+    created on first use; processes sharing the cache must be able to read
+    it. Files are created with mode 0600.
+    """
+
+    # A hit refreshes the entry's LRU position at most this often, to avoid a write per lookup
+    TOUCH_INTERVAL = 60.0
+
+    def __init__(self, path, max_size=10000, ttl=86400.0):
+        """
+        Initialize the cache.
+
+        Args:
+            path (str): Path of the JSON file
+            max_size (int, optional): Maximum number of UIDs kept
+            ttl (float, optional): Seconds a UID stays valid, forever if None
+        """
+        self.path = os.path.expanduser(path)
+        self.max_size = max_size
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        # Parsed file contents, reused while the file is unchanged
+        self._snapshot = (None, {})
+        directory = os.path.dirname(os.path.abspath(self.path))
+        os.makedirs(directory, exist_ok=True)
+        self._secret = self._load_secret()
+
+    def _load_secret(self):
+        """Read the key of the digests, creating it the first time."""
+        key_path = self.path + '.key'
+        with self._locked():
+            try:
+                with open(key_path, 'rb') as f:
+                    secret = f.read()
+                if len(secret) == SECRET_SIZE:
+                    return secret
+                logger.warning(f"Replacing invalid UID cache key {key_path}")
+            except FileNotFoundError:
+                pass
+            secret = os.urandom(SECRET_SIZE)
+            fd, tmp = tempfile.mkstemp(dir=os.path.dirname(os.path.abspath(self.path)), suffix='.tmp')
+            try:
+                with os.fdopen(fd, 'wb') as f:
+                    f.write(secret)
+                os.replace(tmp, key_path)
+            except BaseException:
+                try:
+                    os.remove(tmp)
+                except OSError:
+                    pass
+                raise
+            # Digests made with another key can no longer be found
+            self._write({})
+            return secret
+
+    def get(self, key, default=None):
+        digest = hash_key(key, self._secret)
+        now = time.time()
+        with self._locked(shared=True):
+            entries = self._read()
+        entry = entries.get(digest)
+        if entry is None:
+            return default
+        uid, stored, used = entry
+        if self.ttl is not None and stored + self.ttl <= now:
+            self.delete(key)
+            return default
+        if used + self.TOUCH_INTERVAL <= now:
+            with self._locked():
+                entries = self._read()
+                if digest in entries:
+                    entries[digest][2] = now
+                    self._write(entries)
+        return uid
+
+    def set(self, key, uid):
+        digest = hash_key(key, self._secret)
+        now = time.time()
+        with self._locked():
+            entries = self._read()
+            entries[digest] = [uid, now, now]
+            if self.ttl is not None:
+                for expired in [d for d, e in entries.items() if e[1] + self.ttl <= now]:
+                    del entries[expired]
+            if len(entries) > self.max_size:
+                by_use = sorted(entries, key=lambda d: entries[d][2])
+                for evicted in by_use[:len(entries) - self.max_size]:
+                    del entries[evicted]
+            self._write(entries)
+
+    def delete(self, key):
+        digest = hash_key(key, self._secret)
+        with self._locked():
+            entries = self._read()
+            if entries.pop(digest, None) is not None:
+                self._write(entries)
+
+    def clear(self):
+        with self._locked():
+            self._write({})
+
+    def __len__(self):
+        with self._locked(shared=True):
+            return len(self._read())
+
+    def _locked(self, shared=False):
+        """Lock the cache against other threads and processes."""
+        return _FileLock(self.path + '.lock', self._lock, shared)
+
+    def _read(self):
+        """Load the entries, reusing the last parse if the file did not change. Lock must be held."""
+        try:
+            stat = os.stat(self.path)
+        except FileNotFoundError:
+            return {}
+        stamp = (stat.st_mtime_ns, stat.st_size, stat.st_ino)
+        cached_stamp, entries = self._snapshot
+        if stamp != cached_stamp:
+            try:
+                with open(self.path, encoding='utf-8') as f:
+                    entries = json.load(f)
+                if not isinstance(entries, dict):
+                    raise ValueError("not a JSON object")
+            except (OSError, ValueError) as e:
+                logger.warning(f"Ignoring unreadable UID cache {self.path}: {e}")
+                entries = {}
+            self._snapshot = (stamp, entries)
+        return {digest: list(entry) for digest, entry in entries.items()}
+
+    def _write(self, entries):
+        """Replace the file atomically. Lock must be held."""
+        directory = os.path.dirname(os.path.abspath(self.path))
+        fd, tmp = tempfile.mkstemp(dir=directory, suffix='.tmp')
+        try:
+            with os.fdopen(fd, 'w', encoding='utf-8') as f:
+                json.dump(entries, f)
+            os.replace(tmp, self.path)
+        except BaseException:
+            try:
+                os.remove(tmp)
+            except OSError:
+                pass
+            raise
+
+
+class _FileLock:
+    """Context manager holding a thread lock and an advisory lock on a file."""
+
+    def __init__(self, path, thread_lock, shared):
+        self.path = path
+        self.thread_lock = thread_lock
+        self.shared = shared
+        self.file = None
+
+    def __enter__(self):
+        self.thread_lock.acquire()
+        try:
+            fd = os.open(self.path, os.O_RDWR | os.O_CREAT, 0o600)
+            self.file = os.fdopen(fd, 'r+b')
+            if fcntl is not None:
+                fcntl.flock(self.file, fcntl.LOCK_SH if self.shared else fcntl.LOCK_EX)
+            else:
+                msvcrt.locking(self.file.fileno(), msvcrt.LK_LOCK, 1)
+        except BaseException:
+            if self.file is not None:
+                self.file.close()
+            self.thread_lock.release()
+            raise
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        try:
+            if fcntl is not None:
+                fcntl.flock(self.file, fcntl.LOCK_UN)
+            else:
+                self.file.seek(0)
+                msvcrt.locking(self.file.fileno(), msvcrt.LK_UNLCK, 1)
+        finally:
+            self.file.close()
+            self.thread_lock.release()
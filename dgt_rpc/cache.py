@@ -0,0 +1,208 @@
+"""
+Read-through caching of RPC results.
+
+Dashboards and reports tend to repeat the same ``search_read`` or
+``get_pos_data`` call many times a minute. A ResultCache attached to a client
+answers repeated read calls from memory until they expire, and drops the
+cached results of a model as soon as the same client writes to it.
+"""
+
+import copy
+import json
+import logging
+import threading
+import time
+from collections import OrderedDict
+
+logger = logging.getLogger(__name__)
+
+# Read-only methods cached unless the cache is given its own allow-list
+DEFAULT_METHODS = frozenset({
+    'search', 'read', 'search_read', 'search_count', 'name_search', 'name_get',
+    'fields_get', 'read_group', 'get_pos_data',
+})
+
+# Methods that change records and invalidate the cached results of their model
+INVALIDATING_METHODS = frozenset({'create', 'write', 'unlink', 'copy'})
+
+
+class ResultCache:
+    """
+    A thread-safe LRU cache of execute_kw results with a time-to-live.
+
+    Results are keyed on a canonical form of ``(url, db, uid, model, method,
+    args, kwargs)``, so a cache may be shared by clients of several servers,
+    and argument order inside dictionaries and tuple versus list domains do
+    not cause misses.
+    """
+
+    def __init__(self, max_size=1024, ttl=60.0, models=None, methods=DEFAULT_METHODS,
+                 invalidate_on=INVALIDATING_METHODS, copy_results=True):
+        """
+        Initialize the cache.
+
+        Args:
+            max_size (int, optional): Maximum number of cached results
+            ttl (float, optional): Seconds a result stays valid, None to keep results
+                until they are evicted or invalidated
+            models (iterable, optional): Models whose results may be cached, all models
+                if not specified
+            methods (iterable, optional): Methods whose results may be cached
+            invalidate_on (iterable, optional): Methods that invalidate their model's results
+            copy_results (bool, optional): Hand out deep copies of cached results so
+                callers can modify them safely
+        """
+        self.max_size = max_size
+        self.ttl = ttl
+        self.models = frozenset(models) if models is not None else None
+        self.methods = frozenset(methods)
+        self.invalidate_on = frozenset(invalidate_on)
+        self.copy_results = copy_results
+        self._entries = OrderedDict()
+        self._generations = {}
+        self._clears = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+        self.invalidations = 0
+
+    def is_cacheable(self, model, method):
+        """
+        Check whether results of a method may be cached.
+
+        Args:
+            model (str): The model name
+            method (str): The method name
+
+        Returns:
+            bool: True if the method is on the allow-lists
+        """
+        return method in self.methods and (self.models is None or model in self.models)
+
+    def make_key(self, url, db, uid, model, method, args, kwargs):
+        """
+        Build the cache key of a call.
+
+        Returns:
+            tuple: A hashable key
+        """
+        return (url, db, uid, model, method,
+                json.dumps(args, sort_keys=True, default=repr),
+                json.dumps(kwargs, sort_keys=True, default=repr))
+
+    def generation(self, model):
+        """
+        Return the invalidation counter of a model.
+
+        A result fetched while the counter changed may predate a write and is
+        not stored, see ``put``.
+        """
+        return self._generations.get(model, 0) + self._clears
+
+    def get(self, key):
+        """
+        Look up a result.
+
+        Args:
+            key (tuple): Key built by ``make_key``
+
+        Returns:
+            tuple: A hit flag and the cached result, or None on a miss
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                expires, value = entry
+                if expires is None or expires > time.monotonic():
+                    self._entries.move_to_end(key)
+                    self.hits += 1
+                    return True, copy.deepcopy(value) if self.copy_results else value
+                del self._entries[key]
+                self.expirations += 1
+            self.misses += 1
+        return False, None
+
+    def put(self, key, value, generation=None):
+        """
+        Store a result.
+
+        Args:
+            key (tuple): Key built by ``make_key``
+            value: The result
+            generation (int, optional): The model's ``generation`` read before the
+                call was made, the result is dropped if the model changed since
+        """
+        model = key[3]
+        if self.copy_results:
+            value = copy.deepcopy(value)
+        expires = time.monotonic() + self.ttl if self.ttl is not None else None
+        with self._lock:
+            if generation is not None and generation != self.generation(model):
+                return
+            self._entries[key] = (expires, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def invalidate(self, db=None, model=None, url=None):
+        """
+        Drop cached results.
+
+        Args:
+            db (str, optional): Only drop results of this database
+            model (str, optional): Only drop results of this model
+            url (str, optional): Only drop results of this server
+
+        Returns:
+            int: Number of results dropped
+        """
+        with self._lock:
+            if model is not None:
+                self._generations[model] = self._generations.get(model, 0) + 1
+            else:
+                self._clears += 1
+            keys = [
+                key for key in self._entries
+                if (url is None or key[0] == url) and (db is None or key[1] == db)
+                and (model is None or key[3] == model)
+            ]
+            for key in keys:
+                del self._entries[key]
+            self.invalidations += len(keys)
+        if keys:
+            logger.debug(f"Invalidated {len(keys)} cached results of {model or 'all models'}")
+        return len(keys)
+
+    def clear(self):
+        """Drop all cached results."""
+        self.invalidate()
+
+    def __len__(self):
+        return len(self._entries)
+
+    @property
+    def hit_rate(self):
+        """Share of lookups answered from the cache."""
+        lookups = self.hits + self.misses
+        return self.hits / lookups if lookups else 0.0
+
+    def stats(self):
+        """
+        Return the cache statistics.
+
+        Returns:
+            dict: Hits, misses, hit rate, evictions, expirations, invalidations and size
+        """
+        with self._lock:
+            return {
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_rate': self.hit_rate,
+                'evictions': self.evictions,
+                'expirations': self.expirations,
+                'invalidations': self.invalidations,
+                'size': len(self._entries),
+            }
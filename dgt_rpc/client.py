@@ -26,10 +26,57 @@ import xmlrpc.client
 import logging
 import os
 import configparser
-from .exceptions import DgtException
+import textwrap
+import time
+import json
+from collections import namedtuple
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from .aggregate import column_types, flatten, parse_groupby, parse_measures
+from .auth_cache import MemoryUidCache, is_access_denied
+from .columns import Columns
+from .exceptions import DgtException, BatchError
+from .interceptors import Call, run_chain
+from .metadata import FIELD_ATTRIBUTES, HEAVY_TYPES
+from .metrics import CallMetrics
+from .pool import ConnectionPool
+from .records import RecordSet
+from .retry import RetryPolicy
+from .rows import to_rows
+from .transport import get_transport_class
 
 logger = logging.getLogger(__name__)
 
+
+# Default configuration file of from_config
+DEFAULT_CONFIG_FILE = '~/.dgt_rpc.conf'
+
+# Settings read by from_environment and from_config, and their types
+SETTINGS = {
+    'url': str,
+    'db': str,
+    'username': str,
+    'password': str,
+    'api_key': str,
+    'timeout': float,
+    'max_retries': int,
+    'retry_delay': float,
+}
+
+
+class PosOrdersResult(namedtuple('PosOrdersResult', ['pos_config', 'orders', 'error'])):
+    """
+    Outcome of fetching the orders of one POS configuration.
+
+    Exactly one of ``orders`` and ``error`` is set.
+    """
+    __slots__ = ()
+
+    @property
+    def ok(self):
+        """True if the orders were fetched successfully."""
+        return self.error is None
+
+
 class DgteraClient:
     """
     A generic client for interacting with Odoo instances via XML-RPC.
@@ -38,7 +85,11 @@ class DgteraClient:
     execute model methods, and perform common operations.
     """
     
-    def __init__(self, url, db=None, username=None, password=None, api_key=None):
+    def __init__(self, url, db=None, username=None, password=None, api_key=None, timeout=120,
+                 max_retries=3, retry_delay=1, pool=None, protocol='xmlrpc', fast_decoder=False,
+                 compress_threshold=None, cache=None, fields_cache=None, uid_cache=None,
+                 transport=None, retry_policy=None, circuit_breaker=None, single_flight=None,
+                 metrics=None, interceptors=None):
         """
         Initialize the Odoo client.
         
@@ -48,25 +99,166 @@ class DgteraClient:
             username (str, optional): The username for authentication
             password (str, optional): The password for authentication
             api_key (str, optional): API key for authentication (alternative to username/password)
-            timeout (int, optional): Connection timeout in seconds
+            timeout (int, optional): Connection timeout in seconds, None to wait forever
             max_retries (int, optional): Maximum number of retries for failed requests
-            retry_delay (int, optional): Delay between retries in seconds
+            retry_delay (int, optional): Delay before the first retry in seconds, doubled
+                after each retry
+            pool (ConnectionPool, optional): Keep-alive connection pool, may be shared
+                between clients. A private pool is created if not specified
+            protocol (str or type, optional): Wire protocol, 'xmlrpc' or 'jsonrpc',
+                or an RpcTransport subclass
+            fast_decoder (bool, optional): Decode XML-RPC responses with the optimized
+                dgt_rpc.decoder instead of the stock xmlrpc.client unmarshaller
+            compress_threshold (int, optional): gzip request bodies of at least this many
+                bytes. The server must accept gzip encoded requests. Requests are sent
+                uncompressed if not specified
+            cache (ResultCache, optional): Cache answering repeated read calls, results
+                are not cached if not specified
+            fields_cache (FieldsCache, optional): Cache of model fields. When set, reads
+                without a field list skip heavy fields such as binaries, and unknown
+                field names are rejected before calling the server
+            uid_cache (UidCache, optional): Cache of authenticated UIDs, may be shared
+                between clients, or between processes with a FileUidCache. A private
+                MemoryUidCache is created if not specified
+            transport (RpcTransport, optional): Transport to share with other clients of
+                the same server; protocol, pool, timeout and the decoding and compression
+                options are then taken from it
+            retry_policy (RetryPolicy, optional): Policy deciding which failed calls are
+                retried and when; built from max_retries and retry_delay if not specified
+            circuit_breaker (CircuitBreaker, optional): Per-host circuit breaker, may be
+                shared between clients. Calls are not guarded if not specified
+            single_flight (SingleFlight, optional): Registry of calls in flight, may be
+                shared between clients. Identical concurrent read calls then share one
+                request; every call is sent if not specified
+            metrics (Metrics, optional): Collector of per-call timings and sizes, may be
+                shared between clients. Calls are not measured if not specified
+            interceptors (list, optional): Interceptors that execute, execute_kw and
+                authenticate pass through, outermost first
         """
         self.url = url.rstrip('/')
         self.db = db
         self.username = username
         self.password = password
         self.api_key = api_key
+        self.timeout = timeout
+        self.max_retries = max_retries
+        self.retry_delay = retry_delay
+        self.retry_policy = retry_policy if retry_policy is not None else RetryPolicy(
+            max_retries=max_retries, delay=retry_delay
+        )
+        self.circuit_breaker = circuit_breaker
+        self.single_flight = single_flight
+        self.metrics = metrics
+        self.interceptors = list(interceptors) if interceptors else []
         self.uid = None
-        self.uid_cache = {}
+        self.uid_cache = uid_cache if uid_cache is not None else MemoryUidCache()
+        # Key of uid in uid_cache, forgotten when the server refuses the UID
+        self._uid_cache_key = None
+        self.cache = cache
+        self.fields_cache = fields_cache
+        if transport is not None:
+            self._owns_pool = False
+            self.pool = transport.pool
+            self.transport = transport
+        else:
+            self._owns_pool = pool is None
+            self.pool = pool if pool is not None else ConnectionPool()
+            self.transport = get_transport_class(protocol)(
+                self.url, self.pool, fast_decoder=fast_decoder,
+                compress_threshold=compress_threshold, timeout=timeout
+            )
         
+    @classmethod
+    def from_environment(cls, **kwargs):
+        """
+        Create a client configured from DGTERA_* environment variables.
+
+        Args:
+            **kwargs: Constructor arguments, taking precedence over the environment
+
+        Returns:
+            DgteraClient: The configured client
+
+        Raises:
+            DgtException: If no URL is configured or a number is malformed
+        """
+        settings = {}
+        for name, convert in SETTINGS.items():
+            value = os.environ.get(f'DGTERA_{name.upper()}')
+            if value:
+                settings[name] = _convert_setting(name, value, convert)
+        return cls._from_settings(settings, kwargs)
+
+    @classmethod
+    def from_config(cls, config_file=None, profile='default', **kwargs):
+        """
+        Create a client configured from a profile of an INI file.
+
+        Args:
+            config_file (str, optional): Path of the file, ~/.dgt_rpc.conf if not specified
+            profile (str, optional): Section of the file to use
+            **kwargs: Constructor arguments, taking precedence over the file
+
+        Returns:
+            DgteraClient: The configured client
+
+        Raises:
+            DgtException: If the file or profile cannot be read or no URL is configured
+        """
+        path = os.path.expanduser(config_file or DEFAULT_CONFIG_FILE)
+        parser = configparser.ConfigParser()
+        try:
+            with open(path, encoding='utf-8') as f:
+                parser.read_string(textwrap.dedent(f.read()), source=path)
+        except (OSError, configparser.Error) as e:
+            raise DgtException(f"Cannot read configuration file {path}", e)
+        if not parser.has_section(profile):
+            raise DgtException(f"Profile {profile!r} not found in {path}")
+
+        settings = {}
+        for name, convert in SETTINGS.items():
+            value = parser.get(profile, name, fallback=None)
+            if value:
+                settings[name] = _convert_setting(name, value, convert)
+        return cls._from_settings(settings, kwargs)
+
+    @classmethod
+    def _from_settings(cls, settings, kwargs):
+        """Create a client from loaded settings overridden by explicit arguments."""
+        settings.update((name, value) for name, value in kwargs.items() if value is not None)
+        if not settings.get('url'):
+            raise DgtException("No URL configured")
+        return cls(**settings)
+
     def _get_common_connection(self):
         """Get connection to the common endpoint."""
-        return xmlrpc.client.ServerProxy(f'{self.url}/xmlrpc/2/common')
+        return self.transport.common()
         
     def _get_models_connection(self):
         """Get connection to the models endpoint."""
-        return xmlrpc.client.ServerProxy(f'{self.url}/xmlrpc/2/object')
+        return self.transport.models()
+    
+    @property
+    def compression_stats(self):
+        """
+        gzip statistics of the client's calls.
+
+        Returns:
+            CompressionStats: Totals over all calls, ``last`` is the most recent call
+                of the current thread
+        """
+        return self.transport.stats
+
+    def close(self):
+        """Close the idle connections of the client's own pool."""
+        if self._owns_pool:
+            self.pool.close()
+    
+    def __enter__(self):
+        return self
+    
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
         
     def authenticate(self, db=None, username=None, password=None, api_key=None, context=None):
         """
@@ -86,6 +278,18 @@ class DgteraClient:
             DgtException: If authentication fails
         """
         db = db or self.db
+        if self.interceptors:
+            call = Call(self, None, 'authenticate', [db], {})
+            uid = run_chain(self.interceptors, call, lambda call: self._authenticate(
+                call.args[0], username, password, api_key, context
+            ))
+            if uid:
+                self.uid = uid
+            return uid
+        return self._authenticate(db, username, password, api_key, context)
+
+    def _authenticate(self, db, username, password, api_key, context):
+        """Authenticate, reusing a cached UID if possible."""
         context = context or {}
         
         try:
@@ -94,27 +298,33 @@ class DgteraClient:
             # Check if we're using API key authentication
             if api_key or self.api_key:
                 key = api_key or self.api_key
-                cache_key = (db, key)
+                cache_key = (self.url, db, key)
                 
-                if cache_key in self.uid_cache:
+                cached_uid = self.uid_cache.get(cache_key)
+                if cached_uid is not None:
                     logger.debug("Using cached UID for API key authentication")
-                    self.uid = self.uid_cache[cache_key]
+                    self.uid = cached_uid
+                    self._uid_cache_key = cache_key
                     return self.uid
                     
-                uid = common.authenticate(db, 'admin', key, context)
+                uid = self._retry('', 'authenticate', lambda: common.authenticate(db, 'admin', key, context))
                 
             # Otherwise use username/password authentication
             else:
                 username = username or self.username
                 password = password or self.password
-                cache_key = (db, username, password)
+                cache_key = (self.url, db, username, password)
                 
-                if cache_key in self.uid_cache:
+                cached_uid = self.uid_cache.get(cache_key)
+                if cached_uid is not None:
                     logger.debug("Using cached UID for username/password authentication")
-                    self.uid = self.uid_cache[cache_key]
+                    self.uid = cached_uid
+                    self._uid_cache_key = cache_key
                     return self.uid
                     
-                uid = common.authenticate(db, username, password, context)
+                uid = self._retry(
+                    '', 'authenticate', lambda: common.authenticate(db, username, password, context)
+                )
             
             if not uid:
                 raise DgtException("Authentication failed")
@@ -122,8 +332,11 @@ class DgteraClient:
             logger.debug(f"Successfully authenticated, UID: {uid}")
             self.uid_cache[cache_key] = uid
             self.uid = uid
+            self._uid_cache_key = cache_key
             return uid
             
+        except DgtException:
+            raise
         except xmlrpc.client.Error as e:
             raise DgtException.from_xmlrpc_exception(e)
         except Exception as e:
@@ -147,21 +360,9 @@ class DgteraClient:
         """
         if args is None:
             args = []
-            
-        try:
-            models = self._get_models_connection()
-            
-            if not self.uid:
-                self.authenticate()
-                
-            return models.execute_kw(
-                self.db, self.uid, self.password or self.api_key,
-                model, method, [args], kwargs
-            )
-        except xmlrpc.client.Error as e:
-            raise DgtException.from_xmlrpc_exception(e)
-        except Exception as e:
-            raise DgtException(f"Error executing {method} on {model}", e)
+        if self.interceptors:
+            return self._intercepted(model, method, [args], kwargs)
+        return self._execute_kw(model, method, [args], kwargs)
     
     def execute_kw(self, model, method, args=None, kwargs=None):
         """
@@ -183,22 +384,162 @@ class DgteraClient:
             args = []
         if kwargs is None:
             kwargs = {}
-            
+        if self.interceptors:
+            return self._intercepted(model, method, args, kwargs)
+        return self._execute_kw(model, method, args, kwargs)
+
+    def _intercepted(self, model, method, args, kwargs):
+        """Pass an execute_kw call through the interceptors."""
+        call = Call(self, model, method, args, kwargs)
+        return run_chain(self.interceptors, call, lambda call: self._execute_kw(
+            call.model, call.method, call.args, call.kwargs
+        ))
+
+    def _execute_kw(self, model, method, args, kwargs):
+        """Authenticate if needed and send an execute_kw call."""
         try:
             models = self._get_models_connection()
             
             if not self.uid:
                 self.authenticate()
                 
-            return models.execute_kw(
-                self.db, self.uid, self.password or self.api_key,
-                model, method, args, kwargs
-            )
+            return self._call_kw(models, model, method, args, kwargs)
+        except DgtException:
+            raise
         except xmlrpc.client.Error as e:
+            if is_access_denied(e):
+                self._forget_uid()
             raise DgtException.from_xmlrpc_exception(e)
         except Exception as e:
             raise DgtException(f"Error executing {method} on {model}", e)
     
+    def _forget_uid(self):
+        """Drop a UID the server refused, so the next call authenticates again."""
+        if self._uid_cache_key is not None:
+            logger.debug("Server refused the UID, removing it from the UID cache")
+            self.uid_cache.delete(self._uid_cache_key)
+            self._uid_cache_key = None
+        self.uid = None
+
+    def _retry(self, model, method, func):
+        """Make a server call under the client's retry policy and circuit breaker, measuring each attempt."""
+        if self.metrics is not None:
+            func = self._measured(model, method, func)
+        return self.retry_policy.call(func, method, self.transport.host, self.circuit_breaker)
+
+    def _measured(self, model, method, func):
+        """Wrap a server call to record its metrics."""
+        def call():
+            stats = self.transport.stats
+            previous = stats.last
+            error = None
+            start = time.perf_counter()
+            try:
+                return func()
+            except Exception as e:
+                error = e
+                raise
+            finally:
+                wall_time = time.perf_counter() - start
+                # The transport leaves no statistics when the call failed before a response
+                last = stats.last
+                self.metrics.record(CallMetrics(
+                    self.transport.host, model, method, wall_time,
+                    last if last is not previous else None, error
+                ))
+        return call
+
+    def _send(self, models, model, method, args, kwargs):
+        """Send one execute_kw call to the server, joining an identical one in flight if possible."""
+        def send():
+            return self._retry(model, method, lambda: models.execute_kw(
+                self.db, self.uid, self.password or self.api_key, model, method, args, kwargs
+            ))
+
+        single_flight = self.single_flight
+        if single_flight is None or not single_flight.is_shared(method):
+            return send()
+        key = single_flight.make_key(self.url, self.db, self.uid, model, method, args, kwargs)
+        return single_flight.do(key, send)
+
+    def _call_kw(self, models, model, method, args, kwargs):
+        """
+        Call execute_kw on the server, going through the result cache if the client has one.
+
+        Read calls on the cache's allow-lists are answered from the cache when
+        possible; create, write and unlink drop the cached results of their model.
+        """
+        cache = self.cache
+        if cache is None:
+            return self._send(models, model, method, args, kwargs)
+
+        if cache.is_cacheable(model, method):
+            key = cache.make_key(self.url, self.db, self.uid, model, method, args, kwargs)
+            hit, result = cache.get(key)
+            if hit:
+                return result
+            generation = cache.generation(model)
+            result = self._send(models, model, method, args, kwargs)
+            cache.put(key, result, generation)
+            return result
+
+        try:
+            return self._send(models, model, method, args, kwargs)
+        finally:
+            # Also on failure: the server may have applied the change before the error
+            if method in cache.invalidate_on:
+                cache.invalidate(self.db, model, url=self.url)
+
+    def fields_get(self, model, refresh=False):
+        """
+        Get the field descriptions of a model.
+
+        Descriptions are taken from the client's fields cache when it has one.
+
+        Args:
+            model (str): The model name
+            refresh (bool, optional): Fetch the fields from the server even if cached
+
+        Returns:
+            dict: Field name to attributes ('string', 'type', 'relation', ...)
+
+        Raises:
+            DgtException: If the call fails
+        """
+        cache = self.fields_cache
+        if cache is not None and not refresh:
+            fields = cache.get(self.url, self.db, model)
+            if fields is not None:
+                return fields
+
+        fields = self.execute_kw(model, 'fields_get', [], {'attributes': FIELD_ATTRIBUTES})
+        if cache is not None:
+            cache.put(self.url, self.db, model, fields)
+        return fields
+
+    def _resolve_fields(self, model, fields):
+        """
+        Pick the fields of a read using the fields cache.
+
+        Without a cache the field list is returned unchanged. With one, a
+        missing list becomes every field that is not heavy, and a given list is
+        checked against the model's fields.
+
+        Raises:
+            DgtException: If a field does not exist on the model
+        """
+        if self.fields_cache is None:
+            return fields
+
+        known = self.fields_get(model)
+        if not fields:
+            return self.fields_cache.default_fields(known)
+
+        unknown = [name for name in fields if name not in known]
+        if unknown:
+            raise DgtException(f"Invalid field {', '.join(map(repr, unknown))} on model {model!r}")
+        return fields
+
     def search(self, model, domain, offset=0, limit=None, order=None):
         """
         Search for records of a model.
@@ -221,56 +562,504 @@ class DgteraClient:
             'limit': limit,
             'order': order
         }
-        return self.execute_kw(model, 'search', [[domain]], kwargs)
+        return self.execute_kw(model, 'search', [domain], kwargs)
     
-    def read(self, model, ids, fields=None):
+    def read(self, model, ids, fields=None, row_type=None):
         """
         Read records of a model.
         
         Args:
             model (str): The model name
             ids (list): List of record IDs to read
-            fields (list, optional): List of fields to read, reads all if not specified
+            fields (list, optional): List of fields to read, reads all if not specified,
+                or all but the heavy ones if the client has a fields cache
+            row_type (str, optional): 'slots' or 'tuple' to get compact rows sharing one
+                schema instead of dictionaries, see dgt_rpc.rows
             
         Returns:
-            list: List of dictionaries containing the read data
+            list: List of dictionaries, or rows, containing the read data
             
         Raises:
-            DgtException: If the read fails
+            DgtException: If the read fails or a field does not exist
         """
         kwargs = {}
+        fields = self._resolve_fields(model, fields)
         if fields:
             kwargs['fields'] = fields
-        return self.execute_kw(model, 'read', [[ids]], kwargs)
+        return to_rows(model, self.execute_kw(model, 'read', [ids], kwargs), row_type)
     
-    def search_read(self, model, domain, fields=None, offset=0, limit=None, order=None):
+    def search_read(self, model, domain, fields=None, offset=0, limit=None, order=None, row_type=None):
         """
         Search and read records in a single call.
         
         Args:
             model (str): The model name
             domain (list): The search domain
-            fields (list, optional): List of fields to read
+            fields (list, optional): List of fields to read, reads all if not specified,
+                or all but the heavy ones if the client has a fields cache
             offset (int, optional): Number of records to skip
             limit (int, optional): Maximum number of records to return
             order (str, optional): Field(s) to sort by
+            row_type (str, optional): 'slots' or 'tuple' to get compact rows sharing one
+                schema instead of dictionaries, see dgt_rpc.rows
             
         Returns:
-            list: List of dictionaries containing the read data
+            list: List of dictionaries, or rows, containing the read data
             
         Raises:
-            DgtException: If the search_read fails
+            DgtException: If the search_read fails or a field does not exist
         """
         kwargs = {
             'offset': offset,
             'limit': limit,
             'order': order
         }
+        fields = self._resolve_fields(model, fields)
         if fields:
             kwargs['fields'] = fields
-        return self.execute_kw(model, 'search_read', [[domain]], kwargs)
-    
+        return to_rows(model, self.execute_kw(model, 'search_read', [domain], kwargs), row_type)
+
+    def iter_search_read(self, model, domain, fields=None, page_size=1000, key='id', pages=False,
+                         row_type=None):
+        """
+        Iterate over all records matching a domain, one page at a time.
+
+        Pages are fetched by key ("keyset") instead of by offset: each page
+        asks for records whose key is greater than the last one seen, so every
+        page costs the same on the server and only one page is held in memory.
 
+        Args:
+            model (str): The model name
+            domain (list): The search domain
+            fields (list, optional): List of fields to read; the key and 'id'
+                are added if missing
+            page_size (int, optional): Number of records fetched per call
+            key (str, optional): Ordered, non-null field to page by. Ties are
+                broken by 'id', so non-unique keys such as 'write_date' work
+            pages (bool, optional): Yield whole pages (lists) instead of records
+            row_type (str, optional): 'slots' or 'tuple' to get compact rows instead of
+                dictionaries, see dgt_rpc.rows
+
+        Yields:
+            dict or list: One record, or one page of records if pages is True
+
+        Raises:
+            DgtException: If a search_read fails
+        """
+        if fields:
+            fields = list(fields)
+            for name in (key, 'id'):
+                if name not in fields:
+                    fields.append(name)
+        order = 'id asc' if key == 'id' else f'{key} asc, id asc'
+
+        last = None
+        while True:
+            page_domain = list(domain)
+            if last is not None:
+                if key == 'id':
+                    page_domain.append(('id', '>', last['id']))
+                else:
+                    page_domain += [
+                        '|', (key, '>', last[key]),
+                        '&', (key, '=', last[key]), ('id', '>', last['id']),
+                    ]
+
+            records = self.search_read(model, page_domain, fields=fields,
+                                       limit=page_size, order=order, row_type=row_type)
+            if not records:
+                return
+
+            if pages:
+                yield records
+            else:
+                yield from records
+
+            if len(records) < page_size:
+                return
+            last = records[-1]
+
+    def search_read_columns(self, model, domain, fields=None, page_size=10000):
+        """
+        Read all records matching a domain into one column per field.
+
+        Records are fetched in keyset pages like ``iter_search_read`` and each
+        page is transposed into compact typed columns as soon as it arrives,
+        so a large result never exists as a list of dictionaries. See
+        ``dgt_rpc.columns`` for the storage of each field type.
+
+        Args:
+            model (str): The model name
+            domain (list): The search domain
+            fields (list, optional): Fields to read, every field that is not heavy,
+                relational to many or binary if not specified; 'id' is always read
+            page_size (int, optional): Number of records fetched per call
+
+        Returns:
+            Columns: The records, ordered by ID
+
+        Raises:
+            DgtException: If a field does not exist or a search_read fails
+        """
+        described = self.fields_get(model)
+        if fields:
+            unknown = [name for name in fields if name not in described]
+            if unknown:
+                raise DgtException(f"Invalid field {', '.join(map(repr, unknown))} on model {model!r}")
+        else:
+            excluded = HEAVY_TYPES | {'one2many', 'many2many'}
+            fields = [name for name, field in described.items()
+                      if name != 'id' and field.get('type') not in excluded]
+        fields = [name for name in fields if name != 'id']
+        columns = Columns(model, {name: described[name].get('type') for name in fields})
+        for page in self.iter_search_read(model, domain, fields=fields, page_size=page_size, pages=True):
+            columns.extend(page)
+        return columns
+
+    def aggregate(self, model, domain, groupby, measures, lazy=False, orderby=None, page_size=1000,
+                  columns=False, row_type=None):
+        """
+        Aggregate records on the server with read_group, one row per group.
+
+        Only the groups cross the wire, never the records. Groups are fetched
+        page_size at a time until a short page. See ``dgt_rpc.aggregate`` for
+        the keys of the flat rows.
+
+        Args:
+            model (str): The model name
+            domain (list): The search domain
+            groupby (list): Fields to group by, outermost first; date and datetime
+                fields take a granularity: 'date_order:day', ':week', ':month',
+                ':quarter' or ':year' (month if not given)
+            measures (list): Aggregated fields as '<field>:<aggregate>', e.g.
+                'amount_total:sum' or 'partner_id:count_distinct'; a bare numeric
+                field uses its default aggregate. The record count of each group is
+                always returned under 'count'
+            lazy (bool, optional): Group one level per call, reading the sub-groups
+                of each group with its domain, instead of all levels in one call
+            orderby (str, optional): Order of the groups, by group-by fields and
+                measures, e.g. 'amount_total desc'
+            page_size (int, optional): Number of groups fetched per call
+            columns (bool, optional): Return Columns instead of rows
+            row_type (str, optional): 'slots' or 'tuple' to get compact rows instead of
+                dictionaries, see dgt_rpc.rows
+
+        Returns:
+            list or Columns: The groups
+
+        Raises:
+            DgtException: If a field, granularity or aggregate is invalid, or if a
+                read_group fails
+        """
+        described = self.fields_get(model)
+        levels = parse_groupby(described, groupby)
+        if not levels:
+            raise DgtException("aggregate requires at least one group-by field")
+        parsed = parse_measures(described, measures)
+        fields = [f'{field}:{function}' if function else field for field, function in parsed]
+
+        def read_groups(group_domain, specs):
+            offset = 0
+            while True:
+                kwargs = {'offset': offset, 'limit': page_size, 'lazy': lazy}
+                if orderby:
+                    kwargs['orderby'] = orderby
+                page = self.execute_kw(model, 'read_group', [group_domain, fields, specs], kwargs)
+                yield from page
+                if len(page) < page_size:
+                    return
+                offset += page_size
+
+        def expand(group_domain, depth, parent):
+            specs = [spec for spec, _, _ in levels[depth:]] if not lazy else [levels[depth][0]]
+            for group in read_groups(group_domain, specs):
+                row = dict(parent)
+                flatten(group, levels[depth:depth + len(specs)], described, row)
+                if lazy and depth + 1 < len(levels):
+                    yield from expand(group['__domain'], depth + 1, row)
+                    continue
+                for field, _ in parsed:
+                    row[field] = group.get(field)
+                count = group.get('__count')
+                if count is None:
+                    count = group.get(f'{levels[depth][1]}_count', 0)
+                row['count'] = count
+                yield row
+
+        if columns:
+            result = Columns(model, column_types(described, levels, parsed), with_id=False)
+            page = []
+            for row in expand(domain, 0, {}):
+                page.append(row)
+                if len(page) == page_size:
+                    result.extend(page)
+                    page = []
+            result.extend(page)
+            return result
+        return to_rows(model, list(expand(domain, 0, {})), row_type)
+
+    def browse(self, model, ids):
+        """
+        Get a lazy recordset.
+
+        Field values are read on first access, for all records of the set at
+        once, and kept on the set.
+
+        Args:
+            model (str): The model name
+            ids (int or list): Record ID or IDs
+
+        Returns:
+            RecordSet: The records
+        """
+        return RecordSet(self, model, ids)
+
+    def create(self, model, values):
+        """
+        Create a new record.
+
+        Args:
+            model (str): The model name
+            values (dict): Field values for the new record
+
+        Returns:
+            int: ID of the created record
+
+        Raises:
+            DgtException: If the creation fails
+        """
+        return self.execute_kw(model, 'create', [values])
+
+    def write(self, model, ids, values):
+        """
+        Update existing records.
+
+        Args:
+            model (str): The model name
+            ids (list): List of record IDs to update
+            values (dict): Field values to update
+
+        Returns:
+            bool: True if successful
+
+        Raises:
+            DgtException: If the update fails
+        """
+        return self.execute_kw(model, 'write', [ids, values])
+
+    def unlink(self, model, ids):
+        """
+        Delete records.
+
+        Args:
+            model (str): The model name
+            ids (list): List of record IDs to delete
+
+        Returns:
+            bool: True if successful
+
+        Raises:
+            DgtException: If the deletion fails
+        """
+        return self.execute_kw(model, 'unlink', [ids])
+
+    def create_batch(self, model, values_list, batch_size=100, max_payload=None, max_workers=1):
+        """
+        Create many records with one call per chunk.
+
+        Records are split into chunks of at most ``batch_size`` records and,
+        if ``max_payload`` is given, of roughly at most that many bytes.
+
+        Args:
+            model (str): The model name
+            values_list (list): List of dictionaries containing field values
+            batch_size (int, optional): Maximum number of records per call
+            max_payload (int, optional): Approximate maximum request size in bytes per call
+            max_workers (int, optional): Number of chunks sent in parallel
+
+        Returns:
+            list: IDs of the created records, in the order of values_list
+
+        Raises:
+            BatchError: If some chunks fail. Its ``results`` holds the IDs that
+                were created, with None for records of failed chunks
+        """
+        chunks = list(_chunked(values_list, batch_size, max_payload))
+
+        def create_chunk(chunk):
+            ids = self.execute_kw(model, 'create', [chunk])
+            return ids if isinstance(ids, list) else [ids]
+
+        results = self._run_chunks(model, 'create', create_chunk, chunks, max_workers)
+        return self._flatten_chunk_results(model, 'create', chunks, results)
+
+    def write_batch(self, model, updates, batch_size=100, max_workers=1):
+        """
+        Update many records, grouping records that get identical values.
+
+        Each distinct set of values is written with one ``write`` call per
+        chunk of at most ``batch_size`` record IDs.
+
+        Args:
+            model (str): The model name
+            updates (dict or list): Values to write, either as {id: values}
+                or as a list of (id, values) pairs
+            batch_size (int, optional): Maximum number of records per call
+            max_workers (int, optional): Number of chunks sent in parallel
+
+        Returns:
+            bool: True if all chunks succeeded
+
+        Raises:
+            BatchError: If some chunks fail
+        """
+        if isinstance(updates, dict):
+            updates = updates.items()
+
+        groups = {}
+        for record_id, values in updates:
+            key = _canonical(values)
+            if key not in groups:
+                groups[key] = (values, [])
+            groups[key][1].append(record_id)
+
+        chunks = [
+            (values, ids_chunk)
+            for values, ids in groups.values()
+            for ids_chunk in _chunked(ids, batch_size)
+        ]
+
+        def write_chunk(chunk):
+            values, ids = chunk
+            return self.execute_kw(model, 'write', [ids, values])
+
+        results = self._run_chunks(model, 'write', write_chunk, chunks, max_workers)
+        self._check_chunk_results(model, 'write', chunks, results)
+        return True
+
+    def unlink_batch(self, model, ids, batch_size=1000, max_workers=1):
+        """
+        Delete many records with one call per chunk.
+
+        Args:
+            model (str): The model name
+            ids (list): List of record IDs to delete
+            batch_size (int, optional): Maximum number of records per call
+            max_workers (int, optional): Number of chunks sent in parallel
+
+        Returns:
+            bool: True if all chunks succeeded
+
+        Raises:
+            BatchError: If some chunks fail
+        """
+        chunks = list(_chunked(ids, batch_size))
+
+        def unlink_chunk(chunk):
+            return self.execute_kw(model, 'unlink', [chunk])
+
+        results = self._run_chunks(model, 'unlink', unlink_chunk, chunks, max_workers)
+        self._check_chunk_results(model, 'unlink', chunks, results)
+        return True
+
+    def _run_chunks(self, model, method, func, chunks, max_workers):
+        """
+        Call func on every chunk, optionally in parallel.
+
+        Returns:
+            list: (result, error) for each chunk, in chunk order
+        """
+        def run(chunk):
+            try:
+                return func(chunk), None
+            except DgtException as e:
+                logger.debug(f"Chunk of {method} on {model} failed: {e}")
+                return None, e
+
+        if max_workers <= 1 or len(chunks) <= 1:
+            return [run(chunk) for chunk in chunks]
+
+        # Authenticate once up front instead of racing in every worker
+        if not self.uid:
+            self.authenticate()
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            return list(executor.map(run, chunks))
+
+    @staticmethod
+    def _flatten_chunk_results(model, method, chunks, results):
+        """
+        Join per-chunk result lists in input order.
+
+        Raises:
+            BatchError: If any chunk failed. Its ``results`` holds the joined
+                results with None in place of each item of a failed chunk
+        """
+        flat = []
+        errors = {}
+        for index, (chunk, (result, error)) in enumerate(zip(chunks, results)):
+            if error is not None:
+                errors[index] = error
+                flat.extend([None] * len(chunk))
+            else:
+                flat.extend(result)
+
+        if errors:
+            raise BatchError(
+                f"{len(errors)} of {len(chunks)} chunks of {method} on {model} failed",
+                errors, flat
+            )
+        return flat
+
+    @staticmethod
+    def _check_chunk_results(model, method, chunks, results):
+        """
+        Raise if any chunk of a write or unlink batch failed.
+
+        Raises:
+            BatchError: If any chunk failed. Its ``results`` holds the result
+                of each chunk, None for failed ones
+        """
+        errors = {index: error for index, (_, error) in enumerate(results) if error is not None}
+        if errors:
+            raise BatchError(
+                f"{len(errors)} of {len(chunks)} chunks of {method} on {model} failed",
+                errors, [result for result, _ in results]
+            )
+
+
+def _convert_setting(name, value, convert):
+    """Convert a setting read as text."""
+    try:
+        return convert(value)
+    except ValueError as e:
+        raise DgtException(f"Invalid value for {name}", e)
+
+
+def _canonical(value):
+    """Build a hashable key for a values dictionary."""
+    return json.dumps(value, sort_keys=True, default=repr)
+
+
+def _chunked(items, batch_size, max_payload=None):
+    """
+    Split items into lists of at most batch_size items.
+
+    If max_payload is given, a chunk is also closed before its approximate
+    encoded size would exceed that many bytes. A single item larger than
+    max_payload still gets a chunk of its own.
+    """
+    chunk = []
+    size = 0
+    for item in items:
+        item_size = len(repr(item)) if max_payload else 0
+        if chunk and (len(chunk) >= batch_size or (max_payload and size + item_size > max_payload)):
+            yield chunk
+            chunk = []
+            size = 0
+        chunk.append(item)
+        size += item_size
+    if chunk:
+        yield chunk
 
 
 class DgteraPOSClient(DgteraClient):
@@ -316,6 +1105,56 @@ class DgteraPOSClient(DgteraClient):
         pos_id = pos_config.get('id') if isinstance(pos_config, dict) else pos_config
         
         return self.execute_kw("pos.order", "get_pos_orders", [pos_id, db, limit, include_lines])
+    
+    def get_pos_orders_many(self, pos_configs, db, limit=10, include_lines=False, max_workers=None):
+        """
+        Get orders for many POS configurations concurrently.
+        
+        Results are yielded as soon as each call completes, not in input
+        order. A failing configuration produces a result carrying the error
+        instead of aborting the whole batch.
+        
+        Args:
+            pos_configs (list): POS configuration dictionaries or IDs
+            db (str): The database name
+            limit (int, optional): Maximum number of orders to retrieve per POS
+            include_lines (bool, optional): Whether to include order lines
+            max_workers (int, optional): Maximum number of calls in flight,
+                defaults to the connection pool's per-host limit
+                
+        Yields:
+            PosOrdersResult: The POS configuration with either its orders or the error
+            
+        Raises:
+            DgtException: If authentication fails
+        """
+        pos_configs = list(pos_configs)
+        if not pos_configs:
+            return
+        
+        # Authenticate once up front instead of racing in every worker
+        if not self.uid:
+            self.authenticate()
+        
+        max_workers = max_workers or self.pool.max_per_host
+        executor = ThreadPoolExecutor(max_workers=max_workers)
+        futures = {
+            executor.submit(self.get_pos_orders, pos_config, db, limit, include_lines): pos_config
+            for pos_config in pos_configs
+        }
+        try:
+            for future in as_completed(futures):
+                pos_config = futures[future]
+                try:
+                    yield PosOrdersResult(pos_config, future.result(), None)
+                except DgtException as e:
+                    logger.debug(f"Fetching orders failed for POS {pos_config}: {e}")
+                    yield PosOrdersResult(pos_config, None, e)
+        finally:
+            # Drop calls not started yet if the caller stops iterating early
+            for future in futures:
+                future.cancel()
+            executor.shutdown(wait=False)
 
 
 # Example usage
@@ -360,9 +1199,11 @@ if __name__ == "__main__":
     print("-" * 80)
     
     # Get orders for each POS
-    for pos_config in pos_configs:
+    for result in client.get_pos_orders_many(pos_configs, db_name):
+        pos_config, orders = result.pos_config, result.orders
         try:
-            orders = client.get_pos_orders(pos_config, db_name)
+            if not result.ok:
+                raise result.error
             
             print(f"\nOrders for POS: {pos_config.get('pos_name')} (ID: {pos_config.get('pos_ID')})")
             print("-" * 80)
@@ -0,0 +1,240 @@
+"""
+Column-oriented search_read results.
+
+A ``search_read`` result is a list of dictionaries: every record repeats the
+field names and boxes every value in a Python object, about 100 bytes per
+number. ``DgteraClient.search_read_columns`` instead transposes each page
+into one column per field as soon as it is decoded, so only one page of
+dictionaries exists at a time:
+
+- integer and many2one fields become ``array('q')``, holding the related ID
+  for many2one fields and 0 when empty
+- float and monetary fields become ``array('d')``, NaN when empty
+- boolean fields become ``array('b')`` of 0 and 1
+- datetime fields become ``array('q')`` of seconds since the epoch (UTC, as
+  Odoo stores them) and date fields of days since the epoch, NAT when empty
+- other fields become lists, with None for Odoo's ``False`` on char, text and
+  selection fields
+
+``to_numpy`` wraps the arrays without copying them, and ``to_arrow`` builds
+a pyarrow table from those wrappers. NumPy and pyarrow are only imported by
+these methods.
+"""
+
+import datetime
+import logging
+from array import array
+
+logger = logging.getLogger(__name__)
+
+# Empty date and datetime value, NumPy's NaT
+NAT = -2 ** 63
+
+# array typecodes of the numeric Odoo field types
+TYPECODES = {
+    'id': 'q',
+    'integer': 'q',
+    'many2one': 'q',
+    'float': 'd',
+    'monetary': 'd',
+    'boolean': 'b',
+    'date': 'q',
+    'datetime': 'q',
+}
+
+# NumPy dtypes of the arrays, by Odoo field type
+NUMPY_DTYPES = {
+    'id': 'int64',
+    'integer': 'int64',
+    'many2one': 'int64',
+    'float': 'float64',
+    'monetary': 'float64',
+    'boolean': 'bool',
+    'date': 'datetime64[D]',
+    'datetime': 'datetime64[s]',
+}
+
+STRING_TYPES = frozenset({'char', 'text', 'html', 'selection'})
+
+_EPOCH = datetime.datetime(1970, 1, 1)
+_EPOCH_ORDINAL = _EPOCH.toordinal()
+_SECOND = datetime.timedelta(seconds=1)
+_NAN = float('nan')
+
+
+def _to_datetime(value):
+    if not value:
+        return NAT
+    return (datetime.datetime.fromisoformat(value) - _EPOCH) // _SECOND
+
+
+def _to_date(value):
+    if not value:
+        return NAT
+    return datetime.date.fromisoformat(value[:10]).toordinal() - _EPOCH_ORDINAL
+
+
+def _to_many2one(value):
+    return value[0] if value else 0
+
+
+def _to_float(value):
+    return _NAN if value is False or value is None else value
+
+
+def _to_string(value):
+    return None if value is False else value
+
+
+CONVERTERS = {
+    'id': None,
+    'integer': lambda value: value or 0,
+    'many2one': _to_many2one,
+    'float': _to_float,
+    'monetary': _to_float,
+    'boolean': lambda value: 1 if value else 0,
+    'date': _to_date,
+    'datetime': _to_datetime,
+}
+
+
+class Columns:
+    """
+    Records of a model stored as one column per field.
+
+    Columns are read with ``columns[name]``; iterating yields the field
+    names, like a dictionary. Exported NumPy arrays share memory with the
+    columns, which therefore cannot be extended while an export is alive.
+    """
+
+    def __init__(self, model, types, with_id=True):
+        """
+        Initialize empty columns.
+
+        Args:
+            model (str): The model name
+            types (dict): Field name to Odoo field type, in column order
+            with_id (bool, optional): Add an 'id' column, False for rows that are
+                not records such as aggregates
+        """
+        self.model = model
+        self.types = dict(types)
+        if with_id:
+            self.types['id'] = 'id'
+        self.columns = {
+            name: array(TYPECODES[field_type]) if field_type in TYPECODES else []
+            for name, field_type in self.types.items()
+        }
+        self._length = 0
+
+    def extend(self, records):
+        """
+        Append records, converting their values.
+
+        Args:
+            records (list): Records as returned by search_read
+        """
+        for name, column in self.columns.items():
+            field_type = self.types[name]
+            convert = CONVERTERS.get(field_type)
+            values = (record[name] for record in records)
+            if field_type in STRING_TYPES:
+                column.extend(_to_string(value) for value in values)
+            elif convert is not None:
+                column.extend(convert(value) for value in values)
+            else:
+                column.extend(values)
+        self._length += len(records)
+
+    def __len__(self):
+        return self._length
+
+    def __getitem__(self, name):
+        return self.columns[name]
+
+    def __contains__(self, name):
+        return name in self.columns
+
+    def __iter__(self):
+        return iter(self.columns)
+
+    def keys(self):
+        return self.columns.keys()
+
+    def items(self):
+        return self.columns.items()
+
+    def rows(self):
+        """
+        Iterate over the records as dictionaries of the stored values.
+
+        Yields:
+            dict: One record
+        """
+        names = list(self.columns)
+        for values in zip(*self.columns.values()):
+            yield dict(zip(names, values))
+
+    def to_numpy(self):
+        """
+        Export the columns as NumPy arrays.
+
+        Numeric, boolean, date and datetime columns are wrapped without
+        copying; other columns become arrays of objects.
+
+        Returns:
+            dict: Field name to numpy.ndarray
+
+        Raises:
+            ImportError: If NumPy is not installed
+        """
+        try:
+            import numpy
+        except ImportError as e:
+            raise ImportError("Columns.to_numpy requires NumPy") from e
+
+        result = {}
+        for name, column in self.columns.items():
+            field_type = self.types[name]
+            if field_type in TYPECODES:
+                storage = numpy.frombuffer(column, dtype=column.typecode) if column else \
+                    numpy.empty(0, dtype=column.typecode)
+                result[name] = storage.view(NUMPY_DTYPES[field_type])
+            else:
+                values = numpy.empty(len(column), dtype=object)
+                values[:] = column
+                result[name] = values
+        return result
+
+    def to_arrow(self):
+        """
+        Export the columns as a pyarrow Table.
+
+        Numeric columns without empty values are shared with the NumPy
+        export; NaN, NaT and many2one IDs of 0 become nulls.
+
+        Returns:
+            pyarrow.Table: The table
+
+        Raises:
+            ImportError: If pyarrow or NumPy is not installed
+        """
+        try:
+            import pyarrow
+        except ImportError as e:
+            raise ImportError("Columns.to_arrow requires pyarrow") from e
+
+        arrays = {}
+        for name, values in self.to_numpy().items():
+            field_type = self.types[name]
+            if field_type == 'many2one':
+                mask = values == 0
+                arrays[name] = pyarrow.array(values, mask=mask if mask.any() else None)
+            elif field_type in TYPECODES:
+                arrays[name] = pyarrow.array(values, from_pandas=True)
+            else:
+                arrays[name] = pyarrow.array(list(values))
+        return pyarrow.table(arrays)
+
+    def __repr__(self):
+        return f"Columns({self.model}, {len(self.columns)} fields, {self._length} rows)"
@@ -0,0 +1,188 @@
+"""
+gzip compression of RPC request and response bodies.
+
+Odoo answers with ``Content-Encoding: gzip`` when the client sends
+``Accept-Encoding: gzip``; XML-RPC and JSON payloads are highly repetitive
+and usually shrink by a factor of ten or more. The helpers in this module
+compress request bodies above a size threshold, decompress responses chunk
+by chunk as they are read from the socket, and keep per-call statistics of
+what compression saved.
+"""
+
+import gzip
+import threading
+import zlib
+
+# Compression level for request bodies; higher levels cost CPU for little gain on XML
+COMPRESS_LEVEL = 6
+
+
+class CallStats:
+    """
+    Sizes of one RPC call's request and response, before and after compression.
+
+    Transports also record how long the call spent in each phase, see
+    ``dgt_rpc.metrics``.
+    """
+
+    __slots__ = ('request_size', 'request_wire_size', 'response_size', 'response_wire_size',
+                 'encode_time', 'wait_time', 'decode_time')
+
+    def __init__(self, request_size=0, request_wire_size=0, response_size=0, response_wire_size=0,
+                 encode_time=0.0):
+        """
+        Initialize the call statistics.
+
+        Args:
+            request_size (int, optional): Uncompressed request body size in bytes
+            request_wire_size (int, optional): Request body size sent on the wire
+            response_size (int, optional): Decompressed response body size in bytes
+            response_wire_size (int, optional): Response body size received on the wire
+            encode_time (float, optional): Seconds spent serializing the request
+        """
+        self.request_size = request_size
+        self.request_wire_size = request_wire_size
+        self.response_size = response_size
+        self.response_wire_size = response_wire_size
+        # Seconds spent encoding and compressing the request, from sending it to the
+        # response headers, and reading and decoding the response body
+        self.encode_time = encode_time
+        self.wait_time = 0.0
+        self.decode_time = 0.0
+
+    @property
+    def size(self):
+        """Total uncompressed bytes of the call."""
+        return self.request_size + self.response_size
+
+    @property
+    def wire_size(self):
+        """Total bytes of the call that went over the network."""
+        return self.request_wire_size + self.response_wire_size
+
+    @property
+    def bytes_saved(self):
+        """Bytes that compression kept off the network."""
+        return self.size - self.wire_size
+
+    @property
+    def ratio(self):
+        """Uncompressed size divided by wire size, 1.0 when nothing was compressed."""
+        return self.size / self.wire_size if self.wire_size else 1.0
+
+    def __repr__(self):
+        return (f"CallStats(request={self.request_size}/{self.request_wire_size}, "
+                f"response={self.response_size}/{self.response_wire_size}, "
+                f"ratio={self.ratio:.2f}, bytes_saved={self.bytes_saved})")
+
+
+class CompressionStats:
+    """
+    Thread-safe totals of the compression statistics of a transport.
+
+    ``last`` holds the CallStats of the most recent call made by the current
+    thread, so concurrent callers sharing a transport each see their own call.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        self.calls = 0
+        self.totals = CallStats()
+
+    def record(self, call):
+        """
+        Add the statistics of a finished call.
+
+        Args:
+            call (CallStats): The call's statistics
+        """
+        self._local.last = call
+        with self._lock:
+            self.calls += 1
+            totals = self.totals
+            totals.request_size += call.request_size
+            totals.request_wire_size += call.request_wire_size
+            totals.response_size += call.response_size
+            totals.response_wire_size += call.response_wire_size
+
+    @property
+    def last(self):
+        """CallStats of the last call made by the current thread, or None."""
+        return getattr(self._local, 'last', None)
+
+    @property
+    def bytes_saved(self):
+        """Bytes that compression kept off the network over all calls."""
+        return self.totals.bytes_saved
+
+    @property
+    def ratio(self):
+        """Overall compression ratio over all calls."""
+        return self.totals.ratio
+
+    def reset(self):
+        """Forget all recorded calls."""
+        with self._lock:
+            self.calls = 0
+            self.totals = CallStats()
+
+
+def compress_body(body, threshold):
+    """
+    gzip a request body if it is larger than a threshold.
+
+    Args:
+        body (bytes): The request body
+        threshold (int): Minimum size in bytes to compress, None to never compress
+
+    Returns:
+        tuple: The body to send and a flag telling whether it was compressed
+    """
+    if threshold is None or len(body) < threshold:
+        return body, False
+    return gzip.compress(body, COMPRESS_LEVEL), True
+
+
+def iter_body(response, read_size, call):
+    """
+    Read a response body chunk by chunk, decompressing it as it arrives.
+
+    Args:
+        response (http.client.HTTPResponse): The response to read
+        read_size (int): Bytes to read from the socket at a time
+        call (CallStats): Statistics updated with the response sizes
+
+    Yields:
+        bytes: Decoded chunks of the body
+
+    Raises:
+        ValueError: If a gzip encoded body is corrupt or truncated
+    """
+    decompressor = None
+    if response.getheader('Content-Encoding', '') == 'gzip':
+        decompressor = zlib.decompressobj(16 + zlib.MAX_WBITS)
+
+    read = response.read
+    while True:
+        chunk = read(read_size)
+        if not chunk:
+            break
+        call.response_wire_size += len(chunk)
+        if decompressor is not None:
+            try:
+                chunk = decompressor.decompress(chunk)
+            except zlib.error as e:
+                raise ValueError(f"invalid data: {e}") from e
+            if not chunk:
+                continue
+        call.response_size += len(chunk)
+        yield chunk
+
+    if decompressor is not None:
+        if not decompressor.eof:
+            raise ValueError("invalid data: truncated gzip stream")
+        tail = decompressor.flush()
+        if tail:
+            call.response_size += len(tail)
+            yield tail
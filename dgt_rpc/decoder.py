@@ -0,0 +1,249 @@
+"""
+A faster XML-RPC response decoder.
+
+``xmlrpc.client`` decodes responses with a generic Unmarshaller whose event
+handlers are bound methods doing attribute and dictionary lookups for every
+XML element. This module builds the same result with handlers that are
+closures over local state, lets expat coalesce character data, and interns
+struct member names so the field names repeated in every record of a
+``search_read`` result share one string object.
+
+The output is identical to ``xmlrpc.client.getparser()``: same types, same
+``Fault`` and ``ResponseError`` behaviour.
+"""
+
+from decimal import Decimal
+from xml.parsers import expat
+import base64
+import xmlrpc.client
+
+# Size of the buffer expat uses to coalesce character data
+BUFFER_SIZE = 65536
+
+
+class FastUnmarshaller:
+    """
+    Build Python values from XML-RPC parser events.
+
+    Drop-in replacement for ``xmlrpc.client.Unmarshaller``; the event handlers
+    are exposed as the ``start``, ``data`` and ``end`` attributes.
+    """
+
+    def __init__(self, use_datetime=False, use_builtin_types=False):
+        """
+        Initialize the unmarshaller.
+
+        Args:
+            use_datetime (bool, optional): Decode dates as datetime objects
+            use_builtin_types (bool, optional): Decode dates and binary data as builtin types
+        """
+        self._type = None
+        self._methodname = None
+        self._stack = stack = []
+        self._marks = marks = []
+        self._keys = keys = {}
+        data = []
+        in_value = False
+
+        append = stack.append
+        join = ''.join
+        use_datetime = use_builtin_types or use_datetime
+        Binary = xmlrpc.client.Binary
+        DateTime = xmlrpc.client.DateTime
+        datetime_type = xmlrpc.client._datetime_type
+        decodebytes = base64.decodebytes
+
+        def end_nil():
+            append(None)
+
+        def end_boolean():
+            value = join(data)
+            if value == '0':
+                append(False)
+            elif value == '1':
+                append(True)
+            else:
+                raise TypeError("bad boolean value")
+
+        def end_int():
+            append(int(join(data)))
+
+        def end_double():
+            append(float(join(data)))
+
+        def end_bigdecimal():
+            append(Decimal(join(data)))
+
+        def end_string():
+            append(join(data))
+
+        def end_name():
+            # Struct keys repeat in every record, keep a single copy of each
+            name = join(data)
+            append(keys.setdefault(name, name))
+
+        def end_array():
+            mark = marks.pop()
+            stack[mark:] = [stack[mark:]]
+
+        def end_struct():
+            mark = marks.pop()
+            items = stack[mark:]
+            stack[mark:] = [dict(zip(items[::2], items[1::2]))]
+
+        def end_base64():
+            raw = decodebytes(join(data).encode('ascii'))
+            append(raw if use_builtin_types else Binary(raw))
+
+        def end_datetime():
+            text = join(data)
+            value = DateTime()
+            value.decode(text)
+            append(datetime_type(text) if use_datetime else value)
+
+        def end_params():
+            self._type = 'params'
+
+        def end_fault():
+            self._type = 'fault'
+
+        def end_methodname():
+            self._methodname = join(data)
+            self._type = 'methodName'
+
+        dispatch = {
+            'nil': end_nil,
+            'boolean': end_boolean,
+            'i1': end_int,
+            'i2': end_int,
+            'i4': end_int,
+            'i8': end_int,
+            'int': end_int,
+            'biginteger': end_int,
+            'double': end_double,
+            'float': end_double,
+            'bigdecimal': end_bigdecimal,
+            'string': end_string,
+            'name': end_name,
+            'array': end_array,
+            'struct': end_struct,
+            'base64': end_base64,
+            'dateTime.iso8601': end_datetime,
+            'params': end_params,
+            'fault': end_fault,
+            'methodName': end_methodname,
+        }
+
+        def start(tag, attrs):
+            nonlocal in_value
+            if tag == 'value':
+                # Most frequent element, handled first
+                data.clear()
+                in_value = True
+                return
+            if ':' in tag:
+                tag = tag.split(':')[-1]
+            if tag == 'array' or tag == 'struct':
+                marks.append(len(stack))
+            data.clear()
+            if in_value and tag not in dispatch and tag != 'value':
+                raise xmlrpc.client.ResponseError("unknown tag %r" % tag)
+            in_value = tag == 'value'
+
+        def end(tag):
+            nonlocal in_value
+            if tag == 'value':
+                # A value element with no type element inside is a string
+                if in_value:
+                    append(join(data))
+                    in_value = False
+                return
+            f = dispatch.get(tag)
+            if f is None:
+                if ':' not in tag:
+                    return
+                f = dispatch.get(tag.split(':')[-1])
+                if f is None:
+                    return
+            f()
+            in_value = False
+
+        self.start = start
+        self.end = end
+        self.data = data.append
+
+    def close(self):
+        """
+        Return the decoded values.
+
+        Raises:
+            xmlrpc.client.Fault: If the response is a fault
+            xmlrpc.client.ResponseError: If the response is incomplete
+        """
+        if self._type is None or self._marks:
+            raise xmlrpc.client.ResponseError()
+        if self._type == 'fault':
+            raise xmlrpc.client.Fault(**self._stack[0])
+        result = tuple(self._stack)
+        # The handlers form a reference cycle with the unmarshaller, which is only
+        # collected by the garbage collector: drop the values now so the result
+        # is not kept alive once the caller has replaced it, e.g. by compact rows
+        self._stack.clear()
+        return result
+
+    def getmethodname(self):
+        return self._methodname
+
+
+class FastParser:
+    """Feeds raw XML to a FastUnmarshaller through expat."""
+
+    def __init__(self, target):
+        self._parser = parser = expat.ParserCreate(None, None)
+        parser.buffer_text = True
+        parser.buffer_size = BUFFER_SIZE
+        parser.StartElementHandler = target.start
+        parser.EndElementHandler = target.end
+        parser.CharacterDataHandler = target.data
+
+    def feed(self, data):
+        self._parser.Parse(data, False)
+
+    def close(self):
+        parser = self._parser
+        if parser is not None:
+            self._parser = None
+            parser.Parse(b"", True)
+
+
+def getparser(use_datetime=False, use_builtin_types=False):
+    """
+    Create a parser and unmarshaller pair, like ``xmlrpc.client.getparser``.
+
+    Args:
+        use_datetime (bool, optional): Decode dates as datetime objects
+        use_builtin_types (bool, optional): Decode dates and binary data as builtin types
+
+    Returns:
+        tuple: The parser and the unmarshaller
+    """
+    target = FastUnmarshaller(use_datetime=use_datetime, use_builtin_types=use_builtin_types)
+    return FastParser(target), target
+
+
+def loads(data, use_datetime=False, use_builtin_types=False):
+    """
+    Decode an XML-RPC packet, like ``xmlrpc.client.loads``.
+
+    Args:
+        data (bytes or str): The XML-RPC packet
+        use_datetime (bool, optional): Decode dates as datetime objects
+        use_builtin_types (bool, optional): Decode dates and binary data as builtin types
+
+    Returns:
+        tuple: The decoded params and the method name, if any
+    """
+    parser, target = getparser(use_datetime=use_datetime, use_builtin_types=use_builtin_types)
+    parser.feed(data)
+    parser.close()
+    return target.close(), target.getmethodname()
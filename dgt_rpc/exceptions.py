@@ -46,3 +46,21 @@ class DgtException(Exception):
         else:
             return cls(f"XML-RPC Error", exception)
 
+
+
+class BatchError(DgtException):
+    """Raised when some chunks of a batch operation fail."""
+    
+    def __init__(self, message, errors, results=None):
+        """
+        Initialize a new BatchError.
+        
+        Args:
+            message (str): The error message
+            errors (dict): Exception raised by each failed chunk, keyed by chunk index
+            results (list, optional): Results of the batch, with None for failed entries
+        """
+        self.errors = errors
+        self.results = results
+        first_error = errors[min(errors)] if errors else None
+        super().__init__(message, first_error)
@@ -0,0 +1,200 @@
+"""
+Interceptors around client calls.
+
+``execute``, ``execute_kw`` and ``authenticate`` pass through the client's
+ordered list of interceptors, so cross-cutting concerns such as tracing, rate
+limiting or custom caching compose without subclassing the client.
+
+An interceptor overrides any of three hooks:
+
+- ``before(call)`` runs before the call. It may change ``call.args`` and
+  ``call.kwargs``, or answer the call itself with ``call.respond(result)``,
+  in which case the server is not called.
+- ``after(call, result)`` runs after a successful call and returns the
+  result, possibly replaced.
+- ``on_error(call, error)`` runs when the call failed. It may raise another
+  error or recover with ``call.respond(result)``; otherwise the error
+  propagates.
+
+Interceptors nest like middleware: ``before`` hooks run in list order, and
+``after`` and ``on_error`` hooks in reverse order, for the interceptors whose
+``before`` ran. Overriding ``intercept`` instead gives full control, for
+example to call the rest of the chain several times.
+"""
+
+import logging
+import math
+import threading
+import time
+
+logger = logging.getLogger(__name__)
+
+
+class Call:
+    """A call going through the interceptor chain."""
+
+    __slots__ = ('client', 'model', 'method', 'args', 'kwargs', 'result', 'responded', 'context')
+
+    def __init__(self, client, model, method, args, kwargs):
+        """
+        Initialize the call.
+
+        Args:
+            client (DgteraClient): The client making the call
+            model (str): The model name, None for ``authenticate``
+            method (str): The method name
+            args (list): Positional arguments, as for ``execute_kw``
+            kwargs (dict): Keyword arguments, as for ``execute_kw``
+        """
+        self.client = client
+        self.model = model
+        self.method = method
+        self.args = args
+        self.kwargs = kwargs
+        self.result = None
+        self.responded = False
+        # Free for interceptors to keep state between their hooks
+        self.context = {}
+
+    def respond(self, result):
+        """
+        Answer the call without calling the server, or recover from an error.
+
+        Args:
+            result: The result returned to the caller
+        """
+        self.result = result
+        self.responded = True
+
+    def __repr__(self):
+        return f"Call({self.model}.{self.method})"
+
+
+class Interceptor:
+    """Base class of interceptors; the hooks do nothing by default."""
+
+    def before(self, call):
+        """
+        Run before the call.
+
+        Args:
+            call (Call): The call, see ``Call.respond`` to answer it
+        """
+
+    def after(self, call, result):
+        """
+        Run after a successful call.
+
+        Args:
+            call (Call): The call
+            result: The result of the call
+
+        Returns:
+            The result passed on to the previous interceptors and the caller
+        """
+        return result
+
+    def on_error(self, call, error):
+        """
+        Run when the call failed.
+
+        Args:
+            call (Call): The call, see ``Call.respond`` to recover
+            error (Exception): The error
+        """
+
+    def intercept(self, call, proceed):
+        """
+        Run the hooks around the rest of the chain.
+
+        Args:
+            call (Call): The call
+            proceed (callable): Calls the next interceptors and the server, without
+                arguments, and returns the result
+
+        Returns:
+            The result of the call
+        """
+        call.responded = False
+        self.before(call)
+        if call.responded:
+            result = call.result
+        else:
+            try:
+                result = proceed()
+            except Exception as e:
+                # An inner interceptor may have answered before failing
+                call.responded = False
+                self.on_error(call, e)
+                if not call.responded:
+                    raise
+                result = call.result
+        return self.after(call, result)
+
+
+def run_chain(interceptors, call, terminal):
+    """
+    Pass a call through interceptors.
+
+    Args:
+        interceptors (sequence): The interceptors, outermost first
+        call (Call): The call
+        terminal (callable): Makes the call once all interceptors let it through,
+            called with the Call
+
+    Returns:
+        The result of the call
+    """
+    count = len(interceptors)
+
+    def proceed(index):
+        if index == count:
+            return terminal(call)
+        return interceptors[index].intercept(call, lambda: proceed(index + 1))
+
+    return proceed(0)
+
+
+class RateLimiter(Interceptor):
+    """
+    Limits the rate of calls with a token bucket, waiting when it is empty.
+
+    One instance may be shared by several clients to limit their combined
+    rate, for example to stay within a hosting provider's quota.
+    """
+
+    def __init__(self, rate, burst=None):
+        """
+        Initialize the rate limiter.
+
+        Args:
+            rate (float): Calls allowed per second on average
+            burst (int, optional): Calls allowed at once after a quiet period,
+                rate rounded up if not specified
+        """
+        self.rate = rate
+        self.burst = burst if burst is not None else max(1, math.ceil(rate))
+        self._tokens = float(self.burst)
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def before(self, call):
+        self.acquire()
+
+    def acquire(self):
+        """
+        Take a token, waiting until one is available.
+
+        Returns:
+            float: Seconds waited
+        """
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+            self._updated = now
+            self._tokens -= 1
+            wait = -self._tokens / self.rate if self._tokens < 0 else 0.0
+        if wait:
+            logger.debug(f"Rate limited, waiting {wait:.3f}s")
+            time.sleep(wait)
+        return wait
@@ -0,0 +1,221 @@
+"""
+Automatic batching of reads by ID.
+
+Request handlers that each read a few records by ID send many tiny ``read``
+calls. A ReadLoader collects the reads of the same model and fields made
+within a short window, sends a single ``read`` with the union of their IDs
+and gives every caller only the records it asked for, as Facebook's
+DataLoader does for GraphQL resolvers.
+
+ReadLoader batches reads made from several threads; AsyncReadLoader batches
+reads made from several tasks of an event loop.
+"""
+
+import asyncio
+import logging
+import threading
+
+logger = logging.getLogger(__name__)
+
+
+class _Batch:
+    """The IDs collected for one read and its outcome."""
+
+    __slots__ = ('ids', 'full', 'done', 'rows', 'error', 'task')
+
+    def __init__(self, full, done):
+        # Dictionary used as an ordered set
+        self.ids = {}
+        self.full = full
+        self.done = done
+        self.rows = None
+        self.error = None
+        self.task = None
+
+    def add(self, ids):
+        for record_id in ids:
+            self.ids[record_id] = None
+
+
+class _BaseLoader:
+    """Batch bookkeeping shared by the threaded and asyncio loaders."""
+
+    def __init__(self, client, window=0.005, max_batch=1000):
+        """
+        Initialize the loader.
+
+        Args:
+            client: Client used to read the records
+            window (float, optional): Seconds a batch waits for more reads before it is sent
+            max_batch (int, optional): Number of IDs that sends a batch without waiting
+                for the end of the window
+        """
+        self.client = client
+        self.window = window
+        self.max_batch = max_batch
+        # (model, fields) -> batch collecting IDs
+        self._pending = {}
+        self.batches = 0
+        self.requests = 0
+
+    def stats(self):
+        """
+        Return the batching statistics.
+
+        Returns:
+            dict: Numbers of reads requested and of read calls sent
+        """
+        return {'requests': self.requests, 'batches': self.batches}
+
+    def _join(self, model, ids, fields, make_batch):
+        """Add IDs to the open batch of (model, fields). Returns its key, the batch and whether it is new."""
+        key = (model, tuple(fields) if fields else None)
+        batch = self._pending.get(key)
+        leader = batch is None
+        if leader:
+            batch = self._pending[key] = make_batch()
+        batch.add(ids)
+        self.requests += 1
+        if len(batch.ids) >= self.max_batch:
+            # Later reads start a new batch while this one is sent
+            del self._pending[key]
+            batch.full.set()
+        return key, batch, leader
+
+    def _close(self, key, batch):
+        """Stop a batch from collecting IDs, if it still is."""
+        if self._pending.get(key) is batch:
+            del self._pending[key]
+        self.batches += 1
+
+    def _rows(self, batch, ids):
+        """Select a caller's records from the result of its batch."""
+        if batch.error is not None:
+            raise batch.error
+        rows = batch.rows
+        return [dict(rows[record_id]) for record_id in ids if record_id in rows]
+
+    @staticmethod
+    def _index(rows):
+        return {row['id']: row for row in rows}
+
+
+class ReadLoader(_BaseLoader):
+    """
+    Batches ``read`` calls made by threads sharing a client.
+
+    The first read of a batch waits for the window, then sends the batch for
+    all callers; the others wait for its result. Each caller receives shallow
+    copies of its records.
+    """
+
+    def __init__(self, client, window=0.005, max_batch=1000):
+        super().__init__(client, window, max_batch)
+        self._lock = threading.Lock()
+
+    def read(self, model, ids, fields=None):
+        """
+        Read records, batched with concurrent reads of the same model and fields.
+
+        Args:
+            model (str): The model name
+            ids (list): Record IDs
+            fields (list, optional): Fields to read, as for ``client.read``
+
+        Returns:
+            list: The records that exist, in the order of ids
+
+        Raises:
+            DgtException: If the batched read fails
+        """
+        if isinstance(ids, int):
+            ids = [ids]
+        with self._lock:
+            key, batch, leader = self._join(
+                model, ids, fields, lambda: _Batch(threading.Event(), threading.Event())
+            )
+        if leader:
+            batch.full.wait(self.window)
+            with self._lock:
+                self._close(key, batch)
+            self._send(model, fields, batch)
+        else:
+            batch.done.wait()
+        return self._rows(batch, ids)
+
+    def load(self, model, record_id, fields=None):
+        """
+        Read one record, batched with concurrent reads.
+
+        Returns:
+            dict: The record, or None if it does not exist
+        """
+        rows = self.read(model, [record_id], fields)
+        return rows[0] if rows else None
+
+    def _send(self, model, fields, batch):
+        try:
+            logger.debug(f"Reading {len(batch.ids)} {model} records in one batch")
+            batch.rows = self._index(self.client.read(model, list(batch.ids), fields))
+        except BaseException as e:
+            batch.error = e
+        finally:
+            batch.done.set()
+
+
+class AsyncReadLoader(_BaseLoader):
+    """
+    Batches ``read`` calls made by tasks sharing an asyncio client.
+
+    A loader belongs to the event loop it is first used in.
+    """
+
+    async def read(self, model, ids, fields=None):
+        """
+        Read records, batched with concurrent reads of the same model and fields.
+
+        Args:
+            model (str): The model name
+            ids (list): Record IDs
+            fields (list, optional): Fields to read, as for ``client.read``
+
+        Returns:
+            list: The records that exist, in the order of ids
+
+        Raises:
+            DgtException: If the batched read fails
+        """
+        if isinstance(ids, int):
+            ids = [ids]
+        key, batch, leader = self._join(
+            model, ids, fields, lambda: _Batch(asyncio.Event(), asyncio.Event())
+        )
+        if leader:
+            # Sent by a task of its own, so cancelling a caller does not strand the others
+            batch.task = asyncio.ensure_future(self._dispatch(key, model, fields, batch))
+        await batch.done.wait()
+        return self._rows(batch, ids)
+
+    async def load(self, model, record_id, fields=None):
+        """
+        Read one record, batched with concurrent reads.
+
+        Returns:
+            dict: The record, or None if it does not exist
+        """
+        rows = await self.read(model, [record_id], fields)
+        return rows[0] if rows else None
+
+    async def _dispatch(self, key, model, fields, batch):
+        try:
+            await asyncio.wait_for(batch.full.wait(), self.window)
+        except asyncio.TimeoutError:
+            pass
+        self._close(key, batch)
+        try:
+            logger.debug(f"Reading {len(batch.ids)} {model} records in one batch")
+            batch.rows = self._index(await self.client.read(model, list(batch.ids), fields))
+        except Exception as e:
+            batch.error = e
+        finally:
+            batch.done.set()
@@ -0,0 +1,174 @@
+"""
+Cached model metadata.
+
+``fields_get`` describes every field of a model and rarely changes, yet a
+client needs it to know which fields are cheap to read. FieldsCache keeps the
+descriptions per ``(url, db, model)`` in memory and, optionally, in a directory
+on disk so short-lived scripts do not fetch them again on every run.
+"""
+
+import json
+import logging
+import os
+import tempfile
+import threading
+import time
+import urllib.parse
+
+logger = logging.getLogger(__name__)
+
+# Field attributes requested from fields_get, enough to plan reads and validate names
+FIELD_ATTRIBUTES = ['string', 'type', 'relation', 'required', 'readonly', 'store']
+
+# Field types left out of reads that do not name their fields
+HEAVY_TYPES = frozenset({'binary', 'html', 'text'})
+
+
+class FieldsCache:
+    """
+    A thread-safe cache of fields_get results with a time-to-live.
+
+    Entries are keyed on ``(url, db, model)``, so a cache may be shared by
+    clients of several servers.
+    """
+
+    def __init__(self, ttl=3600.0, path=None, heavy_types=HEAVY_TYPES):
+        """
+        Initialize the cache.
+
+        Args:
+            ttl (float, optional): Seconds a model's fields stay valid, None to keep
+                them until invalidated
+            path (str, optional): Directory where fields are also stored as JSON files,
+                fields are only kept in memory if not specified
+            heavy_types (iterable, optional): Field types skipped by default reads
+        """
+        self.ttl = ttl
+        self.path = os.path.expanduser(path) if path else None
+        self.heavy_types = frozenset(heavy_types)
+        self._entries = {}
+        self._lock = threading.Lock()
+        if self.path:
+            os.makedirs(self.path, exist_ok=True)
+
+    def get(self, url, db, model):
+        """
+        Look up the fields of a model.
+
+        Args:
+            url (str): The server URL
+            db (str): The database name
+            model (str): The model name
+
+        Returns:
+            dict: The fields_get result, or None if it is not cached or has expired
+        """
+        key = (url, db, model)
+        with self._lock:
+            entry = self._entries.get(key)
+        if entry is None and self.path:
+            entry = self._load(url, db, model)
+            if entry is not None:
+                with self._lock:
+                    self._entries[key] = entry
+        if entry is None:
+            return None
+
+        fetched, fields = entry
+        if self.ttl is not None and fetched + self.ttl <= time.time():
+            self.invalidate(db, model, url=url)
+            return None
+        return fields
+
+    def put(self, url, db, model, fields):
+        """
+        Store the fields of a model.
+
+        Args:
+            url (str): The server URL
+            db (str): The database name
+            model (str): The model name
+            fields (dict): The fields_get result
+        """
+        entry = (time.time(), fields)
+        with self._lock:
+            self._entries[(url, db, model)] = entry
+        if self.path:
+            self._save(url, db, model, entry)
+
+    def invalidate(self, db=None, model=None, url=None):
+        """
+        Forget cached fields, for example after installing a module.
+
+        Args:
+            db (str, optional): Only forget fields of this database
+            model (str, optional): Only forget fields of this model
+            url (str, optional): Only forget fields of this server
+        """
+        with self._lock:
+            keys = [
+                key for key in self._entries
+                if (url is None or key[0] == url) and (db is None or key[1] == db)
+                and (model is None or key[2] == model)
+            ]
+            for key in keys:
+                del self._entries[key]
+        if self.path:
+            for name in os.listdir(self.path):
+                if not name.endswith('.json'):
+                    continue
+                # '@' is always quoted in the names, see _file
+                parts = [urllib.parse.unquote(part) for part in name[:-len('.json')].split('@')]
+                if len(parts) != 3:
+                    continue
+                file_url, file_db, file_model = parts
+                if ((url is None or file_url == url) and (db is None or file_db == db)
+                        and (model is None or file_model == model)):
+                    try:
+                        os.remove(os.path.join(self.path, name))
+                    except FileNotFoundError:
+                        pass
+
+    def default_fields(self, fields):
+        """
+        Select the fields a read without a field list should return.
+
+        Args:
+            fields (dict): The fields_get result of a model
+
+        Returns:
+            list: Names of the fields whose type is not heavy
+        """
+        return [name for name, field in fields.items() if field.get('type') not in self.heavy_types]
+
+    def _file(self, url, db, model):
+        """Path of the JSON file holding the fields of a model."""
+        name = '@'.join(urllib.parse.quote(part or '', safe='') for part in (url, db, model)) + '.json'
+        return os.path.join(self.path, name)
+
+    def _load(self, url, db, model):
+        """Read an entry from disk, None if it is missing or unreadable."""
+        try:
+            with open(self._file(url, db, model), encoding='utf-8') as f:
+                data = json.load(f)
+            return data['fetched'], data['fields']
+        except FileNotFoundError:
+            return None
+        except (OSError, ValueError, KeyError, TypeError) as e:
+            logger.warning(f"Ignoring unreadable fields cache for {model}: {e}")
+            return None
+
+    def _save(self, url, db, model, entry):
+        """Write an entry to disk atomically."""
+        fetched, fields = entry
+        fd, tmp = tempfile.mkstemp(dir=self.path, suffix='.tmp')
+        try:
+            with os.fdopen(fd, 'w', encoding='utf-8') as f:
+                json.dump({'fetched': fetched, 'fields': fields}, f)
+            os.replace(tmp, self._file(url, db, model))
+        except OSError as e:
+            logger.warning(f"Could not write fields cache for {model}: {e}")
+            try:
+                os.remove(tmp)
+            except OSError:
+                pass
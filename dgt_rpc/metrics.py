@@ -0,0 +1,290 @@
+"""
+Per-call performance metrics.
+
+A client given a Metrics instance records every RPC it sends: the wall time,
+how that time split between encoding the request, waiting for the server
+(network and server processing, up to the response headers) and reading and
+decoding the response, and the bytes sent and received. Calls are aggregated
+into latency and size histograms per model and method, which can be read as
+a snapshot or exported in the Prometheus text format. Callbacks receive each
+call as it finishes, to feed other monitoring systems, and calls slower than
+a threshold are logged on the ``dgt_rpc.slow`` logger.
+"""
+
+import bisect
+import logging
+import threading
+
+logger = logging.getLogger(__name__)
+slow_logger = logging.getLogger('dgt_rpc.slow')
+
+# Upper bounds in seconds of the latency histogram buckets
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+# Upper bounds in bytes of the size histogram buckets
+SIZE_BUCKETS = (1024, 4096, 16384, 65536, 262144, 1048576, 4194304, 16777216)
+
+# Histograms kept per model and method: (name, CallMetrics attribute, kind, help)
+HISTOGRAMS = (
+    ('call_seconds', 'wall_time', 'latency', 'Wall time of RPC calls.'),
+    ('encode_seconds', 'encode_time', 'latency', 'Time spent encoding RPC requests.'),
+    ('wait_seconds', 'wait_time', 'latency', 'Time from sending RPC requests to the response headers.'),
+    ('decode_seconds', 'decode_time', 'latency', 'Time spent reading and decoding RPC responses.'),
+    ('request_bytes', 'request_size', 'size', 'Size of RPC request bodies on the wire.'),
+    ('response_bytes', 'response_size', 'size', 'Size of RPC response bodies on the wire.'),
+)
+
+
+class CallMetrics:
+    """
+    Measurements of one RPC call.
+
+    The phase times and sizes are None when the call failed before the
+    transport could measure them, for example on a refused connection.
+    """
+
+    __slots__ = ('host', 'model', 'method', 'wall_time', 'encode_time', 'wait_time',
+                 'decode_time', 'request_size', 'response_size', 'error')
+
+    def __init__(self, host, model, method, wall_time, call=None, error=None):
+        """
+        Initialize the measurements.
+
+        Args:
+            host (str): The server host
+            model (str): The model name, '' for calls of the common service
+            method (str): The method name
+            wall_time (float): Seconds the call took
+            call (CallStats, optional): Phase times and sizes recorded by the transport
+            error (Exception, optional): The error raised by the call
+        """
+        self.host = host
+        self.model = model
+        self.method = method
+        self.wall_time = wall_time
+        if call is not None:
+            self.encode_time = call.encode_time
+            self.wait_time = call.wait_time
+            self.decode_time = call.decode_time
+            self.request_size = call.request_wire_size
+            self.response_size = call.response_wire_size
+        else:
+            self.encode_time = self.wait_time = self.decode_time = None
+            self.request_size = self.response_size = None
+        self.error = error
+
+    def __repr__(self):
+        return (f"CallMetrics({self.model}.{self.method} on {self.host}, "
+                f"wall={self.wall_time:.4f}s, error={type(self.error).__name__ if self.error else None})")
+
+
+class Histogram:
+    """Counts of observed values per bucket, with their sum."""
+
+    __slots__ = ('buckets', 'counts', 'sum', 'count')
+
+    def __init__(self, buckets):
+        """
+        Initialize the histogram.
+
+        Args:
+            buckets (tuple): Sorted upper bounds of the buckets
+        """
+        self.buckets = buckets
+        # One count per bucket plus one for values above the last bound
+        self.counts = [0] * (len(buckets) + 1)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value):
+        """Add a value."""
+        self.counts[bisect.bisect_left(self.buckets, value)] += 1
+        self.sum += value
+        self.count += 1
+
+    def cumulative(self):
+        """
+        Return the cumulative counts, as Prometheus exposes them.
+
+        Returns:
+            list: ``(upper bound, count of values <= bound)`` pairs, the last bound being inf
+        """
+        total = 0
+        result = []
+        for bound, count in zip(self.buckets + (float('inf'),), self.counts):
+            total += count
+            result.append((bound, total))
+        return result
+
+    def snapshot(self):
+        """
+        Return a copy of the histogram as a dictionary.
+
+        Returns:
+            dict: ``count``, ``sum`` and cumulative ``buckets``
+        """
+        return {'count': self.count, 'sum': self.sum, 'buckets': self.cumulative()}
+
+
+class Metrics:
+    """
+    Thread-safe collector of RPC call metrics, may be shared between clients.
+    """
+
+    def __init__(self, latency_buckets=LATENCY_BUCKETS, size_buckets=SIZE_BUCKETS,
+                 slow_threshold=None, prefix='dgt_rpc'):
+        """
+        Initialize the collector.
+
+        Args:
+            latency_buckets (iterable, optional): Upper bounds in seconds of the latency buckets
+            size_buckets (iterable, optional): Upper bounds in bytes of the size buckets
+            slow_threshold (float, optional): Calls taking at least this many seconds are
+                logged as warnings on the ``dgt_rpc.slow`` logger, no call is if not specified
+            prefix (str, optional): Prefix of the exported metric names
+        """
+        self.buckets = {'latency': tuple(sorted(latency_buckets)), 'size': tuple(sorted(size_buckets))}
+        self.slow_threshold = slow_threshold
+        self.prefix = prefix
+        self._callbacks = []
+        self._lock = threading.Lock()
+        # (model, method) -> {histogram name: Histogram}
+        self._histograms = {}
+        # (model, method, error class name) -> count
+        self._errors = {}
+
+    def add_callback(self, callback):
+        """
+        Call a function with the CallMetrics of every finished call.
+
+        Callbacks run in the thread that made the call, so they should be quick.
+        An exception raised by a callback is logged and otherwise ignored.
+
+        Args:
+            callback (callable): Called with a CallMetrics
+
+        Returns:
+            callable: The callback, so this method can be used as a decorator
+        """
+        with self._lock:
+            self._callbacks = self._callbacks + [callback]
+        return callback
+
+    def remove_callback(self, callback):
+        """
+        Stop calling a function added with ``add_callback``.
+
+        Args:
+            callback (callable): The callback
+        """
+        with self._lock:
+            self._callbacks = [cb for cb in self._callbacks if cb is not callback]
+
+    def record(self, call):
+        """
+        Add a finished call.
+
+        Args:
+            call (CallMetrics): The call's measurements
+        """
+        key = (call.model, call.method)
+        with self._lock:
+            histograms = self._histograms.get(key)
+            if histograms is None:
+                histograms = self._histograms[key] = {
+                    name: Histogram(self.buckets[kind]) for name, _, kind, _ in HISTOGRAMS
+                }
+            for name, attribute, _, _ in HISTOGRAMS:
+                value = getattr(call, attribute)
+                if value is not None:
+                    histograms[name].observe(value)
+            if call.error is not None:
+                error_key = key + (type(call.error).__name__,)
+                self._errors[error_key] = self._errors.get(error_key, 0) + 1
+            callbacks = self._callbacks
+
+        if self.slow_threshold is not None and call.wall_time >= self.slow_threshold:
+            slow_logger.warning(_describe_slow_call(call))
+        for callback in callbacks:
+            try:
+                callback(call)
+            except Exception:
+                logger.exception(f"Metrics callback {callback!r} failed")
+
+    def snapshot(self):
+        """
+        Return a copy of the collected metrics.
+
+        Returns:
+            dict: ``{(model, method): {'errors': {error class: count},
+                <histogram name>: Histogram.snapshot()}}``
+        """
+        with self._lock:
+            result = {}
+            for key, histograms in self._histograms.items():
+                entry = result[key] = {name: histogram.snapshot() for name, histogram in histograms.items()}
+                entry['errors'] = {}
+            for (model, method, error), count in self._errors.items():
+                result[(model, method)]['errors'][error] = count
+            return result
+
+    def prometheus(self):
+        """
+        Export the metrics in the Prometheus text exposition format.
+
+        Returns:
+            str: One histogram family per measurement, labelled by model and method,
+                and a counter of errors labelled by error class
+        """
+        lines = []
+        with self._lock:
+            items = sorted(self._histograms.items())
+            for name, _, _, help_text in HISTOGRAMS:
+                metric = f'{self.prefix}_{name}'
+                lines.append(f'# HELP {metric} {help_text}')
+                lines.append(f'# TYPE {metric} histogram')
+                for (model, method), histograms in items:
+                    histogram = histograms[name]
+                    labels = f'model="{_escape(model)}",method="{_escape(method)}"'
+                    for bound, count in histogram.cumulative():
+                        lines.append(f'{metric}_bucket{{{labels},le="{_format_bound(bound)}"}} {count}')
+                    lines.append(f'{metric}_sum{{{labels}}} {histogram.sum!r}')
+                    lines.append(f'{metric}_count{{{labels}}} {histogram.count}')
+
+            metric = f'{self.prefix}_call_errors_total'
+            lines.append(f'# HELP {metric} RPC calls that raised an error.')
+            lines.append(f'# TYPE {metric} counter')
+            for (model, method, error), count in sorted(self._errors.items()):
+                lines.append(f'{metric}{{model="{_escape(model)}",method="{_escape(method)}",'
+                             f'error="{_escape(error)}"}} {count}')
+        return '\n'.join(lines) + '\n'
+
+    def reset(self):
+        """Forget all recorded calls."""
+        with self._lock:
+            self._histograms.clear()
+            self._errors.clear()
+
+
+def _describe_slow_call(call):
+    """Build the slow-call log message of a call."""
+    message = f"Slow call {call.model}.{call.method} on {call.host}: {call.wall_time:.3f}s"
+    if call.wait_time is not None:
+        message += (f" (encode {call.encode_time:.3f}s, wait {call.wait_time:.3f}s, "
+                    f"decode {call.decode_time:.3f}s, {call.request_size} bytes sent, "
+                    f"{call.response_size} received)")
+    if call.error is not None:
+        message += f", failed with {call.error!r}"
+    return message
+
+
+def _escape(value):
+    """Escape a Prometheus label value."""
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def _format_bound(bound):
+    """Format a bucket bound as Prometheus does."""
+    if bound == float('inf'):
+        return '+Inf'
+    return repr(float(bound))
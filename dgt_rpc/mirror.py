@@ -0,0 +1,463 @@
+"""
+A local SQLite copy of Odoo models.
+
+Reporting questions such as "sales per POS last month" need not reach the
+ERP: a Mirror copies chosen models into a SQLite file, one table per model
+with a column per field, keeps it current with IncrementalSync, and answers
+SQL or domain queries locally.
+
+The watermarks of the synchronization are kept in the same file and
+committed in the same transaction as the rows they describe, so the copy
+and its checkpoints never disagree, even after a crash.
+
+Values are stored as follows: many2one fields as the related ID, x2many
+fields as JSON lists of IDs, booleans as 0 or 1, dates as the ``YYYY-MM-DD
+HH:MM:SS`` strings Odoo sends, and Odoo's ``False`` for empty values as NULL.
+"""
+
+import json
+import logging
+import os
+import re
+import sqlite3
+import threading
+
+from .exceptions import DgtException
+from .sync import CheckpointStore, IncrementalSync
+
+logger = logging.getLogger(__name__)
+
+# Models, fields, indexed columns and domains mirrored by default
+POS_MODELS = {
+    'pos.config': {
+        'fields': ['name', 'active', 'company_id', 'currency_id'],
+        # Inactive configurations are mirrored too, like get_pos_data does by default
+        'domain': ['|', ('active', '=', True), ('active', '=', False)],
+    },
+    'pos.order': {
+        'fields': ['name', 'date_order', 'config_id', 'session_id', 'partner_id', 'user_id',
+                   'amount_total', 'amount_tax', 'amount_paid', 'state', 'company_id'],
+        'indexes': ['date_order', 'state'],
+    },
+    'pos.order.line': {
+        'fields': ['order_id', 'product_id', 'qty', 'price_unit', 'discount',
+                   'price_subtotal', 'price_subtotal_incl'],
+    },
+}
+
+# SQLite column types of Odoo field types, untyped for the others
+COLUMN_TYPES = {
+    'integer': 'INTEGER',
+    'many2one': 'INTEGER',
+    'boolean': 'INTEGER',
+    'float': 'REAL',
+    'monetary': 'REAL',
+    'char': 'TEXT',
+    'text': 'TEXT',
+    'html': 'TEXT',
+    'selection': 'TEXT',
+    'date': 'TEXT',
+    'datetime': 'TEXT',
+    'one2many': 'TEXT',
+    'many2many': 'TEXT',
+}
+
+# SQLite's LIKE ignores case, so the case-sensitive 'like' uses GLOB
+OPERATORS = {'=': '=', '!=': '!=', '<': '<', '<=': '<=', '>': '>', '>=': '>=',
+             'like': 'GLOB', 'ilike': 'LIKE', 'not like': 'NOT GLOB', 'not ilike': 'NOT LIKE'}
+
+# Operators that, as in Odoo, also match records where the field is not set
+NEGATIVE_OPERATORS = ('!=', 'not like', 'not ilike')
+
+_ORDER = re.compile(r'^\s*(\w+)(?:\s+(asc|desc))?\s*$', re.IGNORECASE)
+
+
+def glob_pattern(value):
+    """Translate the wildcards of a LIKE pattern to GLOB, escaping GLOB's own."""
+    special = {'*': '[*]', '?': '[?]', '[': '[[]', '%': '*', '_': '?'}
+    return ''.join(special.get(c, c) for c in str(value))
+
+
+def table_name(model):
+    """Name of a model's table, e.g. pos_order for pos.order."""
+    return model.replace('.', '_')
+
+
+class MirroredModel:
+    """A model copied by a Mirror."""
+
+    __slots__ = ('model', 'table', 'fields', 'types', 'domain', 'indexes')
+
+    def __init__(self, model, fields, types, domain=None, indexes=()):
+        self.model = model
+        self.table = table_name(model)
+        self.fields = list(fields)
+        # Field name to Odoo type, for the fields and 'write_date'
+        self.types = types
+        self.domain = list(domain or [])
+        self.indexes = list(indexes)
+
+    @property
+    def columns(self):
+        return ['id', 'write_date'] + [name for name in self.fields if name not in ('id', 'write_date')]
+
+    def __repr__(self):
+        return f"MirroredModel({self.model})"
+
+
+class _MirrorCheckpointStore(CheckpointStore):
+    """Checkpoints in the mirror's file, written in the mirror's open transaction."""
+
+    def __init__(self, mirror):
+        self.mirror = mirror
+
+    def get(self, key):
+        row = self.mirror._connection.execute(
+            "SELECT checkpoint FROM _checkpoints WHERE key = ?", (key,)).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def set(self, key, checkpoint):
+        self.mirror._connection.execute(
+            "INSERT OR REPLACE INTO _checkpoints (key, checkpoint) VALUES (?, ?)",
+            (key, json.dumps(checkpoint, separators=(',', ':'))))
+
+    def delete(self, key):
+        self.mirror._connection.execute("DELETE FROM _checkpoints WHERE key = ?", (key,))
+
+    def clear(self):
+        self.mirror._connection.execute("DELETE FROM _checkpoints")
+
+
+class Mirror:
+    """
+    Copies Odoo models into a SQLite file and queries them locally.
+
+    ``refresh`` is meant to be called from one thread at a time, for example
+    a periodic job; queries may run concurrently from any thread, each
+    thread reading through its own connection.
+    """
+
+    def __init__(self, client, path, models=POS_MODELS, page_size=1000, overlap=0):
+        """
+        Initialize the mirror, creating the file if needed.
+
+        Args:
+            client (DgteraClient): Client of the mirrored database
+            path (str): Path of the SQLite file
+            models (dict, optional): Model name to options of ``add_model``
+                ('fields', 'domain', 'indexes'); the POS configurations, orders
+                and order lines by default
+            page_size (int, optional): Number of records fetched per call
+            overlap (float, optional): Seconds before the watermark read again, see IncrementalSync
+
+        Raises:
+            DgtException: If the fields of a model cannot be described
+        """
+        self.client = client
+        self.path = os.path.expanduser(path)
+        self.models = {}
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        self._readers = []
+        self._connection = sqlite3.connect(self.path, check_same_thread=False, isolation_level='DEFERRED')
+        # Readers do not block the writer, nor the writer readers
+        self._connection.execute("PRAGMA journal_mode=WAL")
+        self._connection.execute(
+            "CREATE TABLE IF NOT EXISTS _checkpoints (key TEXT PRIMARY KEY, checkpoint TEXT NOT NULL)")
+        self._connection.commit()
+        self.sync = IncrementalSync(client, _MirrorCheckpointStore(self), page_size=page_size, overlap=overlap)
+        for model, options in (models or {}).items():
+            self.add_model(model, **options)
+
+    def add_model(self, model, fields, domain=None, indexes=()):
+        """
+        Mirror a model, creating or extending its table.
+
+        Many2one columns and write_date are always indexed. Adding fields to
+        an existing table resets its checkpoint, so the next refresh fills them.
+
+        Args:
+            model (str): The model name
+            fields (list): Fields to copy; 'id' and 'write_date' are always copied
+            domain (list, optional): Restricts the copied records
+            indexes (list, optional): Further columns to index
+
+        Raises:
+            DgtException: If a field does not exist on the model
+        """
+        described = self.client.fields_get(model)
+        unknown = [name for name in fields if name not in described]
+        if unknown:
+            raise DgtException(f"Invalid field {', '.join(map(repr, unknown))} on model {model!r}")
+        types = {name: described[name].get('type') for name in fields}
+        types.setdefault('write_date', 'datetime')
+        mirrored = MirroredModel(model, fields, types, domain, indexes)
+
+        with self._lock:
+            connection = self._connection
+            existing = [row[1] for row in connection.execute(f'PRAGMA table_info("{mirrored.table}")')]
+            if not existing:
+                columns = ', '.join(
+                    ['id INTEGER PRIMARY KEY']
+                    + [f'"{name}" {COLUMN_TYPES.get(types.get(name), "")}'.rstrip() for name in mirrored.columns[1:]]
+                )
+                connection.execute(f'CREATE TABLE "{mirrored.table}" ({columns})')
+            else:
+                added = [name for name in mirrored.columns if name not in existing]
+                for name in added:
+                    connection.execute(
+                        f'ALTER TABLE "{mirrored.table}" ADD COLUMN "{name}" {COLUMN_TYPES.get(types.get(name), "")}'
+                    )
+                if added:
+                    logger.info(f"Added {', '.join(added)} to the {model} mirror, it will be copied again")
+                    self.sync.reset(model)
+
+            indexed = ['write_date'] + [name for name in fields if types[name] == 'many2one'] + list(indexes)
+            for name in dict.fromkeys(indexed):
+                connection.execute(
+                    f'CREATE INDEX IF NOT EXISTS "{mirrored.table}_{name}" ON "{mirrored.table}" ("{name}")')
+            connection.commit()
+            self.models[model] = mirrored
+
+    def refresh(self, models=None):
+        """
+        Copy the changes of the mirrored models since the last refresh.
+
+        Each page is committed with its checkpoint; an interrupted refresh
+        resumes from the last committed page.
+
+        Args:
+            models (list, optional): Models to refresh, all if not specified
+
+        Returns:
+            dict: Model name to a ``(changed, deleted)`` pair of record counts; after an
+                interrupted refresh, records already copied are read and counted again
+
+        Raises:
+            DgtException: If a call fails; the pages already copied are kept
+        """
+        counts = {}
+        for model in models or list(self.models):
+            mirrored = self.models[model]
+            changed = deleted = 0
+            with self._lock:
+                try:
+                    for batch in self.sync.changes(model, mirrored.domain, mirrored.fields):
+                        # The checkpoint of the previous batch was just written
+                        self._connection.commit()
+                        if batch.records:
+                            self._upsert(mirrored, batch.records)
+                            changed += len(batch.records)
+                        if batch.deleted:
+                            self._connection.executemany(
+                                f'DELETE FROM "{mirrored.table}" WHERE id = ?', [(i,) for i in batch.deleted])
+                            deleted += len(batch.deleted)
+                    self._connection.commit()
+                except BaseException:
+                    self._connection.rollback()
+                    raise
+            counts[model] = (changed, deleted)
+            logger.debug(f"Refreshed the {model} mirror: {changed} changed, {deleted} deleted")
+        return counts
+
+    def _upsert(self, mirrored, records):
+        columns = mirrored.columns
+        names = ', '.join(f'"{name}"' for name in columns)
+        placeholders = ', '.join('?' * len(columns))
+        self._connection.executemany(
+            f'INSERT OR REPLACE INTO "{mirrored.table}" ({names}) VALUES ({placeholders})',
+            [[self._to_column(mirrored.types.get(name), record.get(name)) for name in columns] for record in records],
+        )
+
+    @staticmethod
+    def _to_column(field_type, value):
+        if field_type == 'boolean':
+            return int(bool(value))
+        if value is False or value is None:
+            return None
+        if field_type == 'many2one':
+            return value[0] if isinstance(value, (list, tuple)) else value
+        if isinstance(value, (list, tuple, dict)):
+            return json.dumps(value)
+        return value
+
+    def query(self, sql, params=()):
+        """
+        Run a SQL query on the mirror.
+
+        Tables are named after their models with dots replaced by
+        underscores, e.g. ``pos_order``.
+
+        Args:
+            sql (str): The query
+            params (sequence or dict, optional): Query parameters
+
+        Returns:
+            list: Rows as dictionaries
+        """
+        cursor = self._reader().execute(sql, params)
+        names = [column[0] for column in cursor.description or ()]
+        return [dict(zip(names, row)) for row in cursor.fetchall()]
+
+    def search_read(self, model, domain=None, fields=None, offset=0, limit=None, order=None):
+        """
+        Read mirrored records matching a domain, like ``DgteraClient.search_read``.
+
+        Domains use the mirrored columns with the operators =, !=, <, <=, >, >=,
+        in, not in, like, ilike, not like and not ilike, combined with '&', '|'
+        and '!'. Many2one fields compare with IDs. x2many fields are returned as
+        lists of IDs and many2one fields as IDs.
+
+        Args:
+            model (str): The model name
+            domain (list, optional): The search domain
+            fields (list, optional): Fields to return, all mirrored ones if not specified
+            offset (int, optional): Number of records to skip
+            limit (int, optional): Maximum number of records to return
+            order (str, optional): Comma-separated columns, each optionally followed by asc or desc
+
+        Returns:
+            list: Records as dictionaries
+
+        Raises:
+            DgtException: If the model is not mirrored or the query refers to an unknown field
+        """
+        mirrored = self._mirrored(model)
+        fields = ['id'] + [name for name in fields if name != 'id'] if fields else mirrored.columns
+        self._check_fields(mirrored, fields)
+        where, params = self._where(mirrored, domain or [])
+        columns = ', '.join(f'"{name}"' for name in fields)
+        sql = f'SELECT {columns} FROM "{mirrored.table}"'
+        if where:
+            sql += f' WHERE {where}'
+        sql += f' ORDER BY {self._order(mirrored, order)}'
+        if limit or offset:
+            sql += ' LIMIT ? OFFSET ?'
+            params += [limit if limit else -1, offset]
+        records = self.query(sql, params)
+        decoded = [name for name in fields if mirrored.types.get(name) in ('one2many', 'many2many')]
+        booleans = [name for name in fields if mirrored.types.get(name) == 'boolean']
+        for record in records:
+            for name in decoded:
+                record[name] = json.loads(record[name]) if record[name] else []
+            for name in booleans:
+                record[name] = bool(record[name])
+        return records
+
+    def search_count(self, model, domain=None):
+        """
+        Count mirrored records matching a domain.
+
+        Args:
+            model (str): The model name
+            domain (list, optional): The search domain, as for ``search_read``
+
+        Returns:
+            int: The number of records
+        """
+        mirrored = self._mirrored(model)
+        where, params = self._where(mirrored, domain or [])
+        sql = f'SELECT COUNT(*) AS count FROM "{mirrored.table}"' + (f' WHERE {where}' if where else '')
+        return self.query(sql, params)[0]['count']
+
+    def close(self):
+        """Close the connections to the file."""
+        with self._lock:
+            for connection in self._readers:
+                connection.close()
+            self._readers.clear()
+            self._connection.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def _reader(self):
+        """The calling thread's read connection."""
+        connection = getattr(self._local, 'connection', None)
+        if connection is None:
+            connection = sqlite3.connect(self.path, check_same_thread=False, isolation_level=None)
+            self._local.connection = connection
+            with self._lock:
+                self._readers.append(connection)
+        return connection
+
+    def _mirrored(self, model):
+        mirrored = self.models.get(model)
+        if mirrored is None:
+            raise DgtException(f"Model {model!r} is not mirrored")
+        return mirrored
+
+    @staticmethod
+    def _check_fields(mirrored, fields):
+        unknown = [name for name in fields if name not in mirrored.columns]
+        if unknown:
+            raise DgtException(f"Field {', '.join(map(repr, unknown))} of {mirrored.model} is not mirrored")
+
+    def _order(self, mirrored, order):
+        if not order:
+            return 'id'
+        terms = []
+        for term in order.split(','):
+            match = _ORDER.match(term)
+            if not match:
+                raise DgtException(f"Invalid order {order!r}")
+            self._check_fields(mirrored, [match.group(1)])
+            terms.append(f'"{match.group(1)}" {(match.group(2) or "asc").upper()}')
+        return ', '.join(terms)
+
+    def _where(self, mirrored, domain):
+        """Translate a domain into a SQL condition and its parameters."""
+        params = []
+        position = 0
+
+        def condition():
+            nonlocal position
+            term = domain[position]
+            position += 1
+            if term == '!':
+                return f'NOT ({condition()})'
+            if term in ('&', '|'):
+                left = condition()
+                right = condition()
+                return f'({left} {"AND" if term == "&" else "OR"} {right})'
+            return self._term(mirrored, term, params)
+
+        conditions = []
+        while position < len(domain):
+            conditions.append(condition())
+        return ' AND '.join(conditions), params
+
+    def _term(self, mirrored, term, params):
+        try:
+            name, operator, value = term
+        except (TypeError, ValueError):
+            raise DgtException(f"Invalid domain term {term!r}")
+        self._check_fields(mirrored, [name])
+        operator = operator.lower()
+        column = f'"{name}"'
+        if mirrored.types.get(name) == 'many2one' and isinstance(value, (list, tuple)) and operator not in ('in', 'not in'):
+            value = value[0]
+        if operator in ('in', 'not in'):
+            values = [self._to_column(mirrored.types.get(name), v) for v in value]
+            if not values:
+                return '0' if operator == 'in' else '1'
+            params.extend(values)
+            return f'{column} {operator.upper()} ({", ".join("?" * len(values))})'
+        if operator not in OPERATORS:
+            raise DgtException(f"Unsupported operator {operator!r} in mirror domain")
+        if (value is False and mirrored.types.get(name) != 'boolean') or value is None:
+            if operator == '=':
+                return f'{column} IS NULL'
+            if operator == '!=':
+                return f'{column} IS NOT NULL'
+        if operator in ('like', 'not like'):
+            value = f'*{glob_pattern(value)}*'
+        elif 'like' in operator:
+            value = f'%{value}%'
+        params.append(self._to_column(mirrored.types.get(name), value) if operator in ('=', '!=') else value)
+        if operator in NEGATIVE_OPERATORS:
+            return f'({column} {OPERATORS[operator]} ? OR {column} IS NULL)'
+        return f'{column} {OPERATORS[operator]} ?'
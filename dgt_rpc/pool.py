@@ -0,0 +1,412 @@
+"""
+HTTP connection pooling for the DGT RPC client.
+
+The standard ``xmlrpc.client.ServerProxy`` opens a new HTTP connection for
+every proxy instance, so a client that builds a fresh proxy per call pays a
+full TCP (and TLS) handshake on each request. The classes in this module keep
+HTTP/1.1 connections alive and hand them out again to later calls.
+"""
+
+import http.client
+import logging
+import select
+import ssl
+import threading
+import time
+import xmlrpc.client
+from collections import deque
+
+from . import decoder
+from .compression import CallStats, CompressionStats, compress_body, iter_body
+from .exceptions import DgtException
+
+logger = logging.getLogger(__name__)
+
+# Bytes read from the socket per parser feed; the stock transport reads 1 KiB
+READ_SIZE = 65536
+
+# Errors raised when a kept-alive connection was closed by the server while idle
+STALE_CONNECTION_ERRORS = (
+    http.client.RemoteDisconnected,
+    ConnectionResetError,
+    ConnectionAbortedError,
+    BrokenPipeError,
+)
+
+
+class ConnectionPool:
+    """
+    A thread-safe pool of persistent HTTP/1.1 connections.
+
+    Connections are keyed by ``(scheme, host)`` so a single pool can serve
+    both Odoo endpoints and can be shared between several clients.
+    """
+
+    def __init__(self, max_size=10, max_per_host=4, idle_timeout=60.0,
+                 timeout=None, acquire_timeout=None, ssl_context=None, max_connections=None):
+        """
+        Initialize the connection pool.
+
+        Args:
+            max_size (int, optional): Maximum number of idle connections kept open
+            max_per_host (int, optional): Maximum number of connections in use per host
+            idle_timeout (float, optional): Seconds after which an idle connection is closed
+            timeout (float, optional): Socket timeout in seconds for new connections
+            acquire_timeout (float, optional): Seconds to wait for a free connection
+                when a host is at its limit, waits forever if not specified
+            ssl_context (ssl.SSLContext, optional): Context used for HTTPS connections
+            max_connections (int, optional): Maximum number of open connections, in use
+                or idle, over all hosts. Idle connections to other hosts are closed to
+                make room. Unlimited if not specified
+        """
+        self.max_size = max_size
+        self.max_per_host = max_per_host
+        self.idle_timeout = idle_timeout
+        self.timeout = timeout
+        self.acquire_timeout = acquire_timeout
+        self.ssl_context = ssl_context
+        self.max_connections = max_connections
+        self._idle = {}
+        self._active = {}
+        self._idle_count = 0
+        self._active_count = 0
+        self._cond = threading.Condition()
+        self.created = 0
+        self.reused = 0
+
+    def acquire(self, scheme, host):
+        """
+        Get a connection to a host, reusing an idle one when possible.
+
+        Args:
+            scheme (str): 'http' or 'https'
+            host (str): Host name, optionally with a port
+
+        Returns:
+            tuple: The connection and a flag telling whether it was reused
+
+        Raises:
+            DgtException: If no connection becomes available in time
+        """
+        key = (scheme, host)
+        deadline = None
+        if self.acquire_timeout is not None:
+            deadline = time.monotonic() + self.acquire_timeout
+
+        with self._cond:
+            while True:
+                self._evict_expired()
+                idle = self._idle.get(key)
+                while idle:
+                    # Most recently used first, it is the most likely to still be open
+                    conn, _ = idle.pop()
+                    self._idle_count -= 1
+                    if self._is_healthy(conn):
+                        self._active[key] = self._active.get(key, 0) + 1
+                        self._active_count += 1
+                        self.reused += 1
+                        return conn, True
+                    logger.debug(f"Discarding stale connection to {host}")
+                    conn.close()
+
+                if self._active.get(key, 0) < self.max_per_host and self._make_room():
+                    self._active[key] = self._active.get(key, 0) + 1
+                    self._active_count += 1
+                    self.created += 1
+                    break
+
+                remaining = None
+                if deadline is not None:
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        raise DgtException(f"Timed out waiting for a connection to {host}")
+                self._cond.wait(remaining)
+
+        try:
+            return self._new_connection(scheme, host), False
+        except Exception:
+            with self._cond:
+                self._active[key] -= 1
+                self._active_count -= 1
+                self._cond.notify_all()
+            raise
+
+    def release(self, scheme, host, conn, reusable=True):
+        """
+        Return a connection to the pool.
+
+        Args:
+            scheme (str): 'http' or 'https'
+            host (str): Host name the connection was acquired for
+            conn (http.client.HTTPConnection): The connection
+            reusable (bool, optional): False if the connection must be closed
+        """
+        key = (scheme, host)
+        with self._cond:
+            self._active[key] -= 1
+            self._active_count -= 1
+            if not self._active[key]:
+                del self._active[key]
+
+            if reusable and conn.sock is not None:
+                if self._idle_count >= self.max_size:
+                    self._evict_oldest()
+                self._idle.setdefault(key, deque()).append((conn, time.monotonic()))
+                self._idle_count += 1
+            else:
+                conn.close()
+            # Waiters may be blocked on different hosts or on the global limit
+            self._cond.notify_all()
+
+    def close(self):
+        """Close all idle connections."""
+        with self._cond:
+            for idle in self._idle.values():
+                for conn, _ in idle:
+                    conn.close()
+            self._idle.clear()
+            self._idle_count = 0
+
+    def idle_count(self, scheme=None, host=None):
+        """
+        Count idle connections.
+
+        Args:
+            scheme (str, optional): Only count connections using this scheme
+            host (str, optional): Only count connections to this host
+
+        Returns:
+            int: Number of idle connections
+        """
+        with self._cond:
+            if scheme is None and host is None:
+                return self._idle_count
+            return sum(
+                len(idle) for (s, h), idle in self._idle.items()
+                if (scheme is None or s == scheme) and (host is None or h == host)
+            )
+
+    @property
+    def active_count(self):
+        """Number of connections currently in use."""
+        return self._active_count
+
+    def _make_room(self):
+        """
+        Check the global connection limit before opening a connection. Lock must be held.
+
+        Closes the least recently used idle connection when the pool is full.
+        """
+        if self.max_connections is None:
+            return True
+        if self._active_count + self._idle_count < self.max_connections:
+            return True
+        if self._idle_count:
+            self._evict_oldest()
+            return True
+        return False
+
+    def _new_connection(self, scheme, host):
+        """Open a new HTTP connection."""
+        logger.debug(f"Opening new {scheme} connection to {host}")
+        if scheme == 'https':
+            context = self.ssl_context or ssl.create_default_context()
+            return http.client.HTTPSConnection(host, timeout=self.timeout, context=context)
+        return http.client.HTTPConnection(host, timeout=self.timeout)
+
+    def _evict_expired(self):
+        """Close connections that have been idle for too long. Lock must be held."""
+        if self.idle_timeout is None:
+            return
+        cutoff = time.monotonic() - self.idle_timeout
+        for key in list(self._idle):
+            idle = self._idle[key]
+            while idle and idle[0][1] < cutoff:
+                conn, _ = idle.popleft()
+                self._idle_count -= 1
+                conn.close()
+            if not idle:
+                del self._idle[key]
+
+    def _evict_oldest(self):
+        """Close the least recently used idle connection. Lock must be held."""
+        oldest_key = min(self._idle, key=lambda k: self._idle[k][0][1])
+        conn, _ = self._idle[oldest_key].popleft()
+        self._idle_count -= 1
+        if not self._idle[oldest_key]:
+            del self._idle[oldest_key]
+        conn.close()
+
+    @staticmethod
+    def _is_healthy(conn):
+        """
+        Check that an idle connection is still usable.
+
+        An idle keep-alive socket should have nothing to read; if it is
+        readable the server has either closed it or sent unexpected data.
+        """
+        sock = conn.sock
+        if sock is None:
+            return False
+        try:
+            readable, _, _ = select.select([sock], [], [], 0)
+        except (OSError, ValueError):
+            return False
+        return not readable
+
+
+def set_timeout(conn, timeout):
+    """Set the socket timeout of a connection, whether it is open yet or not."""
+    conn.timeout = timeout
+    if conn.sock is not None:
+        conn.sock.settimeout(timeout)
+
+
+class PooledTransport(xmlrpc.client.Transport):
+    """
+    An XML-RPC transport that borrows its connections from a ConnectionPool.
+
+    Unlike the stock transport, one instance can safely be shared by several
+    ServerProxy objects and threads.
+    """
+
+    def __init__(self, pool=None, scheme='http', use_datetime=False,
+                 use_builtin_types=False, headers=(), fast_decoder=False,
+                 compress_threshold=None, stats=None, timeout=None):
+        """
+        Initialize the transport.
+
+        Args:
+            pool (ConnectionPool, optional): Pool to borrow connections from
+            scheme (str, optional): 'http' or 'https'
+            fast_decoder (bool, optional): Decode responses with dgt_rpc.decoder
+                instead of the stock xmlrpc.client unmarshaller
+            use_datetime (bool, optional): Decode dates as datetime objects
+            use_builtin_types (bool, optional): Decode dates and binary data as builtin types
+            headers (iterable, optional): Extra HTTP headers sent with every request
+            compress_threshold (int, optional): gzip request bodies of at least this
+                many bytes, requests are never compressed if not specified
+            stats (CompressionStats, optional): Where to record the per-call
+                compression statistics
+            timeout (float, optional): Socket timeout in seconds for each request,
+                the pool's timeout applies if not specified
+        """
+        super().__init__(use_datetime=use_datetime,
+                         use_builtin_types=use_builtin_types, headers=headers)
+        self.pool = pool if pool is not None else ConnectionPool()
+        self.scheme = scheme
+        self.fast_decoder = fast_decoder
+        self.compress_threshold = compress_threshold
+        self.stats = stats if stats is not None else CompressionStats()
+        self.timeout = timeout
+
+    def request(self, host, handler, request_body, verbose=False):
+        """
+        Send an XML-RPC request and parse the response.
+
+        A request that fails because a reused connection went stale is
+        retried once on a fresh connection.
+        """
+        return self.send(host, handler, request_body, CallStats(request_size=len(request_body)), verbose)
+
+    def send(self, host, handler, request_body, call, verbose=False):
+        """
+        Send an encoded XML-RPC request and parse the response.
+
+        Args:
+            host (str): The host, as in the server URL
+            handler (str): Path of the endpoint
+            request_body (bytes): The encoded request
+            call (CallStats): Statistics of the call, updated with its sizes and timings
+            verbose (bool, optional): Print the exchange
+
+        Returns:
+            The decoded response
+        """
+        chost, extra_headers, _ = self.get_host_info(host)
+        start = time.perf_counter()
+        request_body, compressed = compress_body(request_body, self.compress_threshold)
+        call.encode_time += time.perf_counter() - start
+        call.request_wire_size = len(request_body)
+        if compressed:
+            extra_headers = extra_headers + [("Content-Encoding", "gzip")]
+
+        for attempt in (0, 1):
+            conn, reused = self.pool.acquire(self.scheme, chost)
+            reusable = False
+            try:
+                if self.timeout is not None:
+                    set_timeout(conn, self.timeout)
+                # Per call: the connection goes back to the pool, the transport may be shared
+                if conn.debuglevel != int(bool(verbose)):
+                    conn.set_debuglevel(int(bool(verbose)))
+                start = time.perf_counter()
+                self._send_request_on(conn, handler, request_body, extra_headers)
+                response = conn.getresponse()
+                call.wait_time = time.perf_counter() - start
+
+                if response.status != 200:
+                    response.read()
+                    reusable = not response.will_close
+                    raise xmlrpc.client.ProtocolError(
+                        chost + handler, response.status, response.reason,
+                        dict(response.getheaders())
+                    )
+
+                try:
+                    result = self._parse_response(response, call, verbose)
+                except xmlrpc.client.Fault:
+                    self.stats.record(call)
+                    reusable = not response.will_close
+                    raise
+                self.stats.record(call)
+                reusable = not response.will_close
+                return result
+
+            except STALE_CONNECTION_ERRORS:
+                if attempt or not reused:
+                    raise
+                logger.debug(f"Reused connection to {chost} went stale, retrying")
+                call.response_size = call.response_wire_size = 0
+            finally:
+                self.pool.release(self.scheme, chost, conn, reusable)
+
+    def getparser(self):
+        """Create the parser and unmarshaller for a response."""
+        if self.fast_decoder:
+            return decoder.getparser(use_datetime=self._use_datetime,
+                                     use_builtin_types=self._use_builtin_types)
+        return super().getparser()
+
+    def parse_response(self, response):
+        """Feed the response body to the parser as it arrives."""
+        return self._parse_response(response, CallStats())
+
+    def _parse_response(self, response, call, verbose=False):
+        """Parse a response, decompressing it chunk by chunk and recording its sizes in call."""
+        start = time.perf_counter()
+        try:
+            p, u = self.getparser()
+            for data in iter_body(response, READ_SIZE, call):
+                if verbose:
+                    print("body:", repr(data))
+                p.feed(data)
+            p.close()
+            return u.close()
+        finally:
+            call.decode_time = time.perf_counter() - start
+
+    def _send_request_on(self, conn, handler, request_body, extra_headers):
+        """Write the request line, headers and body to a pooled connection."""
+        headers = self._headers + self._extra_headers + extra_headers
+        conn.putrequest("POST", handler, skip_accept_encoding=True)
+        if self.accept_gzip_encoding:
+            headers.append(("Accept-Encoding", "gzip"))
+        headers.append(("Content-Type", "text/xml"))
+        headers.append(("User-Agent", self.user_agent))
+        self.send_headers(conn, headers)
+        conn.putheader("Content-Length", str(len(request_body)))
+        conn.endheaders(request_body)
+
+    def close(self):
+        """Connections belong to the pool, so there is nothing to close here."""
@@ -0,0 +1,326 @@
+"""
+Recording and replay of RPC traffic.
+
+A TrafficRecorder is an interceptor writing every ``execute_kw`` call of the
+clients it is added to into a gzip compressed JSON lines file: when the call
+started, its model, method, arguments, duration, response size and error.
+Values of credential-like keys in the arguments are redacted, and the
+password or API key the client sends is never part of a call's arguments.
+
+A Replayer sends the calls of a recording again, to a staging server or a
+local stand-in such as ``benchmarks/fake_server.py``, at the recorded pace,
+faster or slower, with a bounded number of calls in flight, and reports the
+latency percentiles per model and method.
+"""
+
+import base64
+import datetime
+import gzip
+import json
+import logging
+import math
+import threading
+import time
+import xmlrpc.client
+from concurrent.futures import ThreadPoolExecutor
+
+from .interceptors import Interceptor
+from .retry import IDEMPOTENT_METHODS
+
+logger = logging.getLogger(__name__)
+
+# Keys whose values are replaced by REDACTED in recorded arguments. Credential
+# names only: a plain 'key' is business data in Odoo, e.g. on ir.config_parameter
+SECRET_KEYS = frozenset({
+    'password', 'new_password', 'old_password', 'passwd', 'api_key', 'apikey',
+    'token', 'access_token', 'refresh_token', 'secret', 'client_secret', 'private_key',
+})
+
+REDACTED = '***'
+
+
+class TrafficRecorder(Interceptor):
+    """
+    Interceptor recording execute_kw calls to a file.
+
+    One recorder may be shared by several clients; lines are written under a
+    lock. Close the recorder, or use it as a context manager, to complete the
+    file.
+    """
+
+    def __init__(self, path, secret_keys=SECRET_KEYS):
+        """
+        Initialize the recorder, truncating the file.
+
+        Args:
+            path (str): Path of the recording, conventionally ending in .jsonl.gz
+            secret_keys (iterable, optional): Dictionary keys whose values are redacted
+        """
+        self.path = path
+        self.secret_keys = frozenset(key.lower() for key in secret_keys)
+        self._file = gzip.open(path, 'wt', encoding='utf-8')
+        self._lock = threading.Lock()
+        self._start = time.monotonic()
+        self.calls = 0
+
+    def before(self, call):
+        if call.model is None:
+            return
+        stats = call.client.compression_stats
+        call.context['recording'] = (time.monotonic(), time.perf_counter(), stats.last)
+
+    def after(self, call, result):
+        self._record(call, None)
+        return result
+
+    def on_error(self, call, error):
+        self._record(call, error)
+
+    def close(self):
+        """Flush and close the file."""
+        with self._lock:
+            if not self._file.closed:
+                self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def _record(self, call, error):
+        """Write one call to the file."""
+        started = call.context.pop('recording', None)
+        if started is None:
+            return
+        monotonic, perf_counter, previous = started
+        duration = time.perf_counter() - perf_counter
+        last = call.client.compression_stats.last
+        entry = {
+            't': round(monotonic - self._start, 6),
+            'db': call.client.db,
+            'model': call.model,
+            'method': call.method,
+            'args': self._redact(call.args),
+            'kwargs': self._redact(call.kwargs),
+            'duration': round(duration, 6),
+            # None when no response was read, e.g. on a cache hit or a refused connection
+            'size': last.response_wire_size if last is not None and last is not previous else None,
+            'error': type(error).__name__ if error is not None else None,
+        }
+        line = json.dumps(entry, separators=(',', ':'), default=_encode)
+        with self._lock:
+            if self._file.closed:
+                return
+            self._file.write(line + '\n')
+            self.calls += 1
+
+    def _redact(self, value):
+        """Copy a value, replacing the values of secret keys."""
+        if isinstance(value, dict):
+            return {
+                key: REDACTED if str(key).lower() in self.secret_keys else self._redact(item)
+                for key, item in value.items()
+            }
+        if isinstance(value, (list, tuple)):
+            return [self._redact(item) for item in value]
+        return value
+
+
+def _encode(value):
+    """Encode values JSON does not support, reversed by _decode."""
+    if isinstance(value, xmlrpc.client.Binary):
+        value = value.data
+    if isinstance(value, (bytes, bytearray)):
+        return {'__bytes__': base64.b64encode(value).decode('ascii')}
+    if isinstance(value, (datetime.datetime, datetime.date)):
+        # Odoo accepts dates as strings in this format
+        return value.strftime('%Y-%m-%d %H:%M:%S' if isinstance(value, datetime.datetime) else '%Y-%m-%d')
+    if isinstance(value, xmlrpc.client.DateTime):
+        return str(value)
+    return repr(value)
+
+
+def _decode(value):
+    if '__bytes__' in value and len(value) == 1:
+        return xmlrpc.client.Binary(base64.b64decode(value['__bytes__']))
+    return value
+
+
+def read_recording(path):
+    """
+    Read the calls of a recording.
+
+    Args:
+        path (str): Path of the recording
+
+    Yields:
+        dict: The recorded calls, in the order they started
+    """
+    with gzip.open(path, 'rt', encoding='utf-8') as f:
+        for line in f:
+            if line.strip():
+                yield json.loads(line, object_hook=_decode)
+
+
+def percentile(values, fraction):
+    """
+    Nearest-rank percentile.
+
+    Args:
+        values (list): The values
+        fraction (float): The percentile, between 0 and 1
+
+    Returns:
+        float: The value, None if values is empty
+    """
+    if not values:
+        return None
+    ordered = sorted(values)
+    return ordered[max(0, math.ceil(fraction * len(ordered)) - 1)]
+
+
+class ReplayReport:
+    """Latencies and errors of a replay."""
+
+    def __init__(self):
+        # (model, method) -> list of latencies in seconds
+        self.latencies = {}
+        # (model, method) -> number of failed calls
+        self.errors = {}
+        self.calls = 0
+        self.skipped = 0
+        self.duration = 0.0
+        # Largest delay between a call's scheduled and actual start, in seconds
+        self.max_lag = 0.0
+
+    def summary(self):
+        """
+        Summarize the latencies per model and method.
+
+        Returns:
+            dict: ``{(model, method): {'calls', 'errors', 'p50', 'p90', 'p99', 'max'}}``
+                with an ``('*', '*')`` entry over all calls
+        """
+        result = {}
+        everything = []
+        for key, values in sorted(self.latencies.items()):
+            everything.extend(values)
+            result[key] = self._stats(values, self.errors.get(key, 0))
+        result[('*', '*')] = self._stats(everything, sum(self.errors.values()))
+        return result
+
+    @staticmethod
+    def _stats(values, errors):
+        return {
+            'calls': len(values),
+            'errors': errors,
+            'p50': percentile(values, 0.50),
+            'p90': percentile(values, 0.90),
+            'p99': percentile(values, 0.99),
+            'max': max(values) if values else None,
+        }
+
+    def __str__(self):
+        lines = [
+            f"{self.calls} calls in {self.duration:.1f}s ({self.calls / self.duration if self.duration else 0:.1f}/s), "
+            f"{self.skipped} skipped, max lag {self.max_lag * 1000:.0f} ms",
+            f"{'call':<40} {'calls':>7} {'errors':>7} {'p50 ms':>9} {'p90 ms':>9} {'p99 ms':>9} {'max ms':>9}",
+        ]
+        for (model, method), stats in self.summary().items():
+            if not stats['calls']:
+                continue
+            lines.append(
+                f"{model + '.' + method:<40} {stats['calls']:>7} {stats['errors']:>7} "
+                + ' '.join(f"{stats[name] * 1000:>9.1f}" for name in ('p50', 'p90', 'p99', 'max'))
+            )
+        return '\n'.join(lines)
+
+
+class Replayer:
+    """Sends the calls of a recording to a server again."""
+
+    def __init__(self, client, speed=1.0, concurrency=8, read_only=False):
+        """
+        Initialize the replayer.
+
+        Args:
+            client (DgteraClient): Authenticated or authenticating client of the target
+                server. Its connection pool should allow concurrency connections per host
+            speed (float, optional): Pace relative to the recording, 2.0 replays twice as
+                fast; None sends the calls as fast as concurrency allows
+            concurrency (int, optional): Maximum number of calls in flight
+            read_only (bool, optional): Skip calls of methods that may modify data
+        """
+        self.client = client
+        self.speed = speed
+        self.concurrency = concurrency
+        self.read_only = read_only
+
+    def run(self, calls):
+        """
+        Replay calls.
+
+        Calls are sent to the client's database whatever database they were
+        recorded on.
+
+        Args:
+            calls (iterable or str): Recorded calls, or the path of a recording
+
+        Returns:
+            ReplayReport: Latencies and errors of the replayed calls
+        """
+        if isinstance(calls, str):
+            calls = read_recording(calls)
+        report = ReplayReport()
+        lock = threading.Lock()
+        client = self.client
+        if not client.uid:
+            client.authenticate()
+
+        def send(entry, scheduled):
+            started = time.monotonic()
+            start = time.perf_counter()
+            failed = False
+            try:
+                client.execute_kw(entry['model'], entry['method'], entry['args'], entry['kwargs'])
+            except Exception as e:
+                failed = True
+                logger.debug(f"Replayed {entry['model']}.{entry['method']} failed: {e}")
+            latency = time.perf_counter() - start
+            key = (entry['model'], entry['method'])
+            with lock:
+                report.latencies.setdefault(key, []).append(latency)
+                if failed:
+                    report.errors[key] = report.errors.get(key, 0) + 1
+                report.calls += 1
+                report.max_lag = max(report.max_lag, started - scheduled)
+
+        # Bounds the calls queued in the executor, so a long recording is not loaded at once
+        slots = threading.BoundedSemaphore(self.concurrency * 2)
+
+        def run_one(entry, scheduled):
+            try:
+                send(entry, scheduled)
+            finally:
+                slots.release()
+
+        begin = time.monotonic()
+        first = None
+        with ThreadPoolExecutor(max_workers=self.concurrency) as executor:
+            for entry in calls:
+                if self.read_only and entry['method'] not in IDEMPOTENT_METHODS:
+                    report.skipped += 1
+                    continue
+                scheduled = time.monotonic()
+                if self.speed:
+                    if first is None:
+                        first = entry['t']
+                    scheduled = begin + (entry['t'] - first) / self.speed
+                    wait = scheduled - time.monotonic()
+                    if wait > 0:
+                        time.sleep(wait)
+                slots.acquire()
+                executor.submit(run_one, entry, scheduled)
+        report.duration = time.monotonic() - begin
+        return report
@@ -0,0 +1,213 @@
+"""
+Lazy recordsets.
+
+``client.browse(model, ids)`` returns a RecordSet whose records load their
+fields on first access, like Odoo's ORM does on the server. Reading a field
+of one record fetches that field for every record of the set that does not
+have it yet, in a single ``read`` call, so a loop over a recordset costs one
+call per field instead of one call per record.
+"""
+
+import logging
+
+from .exceptions import DgtException
+
+logger = logging.getLogger(__name__)
+
+# Maximum number of records loaded by a single prefetching read, as in Odoo
+PREFETCH_MAX = 1000
+
+
+class RecordSet:
+    """
+    An ordered set of records of one model, loading field values on demand.
+
+    Records taken from a set share its value cache, so loading a field
+    through any of them loads it for all. A RecordSet is not thread-safe.
+    """
+
+    def __init__(self, client, model, ids, _cache=None, _fields=None):
+        """
+        Initialize the recordset.
+
+        Args:
+            client (DgteraClient): Client used to read the records
+            model (str): The model name
+            ids (iterable): Record IDs
+        """
+        if isinstance(ids, int):
+            ids = [ids]
+        self._client = client
+        self._model = model
+        self._ids = tuple(ids)
+        # id -> {field: value}, shared with the records and subsets of this set
+        self._cache = _cache if _cache is not None else {}
+        # Field names of the model, fetched once per set when the client caches no fields
+        self._fields = _fields
+
+    @property
+    def model(self):
+        """The model name."""
+        return self._model
+
+    @property
+    def ids(self):
+        """The record IDs, in order."""
+        return list(self._ids)
+
+    def __len__(self):
+        return len(self._ids)
+
+    def __bool__(self):
+        return bool(self._ids)
+
+    def __iter__(self):
+        for record_id in self._ids:
+            yield Record(self, record_id)
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return RecordSet(self._client, self._model, self._ids[index], self._cache, self._fields)
+        return Record(self, self._ids[index])
+
+    def __eq__(self, other):
+        return (isinstance(other, RecordSet) and self._model == other._model
+                and self._ids == other._ids)
+
+    def __hash__(self):
+        return hash((self._model, self._ids))
+
+    def __repr__(self):
+        return f"{self._model}{self._ids!r}"
+
+    def read(self, fields):
+        """
+        Load fields for every record of the set that does not have them yet.
+
+        Args:
+            fields (list): Field names
+
+        Returns:
+            RecordSet: The recordset itself
+
+        Raises:
+            DgtException: If the read fails or a field does not exist
+        """
+        for name in fields:
+            if name != 'id':
+                self._load(name, self._ids)
+        return self
+
+    def mapped(self, name):
+        """
+        Get the value of a field for every record.
+
+        Args:
+            name (str): The field name
+
+        Returns:
+            list: The values, in record order
+        """
+        self.read([name])
+        return [self._get(record_id, name) for record_id in self._ids]
+
+    def filtered(self, predicate):
+        """
+        Select the records for which a function returns a true value.
+
+        Args:
+            predicate (callable): Called with each Record
+
+        Returns:
+            RecordSet: The selected records, sharing this set's cache
+        """
+        ids = [record.id for record in self if predicate(record)]
+        return RecordSet(self._client, self._model, ids, self._cache, self._fields)
+
+    def invalidate(self, fields=None):
+        """
+        Forget loaded values so they are read again on next access.
+
+        Args:
+            fields (list, optional): Only forget these fields, all if not specified
+        """
+        for values in self._cache.values():
+            if fields is None:
+                values.clear()
+            else:
+                for name in fields:
+                    values.pop(name, None)
+
+    def _has_field(self, name):
+        """Check that the model has a field, from the client's fields cache or this set's."""
+        client = self._client
+        if client.fields_cache is not None:
+            return name in client.fields_get(self._model)
+        if self._fields is None:
+            self._fields = frozenset(client.fields_get(self._model))
+        return name in self._fields
+
+    def _get(self, record_id, name):
+        """Return a field value of a record, loading it for the set if needed."""
+        values = self._cache.get(record_id)
+        if values is None or name not in values:
+            self._load(name, [record_id] + [i for i in self._ids if i != record_id])
+            values = self._cache.get(record_id)
+            if values is None or name not in values:
+                raise DgtException(f"Record {self._model}({record_id}) does not exist or is not readable")
+        return values[name]
+
+    def _load(self, name, ids):
+        """Read one field for the first PREFETCH_MAX of ids that do not have it yet."""
+        cache = self._cache
+        missing = []
+        seen = set()
+        for record_id in ids:
+            if record_id in seen:
+                continue
+            seen.add(record_id)
+            values = cache.get(record_id)
+            if values is None or name not in values:
+                missing.append(record_id)
+                if len(missing) >= PREFETCH_MAX:
+                    break
+        if not missing:
+            return
+
+        logger.debug(f"Prefetching {name} of {len(missing)} {self._model} records")
+        # Through client.read, so recordsets send the same arguments as the client
+        for row in self._client.read(self._model, missing, fields=[name]):
+            cache.setdefault(row['id'], {}).update(row)
+
+
+class Record:
+    """A single record of a RecordSet; field values are attributes."""
+
+    __slots__ = ('_recordset', 'id')
+
+    def __init__(self, recordset, record_id):
+        self._recordset = recordset
+        self.id = record_id
+
+    def __getattr__(self, name):
+        if name.startswith('_'):
+            raise AttributeError(name)
+        recordset = self._recordset
+        if not recordset._has_field(name):
+            raise AttributeError(f"{recordset.model} has no field {name!r}")
+        return recordset._get(self.id, name)
+
+    def __getitem__(self, name):
+        if name == 'id':
+            return self.id
+        return self._recordset._get(self.id, name)
+
+    def __eq__(self, other):
+        return (isinstance(other, Record) and self.id == other.id
+                and self._recordset.model == other._recordset.model)
+
+    def __hash__(self):
+        return hash((self._recordset.model, self.id))
+
+    def __repr__(self):
+        return f"{self._recordset.model}({self.id})"
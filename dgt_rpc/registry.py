@@ -0,0 +1,221 @@
+"""
+A registry of clients for fleets of tenant databases.
+
+``get_pos_data`` returns, for every POS, the URL, database and credentials of
+its own database. Building a fresh client per entry opens new connections and
+authenticates again every time. A ClientRegistry hands out one client per
+``(url, db, credentials)``, shares a transport and the connection pool between
+the clients of a server, caps the connections open over all tenants and
+forgets tenants that have not been used for a while.
+"""
+
+import logging
+import os
+import threading
+import time
+from collections import OrderedDict
+
+from .auth_cache import SECRET_SIZE, MemoryUidCache, hash_key
+from .client import DgteraPOSClient
+from .pool import ConnectionPool
+from .transport import get_transport_class
+
+logger = logging.getLogger(__name__)
+
+
+class ClientRegistry:
+    """
+    A thread-safe cache of clients keyed by server, database and credentials.
+
+    Evicted clients are only dropped from the registry; their connections
+    belong to the shared pool and their UIDs stay in the shared UID cache, so
+    a tenant coming back costs neither a handshake nor an authentication.
+    """
+
+    def __init__(self, client_class=DgteraPOSClient, pool=None, max_clients=1000,
+                 idle_timeout=600.0, uid_cache=None, protocol='xmlrpc', retry_policy=None,
+                 circuit_breaker=None, single_flight=None, metrics=None,
+                 interceptors=None, timeout=120, **client_options):
+        """
+        Initialize the registry.
+
+        Args:
+            client_class (type, optional): Class of the clients handed out
+            pool (ConnectionPool, optional): Pool shared by all clients. By default a
+                pool capped at 64 open connections over all hosts
+            max_clients (int, optional): Maximum number of clients kept, the least
+                recently used ones are evicted first
+            idle_timeout (float, optional): Seconds after which an unused client is
+                evicted, never if None
+            uid_cache (UidCache, optional): UID cache shared by all clients
+            protocol (str or type, optional): Wire protocol of the clients
+            retry_policy (RetryPolicy, optional): Retry policy of all clients
+            circuit_breaker (CircuitBreaker, optional): Circuit breaker shared by all
+                clients, so a server that is down is skipped by every tenant on it
+            single_flight (SingleFlight, optional): Registry of calls in flight shared
+                by all clients
+            metrics (Metrics, optional): Collector of the call metrics of all clients
+            interceptors (list, optional): Interceptors of every client, outermost first
+            timeout (float, optional): Socket timeout in seconds of every call, None to
+                wait forever; the same default as DgteraClient
+            **client_options: Other keyword arguments for the transports, e.g.
+                fast_decoder or compress_threshold
+        """
+        self.client_class = client_class
+        self._owns_pool = pool is None
+        self.pool = pool if pool is not None else ConnectionPool(
+            max_size=32, max_per_host=4, max_connections=64
+        )
+        self.max_clients = max_clients
+        self.idle_timeout = idle_timeout
+        self.uid_cache = uid_cache if uid_cache is not None else MemoryUidCache(max_size=max(max_clients, 1024))
+        self.transport_class = get_transport_class(protocol)
+        self.retry_policy = retry_policy
+        self.circuit_breaker = circuit_breaker
+        self.single_flight = single_flight
+        self.metrics = metrics
+        self.interceptors = list(interceptors) if interceptors else []
+        self.timeout = timeout
+        self.client_options = client_options
+        self._clients = OrderedDict()
+        # Key of the digests identifying the credentials of each client
+        self._secret = os.urandom(SECRET_SIZE)
+        # url -> [transport, number of clients using it]
+        self._transports = {}
+        self._lock = threading.Lock()
+        self.created = 0
+        self.evicted = 0
+
+    def get(self, url, db, username=None, password=None, api_key=None):
+        """
+        Get the client of a tenant, creating it on first use.
+
+        Args:
+            url (str): The base URL of the Odoo instance
+            db (str): The database name
+            username (str, optional): The username for authentication
+            password (str, optional): The password for authentication
+            api_key (str, optional): API key for authentication
+
+        Returns:
+            DgteraClient: The tenant's client
+        """
+        url = url.rstrip('/')
+        key = (url, db, hash_key((username, password, api_key), self._secret))
+        now = time.monotonic()
+
+        with self._lock:
+            self._evict_idle(now)
+            entry = self._clients.get(key)
+            if entry is not None:
+                client = entry[0]
+                self._clients[key] = (client, now)
+                self._clients.move_to_end(key)
+                return client
+
+            shared = self._transports.get(url)
+            if shared is None:
+                shared = self._transports[url] = [
+                    self.transport_class(url, self.pool, timeout=self.timeout, **self.client_options), 0
+                ]
+            transport = shared[0]
+            shared[1] += 1
+
+            client = self.client_class(url, db, username=username, password=password,
+                                       api_key=api_key, timeout=self.timeout, uid_cache=self.uid_cache,
+                                       transport=transport,
+                                       retry_policy=self.retry_policy, circuit_breaker=self.circuit_breaker,
+                                       single_flight=self.single_flight, metrics=self.metrics,
+                                       interceptors=self.interceptors)
+            self._clients[key] = (client, now)
+            self.created += 1
+            while len(self._clients) > self.max_clients:
+                self._evict(next(iter(self._clients)))
+            return client
+
+    def for_pos(self, pos_config):
+        """
+        Get the client of a POS configuration returned by ``get_pos_data``.
+
+        Args:
+            pos_config (dict): Entry with 'url', 'database' and 'api_key' or
+                'username' and 'password' keys
+
+        Returns:
+            DgteraClient: The client of the POS database
+        """
+        return self.get(
+            pos_config['url'], pos_config['database'],
+            username=pos_config.get('username'), password=pos_config.get('password'),
+            api_key=pos_config.get('api_key'),
+        )
+
+    def evict_idle(self):
+        """
+        Drop the clients that have not been used for idle_timeout seconds.
+
+        Returns:
+            int: Number of clients dropped
+        """
+        with self._lock:
+            return self._evict_idle(time.monotonic())
+
+    def close(self):
+        """Drop all clients and close the idle connections of the registry's own pool."""
+        with self._lock:
+            self._clients.clear()
+            self._transports.clear()
+        if self._owns_pool:
+            self.pool.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def __len__(self):
+        return len(self._clients)
+
+    def stats(self):
+        """
+        Return the registry statistics.
+
+        Returns:
+            dict: Numbers of clients, servers, created and evicted clients and connections
+        """
+        with self._lock:
+            return {
+                'clients': len(self._clients),
+                'servers': len(self._transports),
+                'created': self.created,
+                'evicted': self.evicted,
+                'active_connections': self.pool.active_count,
+                'idle_connections': self.pool.idle_count(),
+            }
+
+    def _evict_idle(self, now):
+        """Drop clients idle for too long. Lock must be held."""
+        if self.idle_timeout is None:
+            return 0
+        cutoff = now - self.idle_timeout
+        expired = []
+        # Entries are kept in order of last use, so stop at the first recent one
+        for key, (_, used) in self._clients.items():
+            if used > cutoff:
+                break
+            expired.append(key)
+        for key in expired:
+            self._evict(key)
+        return len(expired)
+
+    def _evict(self, key):
+        """Drop a client, and its server's transport if it was the last one. Lock must be held."""
+        del self._clients[key]
+        self.evicted += 1
+        url = key[0]
+        shared = self._transports[url]
+        shared[1] -= 1
+        if not shared[1]:
+            del self._transports[url]
+        logger.debug(f"Evicted client of {key[1]} on {url}")
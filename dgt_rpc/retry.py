@@ -0,0 +1,278 @@
+"""
+Retries and circuit breaking for RPC calls.
+
+A RetryPolicy repeats calls that failed for a transient reason, such as a
+dropped connection, a timeout or a 502/503/504 from a proxy, waiting longer
+after each attempt. Only methods that are safe to repeat are retried by
+default; other methods are only retried when the connection could not even be
+opened, so the server never saw the request.
+
+A CircuitBreaker counts consecutive transient failures per host and, past a
+threshold, rejects calls to that host at once for a while instead of letting
+every caller wait for its own timeout.
+"""
+
+import http.client
+import logging
+import random
+import socket
+import threading
+import time
+import xmlrpc.client
+
+from .exceptions import DgtException
+
+logger = logging.getLogger(__name__)
+
+# Read-only methods that can safely be sent again
+IDEMPOTENT_METHODS = frozenset({
+    'authenticate', 'version', 'search', 'read', 'search_read', 'search_count',
+    'name_search', 'name_get', 'fields_get', 'read_group', 'default_get',
+    'check_access_rights', 'get_pos_data', 'get_pos_orders',
+})
+
+# HTTP statuses of overloaded or restarting servers and proxies
+RETRY_STATUSES = frozenset({429, 502, 503, 504})
+
+# Errors meaning the request did not reach the server
+CONNECT_ERRORS = (ConnectionRefusedError, socket.gaierror)
+
+# Errors that may go away on their own
+TRANSIENT_ERRORS = (ConnectionError, TimeoutError, socket.timeout, http.client.HTTPException) + CONNECT_ERRORS
+
+
+class CircuitOpenError(DgtException):
+    """Raised without calling the server while its circuit breaker is open."""
+
+
+def is_transient(exception):
+    """
+    Check whether an error may go away if the call is repeated.
+
+    Args:
+        exception (Exception): The error
+
+    Returns:
+        bool: True for network errors, timeouts and overload HTTP statuses
+    """
+    if isinstance(exception, xmlrpc.client.ProtocolError):
+        return exception.errcode in RETRY_STATUSES
+    return isinstance(exception, TRANSIENT_ERRORS)
+
+
+class RetryPolicy:
+    """Exponential backoff with jitter for transient failures."""
+
+    def __init__(self, max_retries=3, delay=1.0, backoff=2.0, max_delay=30.0,
+                 jitter=True, methods=IDEMPOTENT_METHODS):
+        """
+        Initialize the policy.
+
+        Args:
+            max_retries (int, optional): Maximum number of retries after the first attempt
+            delay (float, optional): Seconds to wait before the first retry
+            backoff (float, optional): Factor applied to the delay after each retry
+            max_delay (float, optional): Upper bound of a single wait
+            jitter (bool, optional): Wait a random time between zero and the delay,
+                so clients failing together do not retry together
+            methods (iterable, optional): Methods retried on any transient error,
+                None to retry every method
+        """
+        self.max_retries = max_retries
+        self.delay = delay
+        self.backoff = backoff
+        self.max_delay = max_delay
+        self.jitter = jitter
+        self.methods = frozenset(methods) if methods is not None else None
+
+    def should_retry(self, method, exception, attempt):
+        """
+        Decide whether a failed call is tried again.
+
+        Args:
+            method (str): The RPC method
+            exception (Exception): The error raised by the attempt
+            attempt (int): Number of retries already made
+
+        Returns:
+            bool: True if the call should be retried
+        """
+        if attempt >= self.max_retries:
+            return False
+        if isinstance(exception, CONNECT_ERRORS):
+            return True
+        if self.methods is not None and method not in self.methods:
+            return False
+        return is_transient(exception)
+
+    def get_delay(self, attempt, exception=None):
+        """
+        Compute the wait before a retry.
+
+        A Retry-After header sent with a 429 or 503 response is honoured, up to
+        max_delay.
+
+        Args:
+            attempt (int): Number of retries already made
+            exception (Exception, optional): The error raised by the attempt
+
+        Returns:
+            float: Seconds to wait
+        """
+        headers = getattr(exception, 'headers', None) or {}
+        retry_after = next(
+            (value for name, value in dict(headers).items() if name.lower() == 'retry-after'), None
+        )
+        if retry_after is not None:
+            try:
+                return min(float(retry_after), self.max_delay)
+            except ValueError:
+                pass
+        delay = min(self.delay * self.backoff ** attempt, self.max_delay)
+        return random.uniform(0, delay) if self.jitter else delay
+
+    def call(self, func, method, host=None, breaker=None):
+        """
+        Call a function, retrying it on transient failures.
+
+        Args:
+            func (callable): Makes the call, without arguments
+            method (str): The RPC method, used to decide whether to retry
+            host (str, optional): Host the call goes to, for the circuit breaker
+            breaker (CircuitBreaker, optional): Circuit breaker to consult and update
+
+        Returns:
+            The result of func
+
+        Raises:
+            CircuitOpenError: If the breaker rejects the call
+            Exception: The last error of func if it is not retried
+        """
+        attempt = 0
+        while True:
+            try:
+                result = _call_through(func, host, breaker)
+            except CircuitOpenError:
+                raise
+            except Exception as e:
+                if not self.should_retry(method, e, attempt):
+                    raise
+                wait = self.get_delay(attempt, e)
+                attempt += 1
+                logger.warning(f"{method} on {host or 'server'} failed ({e!r}), "
+                               f"retry {attempt}/{self.max_retries} in {wait:.2f}s")
+                time.sleep(wait)
+            else:
+                return result
+
+
+def _call_through(func, host, breaker):
+    """Call func, letting the breaker reject it and recording the outcome."""
+    if breaker is None:
+        return func()
+    breaker.before_call(host)
+    try:
+        result = func()
+    except Exception as e:
+        if is_transient(e):
+            breaker.record_failure(host)
+        elif isinstance(e, xmlrpc.client.Error):
+            # The server answered, e.g. with a Fault, so it is up
+            breaker.record_success(host)
+        raise
+    breaker.record_success(host)
+    return result
+
+
+class CircuitBreaker:
+    """
+    Per-host circuit breaker shared by the clients it is given to.
+
+    A host's circuit opens after failure_threshold consecutive transient
+    failures. While open, calls fail immediately with CircuitOpenError. After
+    recovery_timeout seconds one trial call is let through: if it succeeds the
+    circuit closes, otherwise it stays open for another recovery_timeout.
+    """
+
+    CLOSED = 'closed'
+    OPEN = 'open'
+    HALF_OPEN = 'half_open'
+
+    def __init__(self, failure_threshold=5, recovery_timeout=30.0):
+        """
+        Initialize the circuit breaker.
+
+        Args:
+            failure_threshold (int, optional): Consecutive failures opening a circuit
+            recovery_timeout (float, optional): Seconds a circuit stays open before a trial call
+        """
+        self.failure_threshold = failure_threshold
+        self.recovery_timeout = recovery_timeout
+        # host -> [state, consecutive failures, time the circuit opened]
+        self._hosts = {}
+        self._lock = threading.Lock()
+
+    def state(self, host):
+        """
+        Return the state of a host's circuit.
+
+        Args:
+            host (str): The host
+
+        Returns:
+            str: 'closed', 'open' or 'half_open'
+        """
+        with self._lock:
+            entry = self._hosts.get(host)
+            return entry[0] if entry else self.CLOSED
+
+    def before_call(self, host):
+        """
+        Let a call through or reject it.
+
+        Raises:
+            CircuitOpenError: If the host's circuit is open
+        """
+        with self._lock:
+            entry = self._hosts.get(host)
+            if entry is None or entry[0] == self.CLOSED:
+                return
+            now = time.monotonic()
+            # Also lets a new trial through if the previous one never reported back
+            if now - entry[2] >= self.recovery_timeout:
+                entry[0] = self.HALF_OPEN
+                entry[2] = now
+                logger.info(f"Circuit for {host} half-open, sending a trial call")
+                return
+        raise CircuitOpenError(f"Circuit open for {host}, not calling the server")
+
+    def record_success(self, host):
+        """Close a host's circuit after a call that reached the server."""
+        with self._lock:
+            entry = self._hosts.pop(host, None)
+        if entry is not None and entry[0] != self.CLOSED:
+            logger.info(f"Circuit for {host} closed")
+
+    def record_failure(self, host):
+        """Count a transient failure, opening the circuit past the threshold."""
+        with self._lock:
+            entry = self._hosts.setdefault(host, [self.CLOSED, 0, 0.0])
+            entry[1] += 1
+            if entry[0] == self.HALF_OPEN or entry[1] >= self.failure_threshold:
+                if entry[0] != self.OPEN:
+                    logger.warning(f"Circuit for {host} opened after {entry[1]} failures")
+                entry[0] = self.OPEN
+                entry[2] = time.monotonic()
+
+    def reset(self, host=None):
+        """
+        Close circuits.
+
+        Args:
+            host (str, optional): Only close this host's circuit
+        """
+        with self._lock:
+            if host is None:
+                self._hosts.clear()
+            else:
+                self._hosts.pop(host, None)
@@ -0,0 +1,149 @@
+"""
+Coalescing of identical concurrent calls.
+
+When many threads ask for the same data at once, for example a burst of
+dashboard refreshes all calling ``get_pos_data(db)``, each would send its own
+identical request. With a SingleFlight, the first caller sends the request
+and the others wait for it and receive its result, or its exception.
+
+Only calls in flight are shared: a call made after the previous one returned
+goes to the server again. Combine it with a ResultCache to also reuse
+results over time.
+"""
+
+import copy
+import json
+import logging
+import threading
+
+from .retry import IDEMPOTENT_METHODS
+
+logger = logging.getLogger(__name__)
+
+
+class _Call:
+    """A call in flight and the outcome its waiters receive."""
+
+    __slots__ = ('done', 'result', 'error', 'waiters')
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+        self.waiters = 0
+
+
+class SingleFlight:
+    """
+    A thread-safe registry of calls in flight, may be shared between clients.
+
+    Keys include the server URL, database and user, so clients of different
+    servers or users never share results.
+    """
+
+    def __init__(self, methods=IDEMPOTENT_METHODS, copy_results=True):
+        """
+        Initialize the registry.
+
+        Args:
+            methods (iterable, optional): Read-only methods whose calls are shared
+            copy_results (bool, optional): Hand deep copies of the result to the
+                waiting callers, so each caller can modify its own
+        """
+        self.methods = frozenset(methods)
+        self.copy_results = copy_results
+        self._calls = {}
+        self._lock = threading.Lock()
+        self.calls = 0
+        self.shared = 0
+
+    def is_shared(self, method):
+        """
+        Check whether calls of a method may be shared.
+
+        Args:
+            method (str): The method name
+
+        Returns:
+            bool: True if the method is read-only
+        """
+        return method in self.methods
+
+    def make_key(self, url, db, uid, model, method, args, kwargs):
+        """
+        Build the key identifying identical calls.
+
+        Returns:
+            tuple: A hashable key
+        """
+        return (url, db, uid, model, method,
+                json.dumps(args, sort_keys=True, default=repr),
+                json.dumps(kwargs, sort_keys=True, default=repr))
+
+    def do(self, key, func):
+        """
+        Call a function, or wait for the identical call already in flight.
+
+        Args:
+            key (tuple): Key built by ``make_key``
+            func (callable): Makes the call, without arguments
+
+        Returns:
+            The result of the call
+
+        Raises:
+            Exception: The error raised by the call
+        """
+        with self._lock:
+            call = self._calls.get(key)
+            if call is None:
+                call = self._calls[key] = _Call()
+                leader = True
+                self.calls += 1
+            else:
+                call.waiters += 1
+                leader = False
+                self.shared += 1
+
+        if not leader:
+            logger.debug(f"Waiting for identical call {key[3]}.{key[4]} in flight")
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return copy.deepcopy(call.result) if self.copy_results else call.result
+
+        result = None
+        try:
+            result = func()
+        except BaseException as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+            # No waiter can join any more; copy before the caller gets to modify the result
+            if call.waiters and self.copy_results and call.error is None:
+                call.result = copy.deepcopy(result)
+            else:
+                call.result = result
+            call.done.set()
+        return result
+
+    def in_flight(self):
+        """
+        Return the number of calls in flight.
+
+        Returns:
+            int: Number of distinct calls waiting for the server
+        """
+        with self._lock:
+            return len(self._calls)
+
+    def stats(self):
+        """
+        Return the coalescing statistics.
+
+        Returns:
+            dict: Numbers of calls sent and of calls answered by another one in flight
+        """
+        return {'calls': self.calls, 'shared': self.shared}
@@ -0,0 +1,393 @@
+"""
+Incremental synchronization of Odoo models.
+
+Re-reading a whole model every cycle costs as much as the model is large even
+when a handful of rows changed. IncrementalSync keeps a ``(write_date, id)``
+watermark per database and model and only fetches the records written since,
+in keyset pages. Deleted records are found by comparing the number of
+matching records with the number known locally, and only when they differ by
+listing the matching IDs, which is much cheaper than reading the records.
+
+Checkpoints live in a pluggable store. They are saved after every page the
+consumer has processed, so a restarted process resumes where it stopped.
+Known IDs are kept as ``[first, last]`` ranges, compact for the mostly
+sequential IDs Odoo allocates.
+"""
+
+import datetime
+import json
+import logging
+import os
+import tempfile
+import threading
+
+from .auth_cache import _FileLock
+
+logger = logging.getLogger(__name__)
+
+WRITE_DATE_FORMAT = '%Y-%m-%d %H:%M:%S'
+
+
+def to_ranges(ids):
+    """
+    Encode IDs as ranges.
+
+    Args:
+        ids (iterable): Integer IDs
+
+    Returns:
+        list: Sorted ``[first, last]`` pairs covering exactly the IDs
+    """
+    ranges = []
+    for record_id in sorted(set(ids)):
+        if ranges and ranges[-1][1] == record_id - 1:
+            ranges[-1][1] = record_id
+        else:
+            ranges.append([record_id, record_id])
+    return ranges
+
+
+def from_ranges(ranges):
+    """
+    Decode ranges made by to_ranges.
+
+    Args:
+        ranges (list): ``[first, last]`` pairs
+
+    Returns:
+        set: The IDs
+    """
+    ids = set()
+    for first, last in ranges:
+        ids.update(range(first, last + 1))
+    return ids
+
+
+class CheckpointStore:
+    """
+    Base class of the checkpoint stores.
+
+    Checkpoints are JSON-compatible dictionaries keyed by strings.
+    Subclasses implement ``get``, ``set``, ``delete`` and ``clear``.
+    """
+
+    def get(self, key):
+        """
+        Look up a checkpoint.
+
+        Args:
+            key (str): The checkpoint key
+
+        Returns:
+            dict: The checkpoint, None if there is none
+        """
+        raise NotImplementedError
+
+    def set(self, key, checkpoint):
+        """
+        Store a checkpoint.
+
+        Args:
+            key (str): The checkpoint key
+            checkpoint (dict): The checkpoint
+        """
+        raise NotImplementedError
+
+    def delete(self, key):
+        """
+        Forget a checkpoint, so the next sync starts over.
+
+        Args:
+            key (str): The checkpoint key
+        """
+        raise NotImplementedError
+
+    def clear(self):
+        """Forget all checkpoints."""
+        raise NotImplementedError
+
+
+class MemoryCheckpointStore(CheckpointStore):
+    """An in-process checkpoint store, lost when the process exits."""
+
+    def __init__(self):
+        self._checkpoints = {}
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            checkpoint = self._checkpoints.get(key)
+            return dict(checkpoint) if checkpoint is not None else None
+
+    def set(self, key, checkpoint):
+        with self._lock:
+            self._checkpoints[key] = dict(checkpoint)
+
+    def delete(self, key):
+        with self._lock:
+            self._checkpoints.pop(key, None)
+
+    def clear(self):
+        with self._lock:
+            self._checkpoints.clear()
+
+
+class FileCheckpointStore(CheckpointStore):
+    """
+    A checkpoint store kept in a JSON file.
+
+    Like FileUidCache, the file is locked through a sidecar ``.lock`` file
+    and replaced atomically, so several processes may share it.
+    """
+
+    def __init__(self, path):
+        """
+        Initialize the store.
+
+        Args:
+            path (str): Path of the JSON file
+        """
+        self.path = os.path.expanduser(path)
+        self._lock = threading.Lock()
+        os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+
+    def get(self, key):
+        with self._locked(shared=True):
+            return self._read().get(key)
+
+    def set(self, key, checkpoint):
+        with self._locked():
+            checkpoints = self._read()
+            checkpoints[key] = checkpoint
+            self._write(checkpoints)
+
+    def delete(self, key):
+        with self._locked():
+            checkpoints = self._read()
+            if checkpoints.pop(key, None) is not None:
+                self._write(checkpoints)
+
+    def clear(self):
+        with self._locked():
+            self._write({})
+
+    def _locked(self, shared=False):
+        return _FileLock(self.path + '.lock', self._lock, shared)
+
+    def _read(self):
+        """Load the checkpoints. Lock must be held."""
+        try:
+            with open(self.path, encoding='utf-8') as f:
+                checkpoints = json.load(f)
+            if not isinstance(checkpoints, dict):
+                raise ValueError("not a JSON object")
+            return checkpoints
+        except FileNotFoundError:
+            return {}
+        except (OSError, ValueError) as e:
+            logger.warning(f"Ignoring unreadable checkpoint file {self.path}: {e}")
+            return {}
+
+    def _write(self, checkpoints):
+        """Replace the file atomically. Lock must be held."""
+        directory = os.path.dirname(os.path.abspath(self.path))
+        fd, tmp = tempfile.mkstemp(dir=directory, suffix='.tmp')
+        try:
+            with os.fdopen(fd, 'w', encoding='utf-8') as f:
+                json.dump(checkpoints, f, separators=(',', ':'))
+            os.replace(tmp, self.path)
+        except BaseException:
+            try:
+                os.remove(tmp)
+            except OSError:
+                pass
+            raise
+
+
+class SyncBatch:
+    """Changes found by one step of a synchronization."""
+
+    __slots__ = ('model', 'records', 'deleted')
+
+    def __init__(self, model, records=None, deleted=None):
+        """
+        Initialize the batch.
+
+        Args:
+            model (str): The model name
+            records (list, optional): Records created or written since the checkpoint
+            deleted (list, optional): IDs of records deleted, or no longer matching the domain
+        """
+        self.model = model
+        self.records = records or []
+        self.deleted = deleted or []
+
+    def __repr__(self):
+        return f"SyncBatch({self.model}, {len(self.records)} changed, {len(self.deleted)} deleted)"
+
+
+class IncrementalSync:
+    """
+    Fetches the records of models changed since the last synchronization.
+
+    ``changes`` yields batches of changed records, then one batch of deleted
+    IDs; the consumer applies them, for example to a local copy. A
+    checkpoint is saved when the consumer asks for the next batch, so a
+    batch whose processing was interrupted is fetched again after a restart,
+    and the records of the batches delivered before it are read again when
+    the resumed sync reconciles IDs. Consumers should therefore apply records
+    as upserts.
+    """
+
+    def __init__(self, client, store=None, page_size=1000, overlap=0):
+        """
+        Initialize the synchronization.
+
+        Args:
+            client (DgteraClient): The client, whose database is synchronized
+            store (CheckpointStore, optional): Where checkpoints are kept, in memory if not specified
+            page_size (int, optional): Number of records fetched per call
+            overlap (float, optional): Seconds before the watermark that are read again,
+                to catch records committed by long transactions with an earlier write_date.
+                Records in the overlap are delivered again
+        """
+        self.client = client
+        self.store = store if store is not None else MemoryCheckpointStore()
+        self.page_size = page_size
+        self.overlap = overlap
+
+    def checkpoint_key(self, model, name=None):
+        """
+        Key of a model's checkpoint in the store.
+
+        Args:
+            model (str): The model name
+            name (str, optional): Distinguishes syncs of one model with different domains
+
+        Returns:
+            str: The key
+        """
+        key = f"{self.client.db}/{model}"
+        return f"{key}/{name}" if name else key
+
+    def reset(self, model, name=None):
+        """
+        Forget a model's checkpoint, so the next sync fetches every record.
+
+        Args:
+            model (str): The model name
+            name (str, optional): As given to ``changes``
+        """
+        self.store.delete(self.checkpoint_key(model, name))
+
+    def changes(self, model, domain=None, fields=None, name=None):
+        """
+        Fetch the changes of a model since its checkpoint.
+
+        Args:
+            model (str): The model name
+            domain (list, optional): Restricts the synchronized records; records that
+                stop matching it are reported as deleted
+            fields (list, optional): Fields to read, 'id' and 'write_date' are added
+            name (str, optional): Distinguishes syncs of one model with different domains
+
+        Yields:
+            SyncBatch: Pages of changed records, then the deleted IDs if any
+
+        Raises:
+            DgtException: If a call fails; the checkpoint of the batches already
+                processed is kept
+        """
+        domain = list(domain or [])
+        key = self.checkpoint_key(model, name)
+        checkpoint = self.store.get(key) or {}
+        # A partial checkpoint was saved in the middle of a sync: the IDs delivered
+        # before the interruption are not in it, so they are read again below
+        resumed = checkpoint.get('partial', False)
+        ranges = checkpoint.get('ids', [])
+        known = from_ranges(ranges)
+        changed_ids = set()
+
+        watermark = checkpoint.get('write_date')
+        last_id = checkpoint.get('id', 0)
+        page_domain = list(domain)
+        if watermark:
+            if self.overlap:
+                start = datetime.datetime.strptime(watermark, WRITE_DATE_FORMAT)
+                start -= datetime.timedelta(seconds=self.overlap)
+                page_domain.append(('write_date', '>=', start.strftime(WRITE_DATE_FORMAT)))
+            else:
+                page_domain += [
+                    '|', ('write_date', '>', watermark),
+                    '&', ('write_date', '=', watermark), ('id', '>', last_id),
+                ]
+
+        for page in self.client.iter_search_read(model, page_domain, fields=fields,
+                                                 page_size=self.page_size, key='write_date', pages=True):
+            yield SyncBatch(model, page)
+            changed_ids.update(record['id'] for record in page)
+            last = page[-1]
+            if watermark is None or (last['write_date'], last['id']) > (watermark, last_id):
+                watermark, last_id = last['write_date'], last['id']
+            self.store.set(key, {'write_date': watermark, 'id': last_id, 'ids': ranges, 'partial': True})
+
+        current = known | changed_ids
+        count = self.client.execute_kw(model, 'search_count', [domain])
+        deleted = []
+        if count != len(current) or resumed:
+            server_ids = self._list_ids(model, domain)
+            deleted = sorted(current - server_ids)
+            missed = server_ids - current
+            if missed:
+                if resumed:
+                    logger.info(f"Reading {len(missed)} {model} records not checkpointed before the interruption")
+                else:
+                    logger.warning(f"{len(missed)} {model} records were missed by the watermark, reading them")
+                records = self.client.read(model, sorted(missed), fields=self._fields(fields))
+                yield SyncBatch(model, records)
+            current = server_ids
+            if deleted:
+                yield SyncBatch(model, deleted=deleted)
+
+        if current != known or resumed or checkpoint.get('write_date') != watermark:
+            self.store.set(key, {'write_date': watermark, 'id': last_id, 'ids': to_ranges(current)})
+
+    def sync(self, model, domain=None, fields=None, name=None):
+        """
+        Fetch all changes of a model since its checkpoint at once.
+
+        Args:
+            model (str): The model name
+            domain (list, optional): Restricts the synchronized records
+            fields (list, optional): Fields to read
+            name (str, optional): Distinguishes syncs of one model with different domains
+
+        Returns:
+            SyncBatch: The changed records and deleted IDs
+
+        Raises:
+            DgtException: If a call fails
+        """
+        result = SyncBatch(model)
+        for batch in self.changes(model, domain, fields, name):
+            result.records.extend(batch.records)
+            result.deleted.extend(batch.deleted)
+        return result
+
+    def _list_ids(self, model, domain):
+        """List the IDs matching a domain, one page at a time."""
+        ids = set()
+        last_id = 0
+        while True:
+            page = self.client.search(model, list(domain) + [('id', '>', last_id)],
+                                      limit=self.page_size * 10, order='id asc')
+            ids.update(page)
+            if len(page) < self.page_size * 10:
+                return ids
+            last_id = page[-1]
+
+    @staticmethod
+    def _fields(fields):
+        if not fields:
+            return fields
+        return list(fields) + [name for name in ('id', 'write_date') if name not in fields]
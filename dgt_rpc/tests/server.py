@@ -0,0 +1,82 @@
+"""
+A local XML-RPC and JSON-RPC server standing in for Odoo in tests.
+"""
+
+import gzip
+import json
+import threading
+from socketserver import ThreadingMixIn
+from xmlrpc.server import SimpleXMLRPCServer, SimpleXMLRPCRequestHandler
+
+
+class KeepAliveHandler(SimpleXMLRPCRequestHandler):
+    """Request handler speaking HTTP/1.1 so connections stay open."""
+    protocol_version = "HTTP/1.1"
+    rpc_paths = ('/xmlrpc/2/common', '/xmlrpc/2/object')
+
+    def setup(self):
+        super().setup()
+        with self.server.lock:
+            self.server.connections += 1
+
+    def do_POST(self):
+        if self.path != '/jsonrpc':
+            return super().do_POST()
+
+        body = self.rfile.read(int(self.headers['Content-Length']))
+        if self.headers.get('Content-Encoding') == 'gzip':
+            body = gzip.decompress(body)
+        request = json.loads(body)
+        params = request['params']
+        try:
+            func = self.server.funcs[params['method']]
+            response = {'jsonrpc': '2.0', 'id': request['id'], 'result': func(*params['args'])}
+        except Exception as e:
+            response = {'jsonrpc': '2.0', 'id': request['id'], 'error': {
+                'code': 200, 'message': 'Odoo Server Error',
+                'data': {'name': type(e).__name__, 'message': str(e)},
+            }}
+        body = json.dumps(response).encode()
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/json')
+        if len(body) > self.encode_threshold and 'gzip' in self.headers.get('Accept-Encoding', ''):
+            body = gzip.compress(body)
+            self.send_header('Content-Encoding', 'gzip')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+
+class LocalServer(ThreadingMixIn, SimpleXMLRPCServer):
+    """
+    Threaded XML-RPC server recording every execute_kw call.
+
+    ``handler`` is called with ``(model, method, args, kwargs)`` and its return
+    value is sent back; by default the server echoes ``[model, method]``.
+    """
+    daemon_threads = True
+
+    def __init__(self, handler=None, uid=7, port=0):
+        super().__init__(('127.0.0.1', port), requestHandler=KeepAliveHandler,
+                         logRequests=False, allow_none=True)
+        self.lock = threading.Lock()
+        self.connections = 0
+        self.calls = []
+        self.handler = handler or (lambda model, method, args, kwargs: [model, method])
+        self.register_function(lambda db, login, key, ctx=None: uid, 'authenticate')
+        self.register_function(self._execute_kw, 'execute_kw')
+        self.url = f"http://127.0.0.1:{self.server_address[1]}"
+        self.host = f"127.0.0.1:{self.server_address[1]}"
+
+    def _execute_kw(self, db, uid, key, model, method, args, kwargs=None):
+        with self.lock:
+            self.calls.append((db, model, method, args, kwargs))
+        return self.handler(model, method, args, kwargs or {})
+
+    def start(self, testcase):
+        """Serve in a background thread until the test case is cleaned up."""
+        thread = threading.Thread(target=self.serve_forever, args=(0.01,), daemon=True)
+        thread.start()
+        testcase.addCleanup(self.server_close)
+        testcase.addCleanup(self.shutdown)
+        return self
@@ -0,0 +1,164 @@
+import unittest
+from array import array
+
+from dgt_rpc import DgtClient, DgtException, Columns
+from dgt_rpc.aggregate import parse_groupby, parse_measures, period_start
+from dgt_rpc.columns import NAT
+from dgt_rpc.tests.server import LocalServer
+
+FIELDS = {
+    "id": {"type": "integer"},
+    "name": {"type": "char"},
+    "amount_total": {"type": "monetary"},
+    "qty": {"type": "integer"},
+    "date_order": {"type": "datetime"},
+    "config_id": {"type": "many2one"},
+    "partner_id": {"type": "many2one"},
+}
+
+ORDERS = [
+    {"id": 1, "config_id": [1, "POS 1"], "day": "2024-03-01", "amount_total": 10.0, "partner_id": 5},
+    {"id": 2, "config_id": [1, "POS 1"], "day": "2024-03-01", "amount_total": 5.0, "partner_id": 5},
+    {"id": 3, "config_id": [1, "POS 1"], "day": "2024-03-02", "amount_total": 2.5, "partner_id": 6},
+    {"id": 4, "config_id": [2, "POS 2"], "day": "2024-03-01", "amount_total": 7.0, "partner_id": 5},
+    {"id": 5, "config_id": False, "day": "2024-03-02", "amount_total": 1.0, "partner_id": 7},
+]
+
+
+def read_group(domain, fields, groupby, offset=0, limit=None, orderby=None, lazy=True):
+    """A small read_group over ORDERS, grouping by config_id and date_order:day."""
+    records = ORDERS
+    for term in domain:
+        if term[0] == "config_id":
+            records = [r for r in records if (r["config_id"] or [False])[0] == term[2]]
+    if lazy:
+        groupby = groupby[:1]
+    groups = {}
+    for record in records:
+        key = tuple(record["config_id"] if spec == "config_id" else record["day"] for spec in groupby)
+        # Like Odoo, the group of records without a value comes last
+        groups.setdefault(tuple((value is False, str(value)) for value in key), (key, []))[1].append(record)
+    result = []
+    for _, (key, members) in sorted(groups.items()):
+        group = {"__domain": list(domain)}
+        for spec, value in zip(groupby, key):
+            if spec == "config_id":
+                group[spec] = value
+                group["__domain"].append(["config_id", "=", value[0] if value else False])
+            else:
+                group[spec] = "01 Mar 2024"
+                group["__domain"] += [["date_order", ">=", f"{value} 00:00:00"], ["date_order", "<", "..."]]
+        for spec in fields:
+            field, _, function = spec.partition(":")
+            values = [record[field] for record in members]
+            group[field] = len(set(values)) if function == "count_distinct" else sum(values)
+        if lazy:
+            group[f"{groupby[0].split(':')[0]}_count"] = len(members)
+        else:
+            group["__count"] = len(members)
+        result.append(group)
+    return result[offset:offset + limit if limit else None]
+
+
+class TestAggregateSpecs(unittest.TestCase):
+    """Test cases for the group-by and measure specifications."""
+
+    def test_groupby(self):
+        """Test that group-bys are validated and dates get a granularity."""
+        self.assertEqual(parse_groupby(FIELDS, ["config_id", "date_order:week"]),
+                         [("config_id", "config_id", None), ("date_order:week", "date_order", "week")])
+        self.assertEqual(parse_groupby(FIELDS, "date_order"), [("date_order:month", "date_order", "month")])
+        for groupby in (["missing"], ["date_order:hour"], ["name:day"]):
+            with self.assertRaises(DgtException):
+                parse_groupby(FIELDS, groupby)
+
+    def test_measures(self):
+        """Test that measures are validated and the count is implicit."""
+        self.assertEqual(parse_measures(FIELDS, ["amount_total:sum", "qty", "count", "partner_id:count_distinct"]),
+                         [("amount_total", "sum"), ("qty", None), ("partner_id", "count_distinct")])
+        for measures in (["missing:sum"], ["amount_total:median"], ["name"]):
+            with self.assertRaises(DgtException):
+                parse_measures(FIELDS, measures)
+
+    def test_period_start(self):
+        """Test that the period start comes from __range, else from __domain."""
+        group = {"__range": {"date_order:month": {"from": "2024-03-01", "to": "2024-04-01"}}}
+        self.assertEqual(period_start(group, "date_order:month", "date_order"), "2024-03-01")
+        group = {"__domain": ["&", ["date_order", ">=", "2024-03-01 00:00:00"], ["date_order", "<", "x"]]}
+        self.assertEqual(period_start(group, "date_order:month", "date_order"), "2024-03-01 00:00:00")
+        self.assertIsNone(period_start({"__domain": []}, "date_order:month", "date_order"))
+
+
+class TestClientAggregate(unittest.TestCase):
+    """Test cases for DgteraClient.aggregate."""
+
+    def setUp(self):
+        """Start a local server answering fields_get and read_group."""
+        def handler(model, method, args, kwargs):
+            if method == "fields_get":
+                return FIELDS
+            return read_group(*args, **kwargs)
+        self.server = LocalServer(handler).start(self)
+        self.client = DgtClient(self.server.url, "test_db", api_key="key")
+        self.addCleanup(self.client.close)
+
+    def group_calls(self):
+        return [call for call in self.server.calls if call[2] == "read_group"]
+
+    def test_flat_rows(self):
+        """Test that nested groups come back as flat rows in one call."""
+        rows = self.client.aggregate("pos.order", [], ["config_id", "date_order:day"],
+                                     ["amount_total:sum", "partner_id:count_distinct"])
+        self.assertEqual(rows[0], {
+            "config_id": 1, "config_id_name": "POS 1", "date_order:day": "2024-03-01 00:00:00",
+            "amount_total": 15.0, "partner_id": 1, "count": 2,
+        })
+        self.assertEqual(len(rows), 4)
+        self.assertEqual(rows[-1]["config_id"], None)
+        calls = self.group_calls()
+        self.assertEqual(len(calls), 1)
+        self.assertEqual(calls[0][3], [[], ["amount_total:sum", "partner_id:count_distinct"],
+                                       ["config_id", "date_order:day"]])
+        self.assertEqual(calls[0][4], {"offset": 0, "limit": 1000, "lazy": False})
+
+    def test_paging(self):
+        """Test that groups are fetched page by page until a short page."""
+        rows = self.client.aggregate("pos.order", [], ["config_id", "date_order:day"], ["amount_total"],
+                                     page_size=2, row_type="tuple")
+        self.assertEqual([row["amount_total"] for row in rows], [15.0, 2.5, 7.0, 1.0])
+        self.assertEqual([call[4]["offset"] for call in self.group_calls()], [0, 2, 4])
+
+    def test_lazy(self):
+        """Test that lazy grouping reads the sub-groups of each group with its domain."""
+        rows = self.client.aggregate("pos.order", [], ["config_id", "date_order:day"], ["amount_total"],
+                                     lazy=True)
+        self.assertEqual([(row["config_id"], row["count"]) for row in rows],
+                         [(1, 2), (1, 1), (2, 1), (None, 1)])
+        calls = self.group_calls()
+        self.assertEqual(len(calls), 4)
+        self.assertEqual(calls[1][3][0], [["config_id", "=", 1]])
+        self.assertEqual(calls[1][3][2], ["date_order:day"])
+
+    def test_columns(self):
+        """Test that groups can come back as typed columns."""
+        columns = self.client.aggregate("pos.order", [], ["config_id", "date_order:day"],
+                                        ["amount_total", "partner_id:count_distinct"], columns=True)
+        self.assertIsInstance(columns, Columns)
+        self.assertEqual(list(columns), ["config_id", "config_id_name", "date_order:day",
+                                         "amount_total", "partner_id", "count"])
+        self.assertEqual(columns["config_id"], array("q", [1, 1, 2, 0]))
+        self.assertEqual(columns["date_order:day"][0], 19783 * 86400)
+        self.assertNotEqual(columns["date_order:day"][0], NAT)
+        self.assertEqual(columns["count"], array("q", [2, 1, 1, 1]))
+
+    def test_invalid(self):
+        """Test that invalid specifications fail before read_group is called."""
+        with self.assertRaises(DgtException):
+            self.client.aggregate("pos.order", [], ["date_order:hour"], ["amount_total"])
+        with self.assertRaises(DgtException):
+            self.client.aggregate("pos.order", [], [], ["amount_total"])
+        self.assertEqual(self.group_calls(), [])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,86 @@
+import asyncio
+import unittest
+
+from dgt_rpc import AsyncDgtClient, AsyncDgtPOSClient, DgtException
+from dgt_rpc.async_client import AsyncConnectionPool
+from dgt_rpc.tests.server import LocalServer
+
+
+class TestAsyncDgtClient(unittest.IsolatedAsyncioTestCase):
+    """Test cases for the AsyncDgtClient class."""
+
+    def setUp(self):
+        """Start a local XML-RPC server."""
+        self.server = LocalServer().start(self)
+
+    async def test_authenticate(self):
+        """Test authentication with an API key."""
+        async with AsyncDgtClient(self.server.url, db="test_db", api_key="key") as client:
+            uid = await client.authenticate()
+
+            self.assertEqual(uid, 7)
+            self.assertEqual(client.uid, 7)
+
+    async def test_search_read(self):
+        """Test that search_read sends the same arguments as the blocking client."""
+        async with AsyncDgtClient(self.server.url, db="test_db", api_key="key") as client:
+            result = await client.search_read("res.partner", [("id", ">", 0)], fields=["name"], limit=5)
+
+        self.assertEqual(result, ["res.partner", "search_read"])
+        self.assertEqual(self.server.calls, [(
+            "test_db", "res.partner", "search_read", [[["id", ">", 0]]],
+            {"offset": 0, "limit": 5, "order": None, "fields": ["name"]}
+        )])
+
+    async def test_concurrent_calls_share_pool(self):
+        """Test that many concurrent calls stay within the per-host limit."""
+        pool = AsyncConnectionPool(max_per_host=3)
+        async with AsyncDgtClient(self.server.url, db="test_db", api_key="key", pool=pool) as client:
+            results = await asyncio.gather(*[
+                client.read("res.partner", [i], ["name"]) for i in range(30)
+            ])
+
+            self.assertEqual(len(results), 30)
+            self.assertLessEqual(self.server.connections, 3)
+            self.assertGreater(pool.reused, 0)
+
+    async def test_fault_wrapped(self):
+        """Test that server faults are raised as DgtException."""
+        def handler(model, method, args, kwargs):
+            raise ValueError("boom")
+        self.server.handler = handler
+
+        async with AsyncDgtClient(self.server.url, db="test_db", api_key="key") as client:
+            with self.assertRaises(DgtException) as context:
+                await client.execute_kw("res.partner", "search", [[]])
+
+        self.assertIn("Odoo Server Error", str(context.exception))
+
+    async def test_pos_methods(self):
+        """Test the POS helpers of AsyncDgtPOSClient."""
+        async with AsyncDgtPOSClient(self.server.url, db="admin_db", api_key="key") as client:
+            await client.get_pos_data("retail_db")
+            await client.get_pos_orders({"id": 3}, "retail_db", limit=5)
+
+        self.assertEqual(self.server.calls[0][1:4], ("pos.config", "get_pos_data", ["retail_db", True]))
+        self.assertEqual(self.server.calls[1][1:4], ("pos.order", "get_pos_orders", [3, "retail_db", 5, False]))
+
+    async def test_get_pos_orders_many(self):
+        """Test concurrent order fetching with per-config errors."""
+        def handler(model, method, args, kwargs):
+            if args[0] == 2:
+                raise ValueError("broken POS")
+            return {"all": [args[0]]}
+        self.server.handler = handler
+
+        async with AsyncDgtPOSClient(self.server.url, db="admin_db", api_key="key") as client:
+            results = [r async for r in client.get_pos_orders_many([1, 2, 3], "retail_db", max_concurrency=2)]
+
+        self.assertEqual(sorted(r.pos_config for r in results if r.ok), [1, 3])
+        failed = [r for r in results if not r.ok]
+        self.assertEqual([r.pos_config for r in failed], [2])
+        self.assertIsInstance(failed[0].error, DgtException)
+
+
+if __name__ == '__main__':
+    unittest.main()
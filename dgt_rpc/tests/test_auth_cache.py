@@ -0,0 +1,188 @@
+import hashlib
+import json
+import os
+import stat
+import subprocess
+import sys
+import tempfile
+import unittest
+import xmlrpc.client
+from unittest.mock import patch, MagicMock
+
+from dgt_rpc import DgtClient, DgtException, MemoryUidCache, FileUidCache
+
+WRITER = """
+import sys
+from dgt_rpc import FileUidCache
+cache = FileUidCache(sys.argv[1])
+for i in range(50):
+    cache.set(("https://odoo", f"db_{sys.argv[2]}_{i}", "key"), i)
+"""
+
+
+class TestMemoryUidCache(unittest.TestCase):
+    """Test cases for the MemoryUidCache class."""
+
+    def test_lru_eviction(self):
+        """Test that the cache is bounded and evicts the least recently used UID."""
+        cache = MemoryUidCache(max_size=2)
+        cache[("url", "db1", "key")] = 1
+        cache[("url", "db2", "key")] = 2
+        self.assertEqual(cache[("url", "db1", "key")], 1)
+        cache[("url", "db3", "key")] = 3
+
+        self.assertEqual(len(cache), 2)
+        self.assertIn(("url", "db1", "key"), cache)
+        self.assertNotIn(("url", "db2", "key"), cache)
+        with self.assertRaises(KeyError):
+            cache[("url", "db2", "key")]
+
+    def test_ttl(self):
+        """Test that UIDs expire."""
+        cache = MemoryUidCache(ttl=60)
+        with patch("dgt_rpc.auth_cache.time.monotonic", return_value=0):
+            cache.set(("url", "db", "key"), 7)
+        with patch("dgt_rpc.auth_cache.time.monotonic", return_value=59):
+            self.assertEqual(cache.get(("url", "db", "key")), 7)
+        with patch("dgt_rpc.auth_cache.time.monotonic", return_value=60):
+            self.assertIsNone(cache.get(("url", "db", "key")))
+
+
+class TestFileUidCache(unittest.TestCase):
+    """Test cases for the FileUidCache class."""
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+        self.path = os.path.join(self.tmp.name, "uids.json")
+
+    def test_shared_and_hashed(self):
+        """Test that UIDs are shared between instances and credentials are not stored."""
+        FileUidCache(self.path).set(("https://odoo", "db", "user", "s3cret-password"), 7)
+
+        cache = FileUidCache(self.path)
+        self.assertEqual(cache.get(("https://odoo", "db", "user", "s3cret-password")), 7)
+        self.assertIsNone(cache.get(("https://odoo", "db", "user", "wrong")))
+
+        with open(self.path) as f:
+            content = f.read()
+        self.assertNotIn("s3cret-password", content)
+        self.assertNotIn("user", content)
+        self.assertEqual(stat.S_IMODE(os.stat(self.path).st_mode), 0o600)
+
+        cache.delete(("https://odoo", "db", "user", "s3cret-password"))
+        self.assertEqual(len(FileUidCache(self.path)), 0)
+
+    def test_keyed_digests(self):
+        """Test that digests are keyed with a private secret, not plain hashes of the credentials."""
+        key = ("https://odoo", "db", "user", "password")
+        FileUidCache(self.path).set(key, 7)
+        with open(self.path) as f:
+            digests = list(json.load(f))
+        plain = hashlib.sha256(json.dumps(list(key)).encode("utf-8")).hexdigest()
+        self.assertNotIn(plain, digests)
+        self.assertEqual(stat.S_IMODE(os.stat(self.path + ".key").st_mode), 0o600)
+
+        # Without the key file, entries cannot be matched and are discarded
+        os.remove(self.path + ".key")
+        cache = FileUidCache(self.path)
+        self.assertIsNone(cache.get(key))
+        self.assertEqual(len(cache), 0)
+
+    def test_bounds(self):
+        """Test TTL expiry and eviction of the least recently used entries."""
+        cache = FileUidCache(self.path, max_size=2, ttl=100)
+        with patch("dgt_rpc.auth_cache.time.time", return_value=1000):
+            cache.set(("url", "db1", "key"), 1)
+        with patch("dgt_rpc.auth_cache.time.time", return_value=1010):
+            cache.set(("url", "db2", "key"), 2)
+        with patch("dgt_rpc.auth_cache.time.time", return_value=1080):
+            self.assertEqual(cache.get(("url", "db1", "key")), 1)
+            cache.set(("url", "db3", "key"), 3)
+            self.assertIsNone(cache.get(("url", "db2", "key")))
+            self.assertEqual(len(cache), 2)
+        with patch("dgt_rpc.auth_cache.time.time", return_value=1100):
+            self.assertIsNone(cache.get(("url", "db1", "key")))
+            self.assertEqual(cache.get(("url", "db3", "key")), 3)
+
+    def test_corrupt_file(self):
+        """Test that an unreadable file is ignored and replaced."""
+        cache = FileUidCache(self.path)
+        with open(self.path, "w") as f:
+            f.write("{broken")
+        with self.assertLogs("dgt_rpc.auth_cache", "WARNING"):
+            self.assertIsNone(cache.get(("url", "db", "key")))
+        cache.set(("url", "db", "key"), 5)
+        self.assertEqual(FileUidCache(self.path).get(("url", "db", "key")), 5)
+
+    def test_concurrent_processes(self):
+        """Test that writers in several processes do not lose each other's entries."""
+        env = dict(os.environ, PYTHONPATH=os.pathsep.join(sys.path))
+        writers = [
+            subprocess.Popen([sys.executable, "-c", WRITER, self.path, str(n)], env=env)
+            for n in range(3)
+        ]
+        for writer in writers:
+            self.assertEqual(writer.wait(timeout=60), 0)
+        self.assertEqual(len(FileUidCache(self.path)), 150)
+
+
+class TestClientUidCache(unittest.TestCase):
+    """Test cases for clients sharing a UID cache."""
+
+    def test_cold_start_skips_authenticate(self):
+        """Test that a new client reuses a UID stored by another one."""
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "uids.json")
+            for expected_calls in (1, 0):
+                client = DgtClient(url="https://test.dgtera.com", db="test_db",
+                                   api_key="test_api_key", uid_cache=FileUidCache(path))
+                common_mock = MagicMock()
+                common_mock.authenticate.return_value = 9
+                with patch.object(client, '_get_common_connection', return_value=common_mock):
+                    self.assertEqual(client.authenticate(), 9)
+                self.assertEqual(common_mock.authenticate.call_count, expected_calls)
+
+    def test_refused_uid_is_evicted(self):
+        """Test that a UID the server refuses is removed from the cache and authentication is redone."""
+        cache = MemoryUidCache()
+        cache.set(("https://test.dgtera.com", "test_db", "test_api_key"), 9)
+        client = DgtClient(url="https://test.dgtera.com", db="test_db", api_key="test_api_key",
+                           uid_cache=cache, max_retries=0)
+        common_mock = MagicMock()
+        common_mock.authenticate.return_value = 12
+        models_mock = MagicMock()
+        models_mock.execute_kw.side_effect = [xmlrpc.client.Fault(3, "Access Denied"), [1]]
+        with patch.object(client, '_get_common_connection', return_value=common_mock), \
+                patch.object(client, '_get_models_connection', return_value=models_mock):
+            with self.assertRaises(DgtException):
+                client.execute_kw("res.partner", "search", [[]])
+            self.assertIsNone(client.uid)
+            self.assertEqual(len(cache), 0)
+
+            self.assertEqual(client.execute_kw("res.partner", "search", [[]]), [1])
+        self.assertEqual(common_mock.authenticate.call_count, 1)
+        self.assertEqual(models_mock.execute_kw.call_args[0][1], 12)
+
+    def test_other_faults_keep_the_uid(self):
+        """Test that ordinary server errors do not evict the UID."""
+        client = DgtClient(url="https://test.dgtera.com", db="test_db", api_key="test_api_key")
+        common_mock = MagicMock()
+        common_mock.authenticate.return_value = 9
+        models_mock = MagicMock()
+        models_mock.execute_kw.side_effect = xmlrpc.client.Fault(1, "ValueError: Invalid field")
+        with patch.object(client, '_get_common_connection', return_value=common_mock), \
+                patch.object(client, '_get_models_connection', return_value=models_mock):
+            with self.assertRaises(DgtException):
+                client.execute_kw("res.partner", "search", [[]])
+        self.assertEqual(client.uid, 9)
+        self.assertEqual(len(client.uid_cache), 1)
+
+    def test_default_is_bounded(self):
+        """Test that clients get a bounded in-memory cache by default."""
+        client = DgtClient(url="https://test.dgtera.com", db="test_db", api_key="test_api_key")
+        self.assertIsInstance(client.uid_cache, MemoryUidCache)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,170 @@
+import unittest
+from unittest.mock import patch, MagicMock
+
+from dgt_rpc import DgtClient, DgtPOSClient, DgtException, ResultCache
+
+
+class TestResultCache(unittest.TestCase):
+    """Test cases for the ResultCache class."""
+
+    def test_lru_eviction(self):
+        """Test that the least recently used result is evicted first."""
+        cache = ResultCache(max_size=2)
+        keys = [cache.make_key("https://a", "db", 1, "res.partner", "read", [[i]], {}) for i in range(3)]
+        cache.put(keys[0], "a")
+        cache.put(keys[1], "b")
+        cache.get(keys[0])
+        cache.put(keys[2], "c")
+
+        self.assertEqual(cache.get(keys[0]), (True, "a"))
+        self.assertEqual(cache.get(keys[1]), (False, None))
+        self.assertEqual(cache.get(keys[2]), (True, "c"))
+        self.assertEqual(cache.evictions, 1)
+
+    def test_ttl(self):
+        """Test that results expire after the time-to-live."""
+        cache = ResultCache(ttl=10)
+        key = cache.make_key("https://a", "db", 1, "res.partner", "read", [[1]], {})
+        with patch("dgt_rpc.cache.time.monotonic", return_value=100):
+            cache.put(key, "a")
+        with patch("dgt_rpc.cache.time.monotonic", return_value=109):
+            self.assertEqual(cache.get(key), (True, "a"))
+        with patch("dgt_rpc.cache.time.monotonic", return_value=111):
+            self.assertEqual(cache.get(key), (False, None))
+        self.assertEqual(cache.expirations, 1)
+        self.assertEqual(len(cache), 0)
+
+    def test_canonical_key(self):
+        """Test that equivalent arguments share a key."""
+        cache = ResultCache()
+        self.assertEqual(
+            cache.make_key("https://a", "db", 1, "res.partner", "search_read", [[("id", ">", 0)]], {"fields": ["name"], "limit": 5}),
+            cache.make_key("https://a", "db", 1, "res.partner", "search_read", [[["id", ">", 0]]], {"limit": 5, "fields": ["name"]}),
+        )
+        self.assertNotEqual(
+            cache.make_key("https://a", "db", 1, "res.partner", "read", [[1]], {}),
+            cache.make_key("https://a", "db", 2, "res.partner", "read", [[1]], {}),
+        )
+        self.assertNotEqual(
+            cache.make_key("https://a", "db", 1, "res.partner", "read", [[1]], {}),
+            cache.make_key("https://b", "db", 1, "res.partner", "read", [[1]], {}),
+        )
+
+    def test_allow_lists(self):
+        """Test model and method allow-lists."""
+        cache = ResultCache(models=["product.product"], methods=["search_read"])
+        self.assertTrue(cache.is_cacheable("product.product", "search_read"))
+        self.assertFalse(cache.is_cacheable("product.product", "read"))
+        self.assertFalse(cache.is_cacheable("res.partner", "search_read"))
+        self.assertFalse(ResultCache().is_cacheable("res.partner", "write"))
+
+    def test_stale_results_are_not_stored(self):
+        """Test that a result fetched across an invalidation is dropped."""
+        cache = ResultCache()
+        key = cache.make_key("https://a", "db", 1, "res.partner", "read", [[1]], {})
+        generation = cache.generation("res.partner")
+        cache.invalidate("db", "res.partner")
+        cache.put(key, "old", generation)
+        self.assertEqual(cache.get(key), (False, None))
+
+    def test_copies(self):
+        """Test that callers cannot modify cached results."""
+        cache = ResultCache()
+        key = cache.make_key("https://a", "db", 1, "res.partner", "read", [[1]], {})
+        result = [{"id": 1}]
+        cache.put(key, result)
+        result[0]["id"] = 2
+        cache.get(key)[1][0]["id"] = 3
+        self.assertEqual(cache.get(key), (True, [{"id": 1}]))
+
+
+class TestClientCache(unittest.TestCase):
+    """Test cases for the result cache on DgtClient."""
+
+    def setUp(self):
+        """Set up a client with a cache and mocked connections."""
+        self.cache = ResultCache(ttl=None)
+        self.client = DgtPOSClient(
+            url="https://test.dgtera.com",
+            db="test_db",
+            api_key="test_api_key",
+            cache=self.cache,
+        )
+        self.common_mock = MagicMock()
+        self.models_mock = MagicMock()
+        self.common_mock.authenticate.return_value = 1
+
+        patcher1 = patch.object(self.client, '_get_common_connection', return_value=self.common_mock)
+        patcher2 = patch.object(self.client, '_get_models_connection', return_value=self.models_mock)
+        self.addCleanup(patcher1.stop)
+        self.addCleanup(patcher2.stop)
+        patcher1.start()
+        patcher2.start()
+
+    def test_repeated_reads_hit_the_cache(self):
+        """Test that identical read calls reach the server once."""
+        self.models_mock.execute_kw.return_value = [{"id": 1, "name": "Main"}]
+
+        for _ in range(3):
+            result = self.client.get_pos_data("test_db")
+            self.client.execute_kw("pos.config", "search_read", [[]], {"fields": ["name"]})
+
+        self.assertEqual(result, [{"id": 1, "name": "Main"}])
+        self.assertEqual(self.models_mock.execute_kw.call_count, 2)
+        self.assertEqual(self.cache.stats()["hits"], 4)
+        self.assertEqual(self.cache.stats()["misses"], 2)
+
+    def test_writes_invalidate_the_model(self):
+        """Test that create, write and unlink drop cached results of their model only."""
+        self.models_mock.execute_kw.return_value = [1]
+        self.client.execute_kw("res.partner", "search", [[]])
+        self.client.execute_kw("product.product", "search", [[]])
+
+        for method, args in (("write", [[1], {"name": "B"}]), ("create", [{}]), ("unlink", [[1]])):
+            self.client.execute_kw("res.partner", method, args)
+            self.client.execute_kw("res.partner", "search", [[]])
+            self.client.execute_kw("product.product", "search", [[]])
+
+        methods = [call.args[3:5] for call in self.models_mock.execute_kw.call_args_list]
+        self.assertEqual(methods.count(("res.partner", "search")), 4)
+        self.assertEqual(methods.count(("product.product", "search")), 1)
+        self.assertEqual(self.cache.invalidations, 3)
+
+    def test_failed_write_invalidates(self):
+        """Test that a failing write still drops cached results."""
+        self.models_mock.execute_kw.return_value = [1]
+        self.client.execute_kw("res.partner", "search", [[]])
+
+        self.models_mock.execute_kw.side_effect = Exception("timed out")
+        with self.assertRaises(DgtException):
+            self.client.execute_kw("res.partner", "write", [[1], {"name": "B"}])
+        self.assertEqual(len(self.cache), 0)
+
+    def test_servers_do_not_share_results(self):
+        """Test that clients of two servers with the same database and UID keep separate results."""
+        other = DgtClient(url="https://other.dgtera.com", db="test_db", api_key="test_api_key", cache=self.cache)
+        other_models = MagicMock()
+        other_models.execute_kw.return_value = [2]
+        for name, value in (("_get_common_connection", self.common_mock), ("_get_models_connection", other_models)):
+            patcher = patch.object(other, name, return_value=value)
+            patcher.start()
+            self.addCleanup(patcher.stop)
+        self.models_mock.execute_kw.return_value = [1]
+
+        self.assertEqual(self.client.execute_kw("res.partner", "search", [[]]), [1])
+        self.assertEqual(other.execute_kw("res.partner", "search", [[]]), [2])
+        self.assertEqual(len(self.cache), 2)
+
+        other.execute_kw("res.partner", "write", [[2], {"name": "B"}])
+        self.assertEqual(len(self.cache), 1)
+        self.assertEqual(self.client.execute_kw("res.partner", "search", [[]]), [1])
+        self.assertEqual(self.models_mock.execute_kw.call_count, 1)
+
+    def test_no_cache_by_default(self):
+        """Test that clients do not cache unless given a cache."""
+        client = DgtClient(url="https://test.dgtera.com", db="test_db", api_key="test_api_key")
+        self.assertIsNone(client.cache)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -4,7 +4,7 @@ import xmlrpc.client
 import os
 import tempfile
 
-from dgt_rpc import DgtClient, DgtException
+from dgt_rpc import DgtClient, DgtException, BatchError
 
 class TestDgtClient(unittest.TestCase):
     """Test cases for the DgtClient class."""
@@ -153,6 +153,44 @@ class TestDgtClient(unittest.TestCase):
         # Check that the result is correct
         self.assertEqual(result, mock_data)
 
+    def test_iter_search_read(self):
+        """Test keyset pagination of search_read."""
+        rows = [{"id": i, "name": f"Partner {i}"} for i in range(1, 6)]
+        
+        def execute_kw(db, uid, key, model, method, args, kwargs):
+            domain = args[0]
+            last_id = domain[-1][2] if domain and domain[-1][0] == "id" else 0
+            return [r for r in rows if r["id"] > last_id][:kwargs["limit"]]
+        self.models_mock.execute_kw.side_effect = execute_kw
+        
+        result = list(self.client.iter_search_read("res.partner", [("active", "=", True)],
+                                                   fields=["name"], page_size=2))
+        
+        self.assertEqual(result, rows)
+        # Pages of 2, 2 and a final short page of 1
+        self.assertEqual(self.models_mock.execute_kw.call_count, 3)
+        last_call = self.models_mock.execute_kw.call_args[0]
+        self.assertEqual(last_call[5], [[("active", "=", True), ("id", ">", 4)]])
+        self.assertEqual(last_call[6], {"offset": 0, "limit": 2, "order": "id asc",
+                                        "fields": ["name", "id"]})
+
+    def test_iter_search_read_pages_by_other_key(self):
+        """Test paging by a non-unique key with id as tie-breaker."""
+        self.models_mock.execute_kw.side_effect = [
+            [{"id": 3, "write_date": "2024-01-01"}, {"id": 1, "write_date": "2024-01-02"}],
+            [],
+        ]
+        
+        pages = list(self.client.iter_search_read("pos.order", [], page_size=2,
+                                                  key="write_date", pages=True))
+        
+        self.assertEqual(len(pages), 1)
+        second_domain = self.models_mock.execute_kw.call_args[0][5][0]
+        self.assertEqual(second_domain, [
+            "|", ("write_date", ">", "2024-01-02"),
+            "&", ("write_date", "=", "2024-01-02"), ("id", ">", 1),
+        ])
+
     def test_create(self):
         """Test the create method."""
         # Setup mock response
@@ -311,6 +349,62 @@ class TestDgtClient(unittest.TestCase):
         # Check that the result combines both batches
         self.assertEqual(result, [101, 102, 103])
 
+    def test_create_batch_splits_by_payload_size(self):
+        """Test that create_batch also chunks by payload size and keeps input order."""
+        self.models_mock.execute_kw.side_effect = lambda *call: list(range(len(call[5][0])))
+        
+        values_list = [{"name": "x" * 50} for _ in range(6)]
+        result = self.client.create_batch("res.partner", values_list, batch_size=100, max_payload=150)
+        
+        # Each record is ~64 bytes, so only two fit in 150 bytes
+        chunk_sizes = [len(c[0][5][0]) for c in self.models_mock.execute_kw.call_args_list]
+        self.assertEqual(chunk_sizes, [2, 2, 2])
+        self.assertEqual(result, [0, 1, 0, 1, 0, 1])
+
+    def test_create_batch_parallel_with_chunk_error(self):
+        """Test that a failing chunk is reported without losing the other IDs."""
+        def execute_kw(db, uid, key, model, method, args, kwargs):
+            if args[0][0]["name"] == "bad":
+                raise xmlrpc.client.Fault(1, "constraint violated")
+            return [v["id"] for v in args[0]]
+        self.models_mock.execute_kw.side_effect = execute_kw
+        
+        values_list = [{"name": "ok", "id": 1}, {"name": "ok", "id": 2},
+                       {"name": "bad", "id": 3}, {"name": "ok", "id": 4}]
+        with self.assertRaises(BatchError) as context:
+            self.client.create_batch("res.partner", values_list, batch_size=1, max_workers=3)
+        
+        self.assertEqual(list(context.exception.errors), [2])
+        self.assertEqual(context.exception.results, [1, 2, None, 4])
+
+    def test_write_batch_groups_identical_values(self):
+        """Test that write_batch sends one write per distinct set of values."""
+        self.models_mock.execute_kw.return_value = True
+        
+        result = self.client.write_batch("res.partner", {
+            1: {"active": False},
+            2: {"name": "B"},
+            3: {"active": False},
+            4: {"active": False},
+        }, batch_size=2)
+        
+        self.assertTrue(result)
+        calls = [c[0][5] for c in self.models_mock.execute_kw.call_args_list]
+        self.assertEqual(calls, [
+            [[1, 3], {"active": False}],
+            [[4], {"active": False}],
+            [[2], {"name": "B"}],
+        ])
+
+    def test_unlink_batch(self):
+        """Test that unlink_batch chunks record IDs."""
+        self.models_mock.execute_kw.return_value = True
+        
+        self.assertTrue(self.client.unlink_batch("res.partner", [1, 2, 3], batch_size=2))
+        
+        calls = [c[0][5] for c in self.models_mock.execute_kw.call_args_list]
+        self.assertEqual(calls, [[[1, 2]], [[3]]])
+
     def test_from_environment(self):
         """Test creating a client from environment variables."""
         # Set environment variables
@@ -0,0 +1,132 @@
+import math
+import unittest
+from array import array
+
+from dgt_rpc import DgtClient, DgtException, Columns
+from dgt_rpc.columns import NAT
+from dgt_rpc.tests.server import LocalServer
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+try:
+    import pyarrow
+except ImportError:
+    pyarrow = None
+
+FIELDS = {
+    "id": {"type": "integer"},
+    "name": {"type": "char"},
+    "qty": {"type": "integer"},
+    "amount_total": {"type": "monetary"},
+    "paid": {"type": "boolean"},
+    "date_order": {"type": "datetime"},
+    "day": {"type": "date"},
+    "config_id": {"type": "many2one"},
+    "lines": {"type": "one2many"},
+    "note": {"type": "text"},
+}
+
+RECORDS = [
+    {"id": 1, "name": "A", "qty": 2, "amount_total": 10.5, "paid": True,
+     "date_order": "1970-01-02 00:00:10", "day": "1970-01-03", "config_id": [4, "POS 4"]},
+    {"id": 2, "name": False, "qty": 0, "amount_total": False, "paid": False,
+     "date_order": False, "day": False, "config_id": False},
+]
+
+
+class TestColumns(unittest.TestCase):
+    """Test cases for the Columns container."""
+
+    def make_columns(self):
+        types = {name: FIELDS[name]["type"] for name in
+                 ("name", "qty", "amount_total", "paid", "date_order", "day", "config_id")}
+        columns = Columns("pos.order", types)
+        columns.extend(RECORDS)
+        return columns
+
+    def test_conversion(self):
+        """Test that values are stored in typed columns."""
+        columns = self.make_columns()
+        self.assertEqual(len(columns), 2)
+        self.assertEqual(list(columns), ["name", "qty", "amount_total", "paid", "date_order", "day",
+                                         "config_id", "id"])
+        self.assertEqual(columns["id"], array("q", [1, 2]))
+        self.assertEqual(columns["name"], ["A", None])
+        self.assertEqual(columns["config_id"], array("q", [4, 0]))
+        self.assertEqual(columns["paid"], array("b", [1, 0]))
+        self.assertEqual(columns["date_order"], array("q", [86410, NAT]))
+        self.assertEqual(columns["day"], array("q", [2, NAT]))
+        self.assertEqual(columns["amount_total"][0], 10.5)
+        self.assertTrue(math.isnan(columns["amount_total"][1]))
+        self.assertEqual(next(columns.rows())["config_id"], 4)
+
+    @unittest.skipIf(numpy is None, "NumPy is not installed")
+    def test_numpy(self):
+        """Test that numeric columns are exported without copying."""
+        columns = self.make_columns()
+        arrays = columns.to_numpy()
+        self.assertEqual(arrays["qty"].dtype, numpy.int64)
+        self.assertEqual(arrays["paid"].tolist(), [True, False])
+        self.assertEqual(str(arrays["date_order"][0]), "1970-01-02T00:00:10")
+        self.assertTrue(numpy.isnat(arrays["day"][1]))
+        self.assertEqual(arrays["name"].tolist(), ["A", None])
+        arrays["qty"][0] = 7
+        self.assertEqual(columns["qty"][0], 7)
+
+    @unittest.skipIf(numpy is None or pyarrow is None, "pyarrow is not installed")
+    def test_arrow(self):
+        """Test that empty values become nulls in Arrow."""
+        table = self.make_columns().to_arrow()
+        self.assertEqual(table.num_rows, 2)
+        self.assertEqual(table.column("config_id").to_pylist(), [4, None])
+        self.assertEqual(table.column("amount_total").to_pylist(), [10.5, None])
+
+
+class TestSearchReadColumns(unittest.TestCase):
+    """Test cases for DgteraClient.search_read_columns."""
+
+    def setUp(self):
+        """Start a local server returning pages of records."""
+        def handler(model, method, args, kwargs):
+            if method == "fields_get":
+                return FIELDS
+            domain = args[0]
+            start = domain[-1][2] if domain else 0
+            return [
+                {"id": i, "qty": i, "amount_total": i * 1.5, "config_id": [i % 3 + 1, "POS"],
+                 "name": f"Order {i}", "paid": True, "date_order": False, "day": False}
+                for i in range(start + 1, min(start + kwargs["limit"], 25) + 1)
+            ]
+        self.server = LocalServer(handler).start(self)
+        self.client = DgtClient(self.server.url, "test_db", api_key="key")
+        self.addCleanup(self.client.close)
+
+    def test_pages(self):
+        """Test that all pages are transposed into the columns."""
+        columns = self.client.search_read_columns("pos.order", [], fields=["qty", "config_id"], page_size=10)
+        self.assertEqual(list(columns), ["qty", "config_id", "id"])
+        self.assertEqual(columns["id"], array("q", range(1, 26)))
+        self.assertEqual(sum(columns["qty"]), sum(range(1, 26)))
+        self.assertEqual(columns["config_id"][:3], array("q", [2, 3, 1]))
+        read = [call for call in self.server.calls if call[2] == "search_read"]
+        self.assertEqual(len(read), 3)
+        self.assertEqual(read[0][4]["fields"], ["qty", "config_id", "id"])
+
+    def test_default_fields(self):
+        """Test that heavy and x2many fields are skipped without a field list."""
+        columns = self.client.search_read_columns("pos.order", [], page_size=100)
+        self.assertNotIn("lines", columns)
+        self.assertNotIn("note", columns)
+        self.assertIn("amount_total", columns)
+
+    def test_unknown_field(self):
+        """Test that unknown fields are rejected before reading."""
+        with self.assertRaises(DgtException):
+            self.client.search_read_columns("pos.order", [], fields=["missing"])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,115 @@
+import gzip
+import io
+import unittest
+
+from dgt_rpc import DgtClient
+from dgt_rpc.compression import CallStats, CompressionStats, compress_body, iter_body
+from dgt_rpc.tests.server import LocalServer
+
+
+class FakeResponse(io.BytesIO):
+    """A response body with HTTP headers."""
+
+    def __init__(self, body, encoding=None):
+        super().__init__(body)
+        self.headers = {'Content-Encoding': encoding} if encoding else {}
+
+    def getheader(self, name, default=None):
+        return self.headers.get(name, default)
+
+
+class TestCompression(unittest.TestCase):
+    """Test cases for gzip compression of requests and responses."""
+
+    def setUp(self):
+        """Start a local server returning large, repetitive results."""
+        records = [{"id": i, "name": f"Order {i}", "state": "paid"} for i in range(500)]
+        self.server = LocalServer(handler=lambda model, method, args, kwargs: records).start(self)
+        self.records = records
+
+    def test_gzip_responses(self):
+        """Test that large responses are gzipped and the savings recorded on both protocols."""
+        for protocol in ("xmlrpc", "jsonrpc"):
+            with self.subTest(protocol=protocol):
+                client = DgtClient(self.server.url, db="test_db", api_key="key", protocol=protocol)
+                self.assertEqual(client.search_read("pos.order", []), self.records)
+
+                call = client.compression_stats.last
+                self.assertLess(call.response_wire_size * 5, call.response_size)
+                self.assertEqual(call.request_size, call.request_wire_size)
+                self.assertGreater(call.ratio, 1)
+                self.assertEqual(call.bytes_saved, call.response_size - call.response_wire_size)
+
+    def test_gzip_requests_above_threshold(self):
+        """Test that only request bodies above the threshold are compressed."""
+        values = [{"name": "Product", "description": "x" * 100} for _ in range(50)]
+        for protocol in ("xmlrpc", "jsonrpc"):
+            with self.subTest(protocol=protocol):
+                client = DgtClient(self.server.url, db="test_db", api_key="key",
+                                   protocol=protocol, compress_threshold=1024)
+                client.authenticate()
+
+                client.execute_kw("product.product", "create", [values])
+                call = client.compression_stats.last
+                self.assertLess(call.request_wire_size * 5, call.request_size)
+                self.assertEqual(self.server.calls[-1][3], [values])
+
+                client.execute_kw("product.product", "create", [values[:1]])
+                call = client.compression_stats.last
+                self.assertEqual(call.request_wire_size, call.request_size)
+                self.assertEqual(self.server.calls[-1][3], [values[:1]])
+
+    def test_totals(self):
+        """Test that statistics add up over calls."""
+        client = DgtClient(self.server.url, db="test_db", api_key="key")
+        client.authenticate()
+        stats = client.compression_stats
+        self.assertEqual(stats.calls, 1)
+
+        stats.reset()
+        calls = []
+        for _ in range(2):
+            client.search_read("pos.order", [])
+            calls.append(stats.last)
+
+        self.assertEqual(stats.calls, 2)
+        self.assertIsNot(calls[0], calls[1])
+        self.assertEqual(stats.totals.response_size, sum(c.response_size for c in calls))
+        self.assertEqual(stats.totals.response_wire_size, sum(c.response_wire_size for c in calls))
+        self.assertGreater(stats.bytes_saved, 0)
+
+        stats.reset()
+        self.assertEqual(stats.calls, 0)
+        self.assertEqual(stats.ratio, 1.0)
+
+    def test_compress_body(self):
+        """Test the request body threshold."""
+        self.assertEqual(compress_body(b"abc", None), (b"abc", False))
+        self.assertEqual(compress_body(b"abc", 4), (b"abc", False))
+        body, compressed = compress_body(b"abcd", 4)
+        self.assertTrue(compressed)
+        self.assertEqual(gzip.decompress(body), b"abcd")
+
+    def test_iter_body(self):
+        """Test incremental decompression and its error handling."""
+        data = b"<value>1</value>" * 1000
+        encoded = gzip.compress(data)
+        call = CallStats()
+        chunks = list(iter_body(FakeResponse(encoded, "gzip"), 64, call))
+        self.assertEqual(b"".join(chunks), data)
+        self.assertGreater(len(chunks), 1)
+        self.assertEqual((call.response_size, call.response_wire_size), (len(data), len(encoded)))
+
+        with self.assertRaises(ValueError):
+            list(iter_body(FakeResponse(encoded[:-20], "gzip"), 64, CallStats()))
+        with self.assertRaises(ValueError):
+            list(iter_body(FakeResponse(b"not gzip", "gzip"), 64, CallStats()))
+
+        call = CallStats()
+        self.assertEqual(b"".join(iter_body(FakeResponse(data), 64, call)), data)
+        self.assertEqual(call.ratio, 1.0)
+        self.assertEqual(CompressionStats().last, None)
+
+
+if __name__ == '__main__':
+    unittest.main()
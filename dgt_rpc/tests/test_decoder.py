@@ -0,0 +1,102 @@
+import datetime
+import unittest
+import xmlrpc.client
+from decimal import Decimal
+
+from dgt_rpc import DgtClient, decoder
+from dgt_rpc.tests.server import LocalServer
+
+
+def response(*params):
+    return xmlrpc.client.dumps(params, methodresponse=True, allow_none=True).encode('utf-8')
+
+
+def _types(value):
+    """Return the nested type structure of a decoded value."""
+    if isinstance(value, (list, tuple)):
+        return type(value), [_types(item) for item in value]
+    if isinstance(value, dict):
+        return dict, {key: _types(item) for key, item in value.items()}
+    return type(value)
+
+
+class TestFastDecoder(unittest.TestCase):
+    """Test that dgt_rpc.decoder matches xmlrpc.client exactly."""
+
+    def assertSameAsStock(self, data, **options):
+        expected = xmlrpc.client.loads(data, **options)
+        result = decoder.loads(data, **options)
+        self.assertEqual(result, expected)
+        self.assertEqual(_types(result), _types(expected))
+        return result
+
+    def test_search_read_result(self):
+        """Test a typical list of records with every XML-RPC type."""
+        records = [{
+            "id": i,
+            "name": f"Order <{i}> & co",
+            "paid": i % 2 == 0,
+            "amount": i * 1.5,
+            "partner_id": [i, "Partner"],
+            "note": None,
+            "empty": "",
+            "unicode": "Überweisung",
+            "image": xmlrpc.client.Binary(b"\x00\x01binary"),
+            "date": xmlrpc.client.DateTime(datetime.datetime(2024, 1, 2, 3, 4, 5)),
+            "lines": [],
+            "extra": {},
+        } for i in range(3)]
+        data = response(records)
+
+        for options in ({}, {"use_datetime": True}, {"use_builtin_types": True}):
+            self.assertSameAsStock(data, **options)
+
+    def test_field_names_are_shared(self):
+        """Test that struct keys repeated across records are one object."""
+        (records,), _ = decoder.loads(response([{"name": "a"}, {"name": "b"}]))
+        key1, = records[0]
+        key2, = records[1]
+        self.assertIs(key1, key2)
+
+    def test_untyped_and_extension_values(self):
+        """Test values without a type element and the ex: namespace."""
+        data = (b"<?xml version='1.0'?><methodResponse><params>"
+                b"<param><value>plain</value></param>"
+                b"<param><value/></param>"
+                b"<param><value><ex:nil/></value></param>"
+                b"<param><value><ex:i8>9007199254740993</ex:i8></value></param>"
+                b"<param><value><bigdecimal>1.10</bigdecimal></value></param>"
+                b"</params></methodResponse>")
+        result = self.assertSameAsStock(data)
+        self.assertEqual(result[0], ("plain", "", None, 9007199254740993, Decimal("1.10")))
+
+    def test_fault(self):
+        """Test that faults are raised like the stock decoder does."""
+        data = xmlrpc.client.dumps(xmlrpc.client.Fault(2, "Access Denied"), methodresponse=True).encode()
+        with self.assertRaises(xmlrpc.client.Fault) as context:
+            decoder.loads(data)
+        self.assertEqual(context.exception.faultCode, 2)
+        self.assertEqual(context.exception.faultString, "Access Denied")
+
+    def test_errors(self):
+        """Test malformed responses."""
+        with self.assertRaises(xmlrpc.client.ResponseError):
+            decoder.loads(b"<methodResponse></methodResponse>")
+        with self.assertRaises(xmlrpc.client.ResponseError):
+            decoder.loads(b"<methodResponse><params><param><value><bogus/></value>"
+                          b"</param></params></methodResponse>")
+        with self.assertRaises(TypeError):
+            decoder.loads(response(True).replace(b"<boolean>1</boolean>", b"<boolean>2</boolean>"))
+
+    def test_client_uses_fast_decoder(self):
+        """Test that the client decodes through dgt_rpc.decoder when asked to."""
+        server = LocalServer(handler=lambda model, method, args, kwargs: [{"id": 1, "name": "A"}]).start(self)
+        client = DgtClient(server.url, db="test_db", api_key="key", fast_decoder=True)
+
+        self.assertTrue(client.transport.http.fast_decoder)
+        self.assertIsInstance(client.transport.http.getparser()[1], decoder.FastUnmarshaller)
+        self.assertEqual(client.search_read("res.partner", []), [{"id": 1, "name": "A"}])
+
+
+if __name__ == '__main__':
+    unittest.main()
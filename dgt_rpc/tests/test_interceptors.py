@@ -0,0 +1,140 @@
+import unittest
+from unittest.mock import patch, MagicMock
+
+from dgt_rpc import DgtClient, DgtException, Interceptor, RateLimiter
+
+
+class Recorder(Interceptor):
+    """Interceptor logging its hooks in a shared list."""
+
+    def __init__(self, name, log):
+        self.name = name
+        self.log = log
+
+    def before(self, call):
+        self.log.append((self.name, "before", call.method))
+
+    def after(self, call, result):
+        self.log.append((self.name, "after", call.method))
+        return result
+
+    def on_error(self, call, error):
+        self.log.append((self.name, "error", call.method))
+
+
+class TestInterceptors(unittest.TestCase):
+    """Test cases for the interceptor chain."""
+
+    def setUp(self):
+        """Set up a client with mocked connections."""
+        self.client = DgtClient("https://example.com", "test_db", api_key="key", max_retries=0)
+        self.common_mock = MagicMock()
+        self.common_mock.authenticate.return_value = 7
+        self.models_mock = MagicMock()
+        self.models_mock.execute_kw.return_value = [1, 2]
+        patcher1 = patch.object(self.client, "_get_common_connection", return_value=self.common_mock)
+        patcher2 = patch.object(self.client, "_get_models_connection", return_value=self.models_mock)
+        patcher1.start()
+        patcher2.start()
+        self.addCleanup(patcher1.stop)
+        self.addCleanup(patcher2.stop)
+        self.log = []
+
+    def test_order(self):
+        """Test that hooks nest like middleware and authenticate goes through the chain."""
+        self.client.interceptors = [Recorder("outer", self.log), Recorder("inner", self.log)]
+        self.assertEqual(self.client.execute_kw("res.partner", "search", [[]]), [1, 2])
+        self.assertEqual(self.log, [
+            ("outer", "before", "search"), ("inner", "before", "search"),
+            ("outer", "before", "authenticate"), ("inner", "before", "authenticate"),
+            ("inner", "after", "authenticate"), ("outer", "after", "authenticate"),
+            ("inner", "after", "search"), ("outer", "after", "search"),
+        ])
+        self.assertEqual(self.client.uid, 7)
+
+    def test_short_circuit(self):
+        """Test that an interceptor can answer a call without the server."""
+        class Stub(Interceptor):
+            def before(self, call):
+                if call.method == "search_count":
+                    call.respond(42)
+
+        self.client.uid = 7
+        self.client.interceptors = [Recorder("outer", self.log), Stub(), Recorder("inner", self.log)]
+        self.assertEqual(self.client.execute_kw("res.partner", "search_count", [[]]), 42)
+        self.models_mock.execute_kw.assert_not_called()
+        self.assertEqual(self.log, [("outer", "before", "search_count"), ("outer", "after", "search_count")])
+
+    def test_change_arguments_and_result(self):
+        """Test that interceptors can rewrite the arguments and the result of execute."""
+        class Context(Interceptor):
+            def before(self, call):
+                call.kwargs = dict(call.kwargs, context={"lang": "fr_FR"})
+
+            def after(self, call, result):
+                return len(result)
+
+        self.client.uid = 7
+        self.client.interceptors = [Context()]
+        self.assertEqual(self.client.execute("res.partner", "search", [["id", ">", 0]]), 2)
+        args = self.models_mock.execute_kw.call_args.args
+        self.assertEqual(args[5:], ([[["id", ">", 0]]], {"context": {"lang": "fr_FR"}}))
+
+    def test_error(self):
+        """Test that errors reach on_error hooks and can be recovered from."""
+        class Fallback(Interceptor):
+            def on_error(self, call, error):
+                if call.method == "read":
+                    call.respond([])
+
+        self.client.uid = 7
+        self.models_mock.execute_kw.side_effect = ConnectionRefusedError()
+        self.client.interceptors = [Recorder("outer", self.log), Fallback(), Recorder("inner", self.log)]
+
+        self.assertEqual(self.client.execute_kw("res.partner", "read", [[1]]), [])
+        with self.assertRaises(DgtException):
+            self.client.execute_kw("res.partner", "write", [[1], {}])
+        self.assertEqual(self.log, [
+            ("outer", "before", "read"), ("inner", "before", "read"),
+            ("inner", "error", "read"), ("outer", "after", "read"),
+            ("outer", "before", "write"), ("inner", "before", "write"),
+            ("inner", "error", "write"), ("outer", "error", "write"),
+        ])
+
+    def test_intercept_override(self):
+        """Test that an interceptor can call the rest of the chain several times."""
+        class Repeat(Interceptor):
+            def intercept(self, call, proceed):
+                try:
+                    return proceed()
+                except DgtException:
+                    return proceed()
+
+        self.client.uid = 7
+        self.models_mock.execute_kw.side_effect = [ConnectionRefusedError(), [3]]
+        self.client.interceptors = [Repeat()]
+        self.assertEqual(self.client.execute_kw("res.partner", "search", [[]]), [3])
+
+    @patch("dgt_rpc.client.run_chain")
+    def test_empty_chain(self, mock_run_chain):
+        """Test that calls skip the chain machinery when there are no interceptors."""
+        self.assertEqual(self.client.execute_kw("res.partner", "search", [[]]), [1, 2])
+        mock_run_chain.assert_not_called()
+
+
+class TestRateLimiter(unittest.TestCase):
+    """Test cases for the RateLimiter interceptor."""
+
+    @patch("dgt_rpc.interceptors.time.sleep")
+    def test_token_bucket(self, mock_sleep):
+        """Test that calls beyond the burst wait for tokens."""
+        with patch("dgt_rpc.interceptors.time.monotonic", return_value=100.0):
+            limiter = RateLimiter(rate=2, burst=2)
+            self.assertEqual([limiter.acquire() for _ in range(4)], [0.0, 0.0, 0.5, 1.0])
+        with patch("dgt_rpc.interceptors.time.monotonic", return_value=102.0):
+            self.assertEqual(limiter.acquire(), 0.0)
+        self.assertEqual([call.args[0] for call in mock_sleep.call_args_list], [0.5, 1.0])
+
+
+if __name__ == "__main__":
+    unittest.main()
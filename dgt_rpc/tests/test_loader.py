@@ -0,0 +1,100 @@
+import asyncio
+import unittest
+from concurrent.futures import ThreadPoolExecutor
+from unittest.mock import MagicMock
+
+from dgt_rpc import ReadLoader, AsyncReadLoader, DgtException
+
+
+def fake_read(model, ids, fields=None):
+    """Read existing records, the ones with an ID above 100 do not exist."""
+    return [{"id": i, "name": f"{model} {i}"} for i in ids if i <= 100]
+
+
+class TestReadLoader(unittest.TestCase):
+    """Test cases for the ReadLoader class."""
+
+    def setUp(self):
+        """Set up a loader over a mocked client."""
+        self.client = MagicMock()
+        self.client.read.side_effect = fake_read
+        self.loader = ReadLoader(self.client, window=0.2)
+
+    def test_concurrent_reads_batched(self):
+        """Test that concurrent reads of one model send a single read."""
+        with ThreadPoolExecutor(10) as executor:
+            futures = [executor.submit(self.loader.read, "res.partner", [i, 101]) for i in range(10)]
+            results = [future.result() for future in futures]
+
+        self.assertEqual(results, [[{"id": i, "name": f"res.partner {i}"}] for i in range(10)])
+        self.client.read.assert_called_once()
+        model, ids, fields = self.client.read.call_args.args
+        self.assertEqual((model, sorted(ids), fields), ("res.partner", list(range(10)) + [101], None))
+        self.assertEqual(self.loader.stats(), {"requests": 10, "batches": 1})
+
+    def test_batches_per_model_and_fields(self):
+        """Test that reads of different models or fields are not mixed."""
+        with ThreadPoolExecutor(4) as executor:
+            futures = [
+                executor.submit(self.loader.read, "res.partner", [1], ["name"]),
+                executor.submit(self.loader.read, "res.partner", [2], ["name"]),
+                executor.submit(self.loader.read, "res.partner", [3], ["email"]),
+                executor.submit(self.loader.load, "pos.order", 4),
+            ]
+            results = [future.result() for future in futures]
+
+        self.assertEqual(results[3], {"id": 4, "name": "pos.order 4"})
+        self.assertEqual(self.client.read.call_count, 3)
+
+    def test_max_batch(self):
+        """Test that a full batch is sent without waiting for the window."""
+        loader = ReadLoader(self.client, window=10, max_batch=3)
+        with ThreadPoolExecutor(3) as executor:
+            futures = [executor.submit(loader.load, "res.partner", i) for i in range(3)]
+            self.assertEqual([future.result(timeout=5)["id"] for future in futures], [0, 1, 2])
+        self.client.read.assert_called_once()
+
+    def test_error(self):
+        """Test that every caller of a failed batch receives the error."""
+        self.client.read.side_effect = DgtException("Access denied")
+        with ThreadPoolExecutor(3) as executor:
+            futures = [executor.submit(self.loader.load, "res.partner", i) for i in range(3)]
+            for future in futures:
+                self.assertIsInstance(future.exception(), DgtException)
+        self.client.read.assert_called_once()
+
+
+class TestAsyncReadLoader(unittest.IsolatedAsyncioTestCase):
+    """Test cases for the AsyncReadLoader class."""
+
+    async def test_concurrent_reads_batched(self):
+        """Test that reads of concurrent tasks send a single read."""
+        calls = []
+
+        class Client:
+            async def read(self, model, ids, fields=None):
+                calls.append(list(ids))
+                return fake_read(model, ids, fields)
+
+        loader = AsyncReadLoader(Client())
+        results = await asyncio.gather(*[loader.load("res.partner", i) for i in (1, 2, 101, 2)])
+
+        self.assertEqual([r and r["id"] for r in results], [1, 2, None, 2])
+        self.assertEqual(calls, [[1, 2, 101]])
+
+    async def test_cancelled_caller(self):
+        """Test that cancelling the first caller does not strand the others."""
+        class Client:
+            async def read(self, model, ids, fields=None):
+                return fake_read(model, ids, fields)
+
+        loader = AsyncReadLoader(Client(), window=0.05)
+        first = asyncio.ensure_future(loader.load("res.partner", 1))
+        second = asyncio.ensure_future(loader.load("res.partner", 2))
+        await asyncio.sleep(0)
+        first.cancel()
+        self.assertEqual(await second, {"id": 2, "name": "res.partner 2"})
+
+
+if __name__ == "__main__":
+    unittest.main()
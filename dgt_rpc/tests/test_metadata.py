@@ -0,0 +1,139 @@
+import os
+import tempfile
+import unittest
+from unittest.mock import patch, MagicMock
+
+from dgt_rpc import DgtClient, DgtException, FieldsCache
+
+URL = "https://a.example.com"
+
+FIELDS = {
+    "id": {"type": "integer", "string": "ID"},
+    "name": {"type": "char", "string": "Name"},
+    "image_1920": {"type": "binary", "string": "Image"},
+    "description": {"type": "html", "string": "Description"},
+    "partner_id": {"type": "many2one", "string": "Partner", "relation": "res.partner"},
+}
+
+
+class TestFieldsCache(unittest.TestCase):
+    """Test cases for the FieldsCache class."""
+
+    def test_ttl(self):
+        """Test that fields expire after the time-to-live."""
+        cache = FieldsCache(ttl=10)
+        with patch("dgt_rpc.metadata.time.time", return_value=100):
+            cache.put(URL, "db", "res.partner", FIELDS)
+        with patch("dgt_rpc.metadata.time.time", return_value=109):
+            self.assertEqual(cache.get(URL, "db", "res.partner"), FIELDS)
+        with patch("dgt_rpc.metadata.time.time", return_value=110):
+            self.assertIsNone(cache.get(URL, "db", "res.partner"))
+
+    def test_disk(self):
+        """Test that fields survive in the cache directory and can be invalidated there."""
+        with tempfile.TemporaryDirectory() as path:
+            FieldsCache(path=path).put(URL, "my@db", "res.partner", FIELDS)
+            FieldsCache(path=path).put(URL, "my@db", "product.product", FIELDS)
+
+            cache = FieldsCache(path=path)
+            self.assertEqual(cache.get(URL, "my@db", "res.partner"), FIELDS)
+            self.assertIsNone(cache.get(URL, "other", "res.partner"))
+
+            cache.invalidate("my@db", "res.partner")
+            self.assertIsNone(FieldsCache(path=path).get(URL, "my@db", "res.partner"))
+            self.assertEqual(FieldsCache(path=path).get(URL, "my@db", "product.product"), FIELDS)
+
+            with open(os.path.join(path, os.listdir(path)[0]), "w") as f:
+                f.write("{not json")
+            with self.assertLogs("dgt_rpc.metadata", "WARNING"):
+                self.assertIsNone(FieldsCache(path=path).get(URL, "my@db", "product.product"))
+
+    def test_servers_do_not_share_fields(self):
+        """Test that servers with the same database name keep their own fields."""
+        other = {"id": {"type": "integer"}}
+        with tempfile.TemporaryDirectory() as path:
+            cache = FieldsCache(path=path)
+            cache.put(URL, "db", "res.partner", FIELDS)
+            cache.put("https://b.example.com", "db", "res.partner", other)
+            for cache in (cache, FieldsCache(path=path)):
+                self.assertEqual(cache.get(URL, "db", "res.partner"), FIELDS)
+                self.assertEqual(cache.get("https://b.example.com", "db", "res.partner"), other)
+
+            cache.invalidate("db", url="https://b.example.com")
+            self.assertEqual(FieldsCache(path=path).get(URL, "db", "res.partner"), FIELDS)
+            self.assertIsNone(FieldsCache(path=path).get("https://b.example.com", "db", "res.partner"))
+
+    def test_default_fields(self):
+        """Test that heavy field types are left out."""
+        self.assertEqual(FieldsCache().default_fields(FIELDS), ["id", "name", "partner_id"])
+        self.assertEqual(FieldsCache(heavy_types=["binary"]).default_fields(FIELDS),
+                         ["id", "name", "description", "partner_id"])
+
+
+class TestClientFields(unittest.TestCase):
+    """Test cases for reads planned with the fields cache."""
+
+    def setUp(self):
+        """Set up a client with a fields cache and mocked connections."""
+        self.client = DgtClient(
+            url="https://test.dgtera.com",
+            db="test_db",
+            api_key="test_api_key",
+            fields_cache=FieldsCache(),
+        )
+        self.common_mock = MagicMock()
+        self.models_mock = MagicMock()
+        self.common_mock.authenticate.return_value = 1
+
+        def execute_kw(db, uid, key, model, method, args, kwargs):
+            return FIELDS if method == "fields_get" else [{"id": 1}]
+        self.models_mock.execute_kw.side_effect = execute_kw
+
+        patcher1 = patch.object(self.client, '_get_common_connection', return_value=self.common_mock)
+        patcher2 = patch.object(self.client, '_get_models_connection', return_value=self.models_mock)
+        self.addCleanup(patcher1.stop)
+        self.addCleanup(patcher2.stop)
+        patcher1.start()
+        patcher2.start()
+
+    def methods(self):
+        return [call.args[4] for call in self.models_mock.execute_kw.call_args_list]
+
+    def test_reads_skip_heavy_fields(self):
+        """Test that reads without fields ask for light fields, fetching metadata once."""
+        self.client.search_read("res.partner", [])
+        self.client.read("res.partner", [1])
+
+        self.assertEqual(self.methods(), ["fields_get", "search_read", "read"])
+        for call in self.models_mock.execute_kw.call_args_list[1:]:
+            self.assertEqual(call.args[6]["fields"], ["id", "name", "partner_id"])
+
+    def test_explicit_heavy_fields(self):
+        """Test that heavy fields are read when asked for."""
+        self.client.read("res.partner", [1], ["name", "image_1920"])
+        self.assertEqual(self.models_mock.execute_kw.call_args.args[6]["fields"], ["name", "image_1920"])
+
+    def test_unknown_fields_rejected_locally(self):
+        """Test that misspelt fields fail without calling read."""
+        with self.assertRaises(DgtException) as context:
+            self.client.search_read("res.partner", [], fields=["name", "nmae"])
+        self.assertIn("'nmae'", str(context.exception))
+        self.assertEqual(self.methods(), ["fields_get"])
+
+    def test_fields_get_refresh(self):
+        """Test that refresh bypasses the cache."""
+        self.client.fields_get("res.partner")
+        self.client.fields_get("res.partner")
+        self.client.fields_get("res.partner", refresh=True)
+        self.assertEqual(self.methods(), ["fields_get", "fields_get"])
+
+    def test_no_fields_cache(self):
+        """Test that reads are unchanged without a fields cache."""
+        self.client.fields_cache = None
+        self.client.read("res.partner", [1])
+        self.assertEqual(self.methods(), ["read"])
+        self.assertEqual(self.models_mock.execute_kw.call_args.args[6], {})
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,157 @@
+import time
+import unittest
+
+from dgt_rpc import DgtClient, DgtException, Metrics, CallMetrics
+from dgt_rpc.compression import CallStats
+from dgt_rpc.metrics import Histogram
+from dgt_rpc.tests.server import LocalServer
+
+
+class TestHistogram(unittest.TestCase):
+    """Test cases for the Histogram class."""
+
+    def test_cumulative(self):
+        """Test that bucket counts are cumulative and bounds inclusive."""
+        histogram = Histogram((0.1, 1.0))
+        for value in (0.05, 0.1, 0.5, 2.0):
+            histogram.observe(value)
+        self.assertEqual(histogram.cumulative(), [(0.1, 2), (1.0, 3), (float("inf"), 4)])
+        self.assertEqual(histogram.count, 4)
+        self.assertAlmostEqual(histogram.sum, 2.65)
+
+
+class TestMetrics(unittest.TestCase):
+    """Test cases for the Metrics class."""
+
+    def make_call(self, model="res.partner", method="read", wall_time=0.2, error=None):
+        stats = CallStats(request_size=300, request_wire_size=200, response_size=5000,
+                          response_wire_size=1000, encode_time=0.01)
+        stats.wait_time = 0.15
+        stats.decode_time = 0.03
+        return CallMetrics("example.com", model, method, wall_time, stats, error)
+
+    def test_snapshot(self):
+        """Test that calls are aggregated per model and method."""
+        metrics = Metrics(latency_buckets=(0.1, 1.0), size_buckets=(1024,))
+        metrics.record(self.make_call())
+        metrics.record(self.make_call(wall_time=2.0, error=TimeoutError()))
+        metrics.record(self.make_call(method="search"))
+
+        snapshot = metrics.snapshot()
+        self.assertEqual(set(snapshot), {("res.partner", "read"), ("res.partner", "search")})
+        read = snapshot[("res.partner", "read")]
+        self.assertEqual(read["call_seconds"]["buckets"], [(0.1, 0), (1.0, 1), (float("inf"), 2)])
+        self.assertEqual(read["wait_seconds"]["buckets"][0], (0.1, 0))
+        self.assertEqual(read["response_bytes"]["buckets"], [(1024, 2), (float("inf"), 2)])
+        self.assertEqual(read["errors"], {"TimeoutError": 1})
+
+    def test_missing_phases(self):
+        """Test that calls without transport statistics only count their wall time."""
+        metrics = Metrics()
+        metrics.record(CallMetrics("example.com", "res.partner", "read", 0.5, error=ConnectionRefusedError()))
+        read = metrics.snapshot()[("res.partner", "read")]
+        self.assertEqual(read["call_seconds"]["count"], 1)
+        self.assertEqual(read["wait_seconds"]["count"], 0)
+
+    def test_prometheus(self):
+        """Test the Prometheus text format export."""
+        metrics = Metrics(latency_buckets=(0.1, 1.0))
+        metrics.record(self.make_call(model='we"ird'))
+        metrics.record(self.make_call(error=TimeoutError()))
+        text = metrics.prometheus()
+
+        self.assertIn("# TYPE dgt_rpc_call_seconds histogram\n", text)
+        self.assertIn('dgt_rpc_call_seconds_bucket{model="res.partner",method="read",le="0.1"} 0\n', text)
+        self.assertIn('dgt_rpc_call_seconds_bucket{model="res.partner",method="read",le="+Inf"} 1\n', text)
+        self.assertIn('dgt_rpc_call_seconds_count{model="we\\"ird",method="read"} 1\n', text)
+        self.assertIn('dgt_rpc_decode_seconds_sum{model="res.partner",method="read"} 0.03\n', text)
+        self.assertIn('dgt_rpc_call_errors_total{model="res.partner",method="read",error="TimeoutError"} 1\n',
+                      text)
+
+    def test_callbacks(self):
+        """Test that callbacks receive every call and their errors are contained."""
+        metrics = Metrics()
+        received = []
+        metrics.add_callback(received.append)
+
+        @metrics.add_callback
+        def broken(call):
+            raise RuntimeError("broken")
+
+        with self.assertLogs("dgt_rpc.metrics", "ERROR"):
+            metrics.record(self.make_call())
+        self.assertEqual(len(received), 1)
+
+        metrics.remove_callback(broken)
+        metrics.record(self.make_call())
+        self.assertEqual(len(received), 2)
+
+    def test_slow_call_log(self):
+        """Test that calls above the threshold are logged with their breakdown."""
+        metrics = Metrics(slow_threshold=1.0)
+        with self.assertLogs("dgt_rpc.slow", "WARNING") as logs:
+            metrics.record(self.make_call(wall_time=0.5))
+            metrics.record(self.make_call(wall_time=1.5))
+        self.assertEqual(len(logs.records), 1)
+        self.assertIn("res.partner.read on example.com: 1.500s (encode 0.010s, wait 0.150s", logs.output[0])
+
+
+class TestClientMetrics(unittest.TestCase):
+    """Test cases for the measurement of client calls."""
+
+    def setUp(self):
+        """Start a local server taking a little time per call."""
+        def handler(model, method, args, kwargs):
+            if method == "unlink":
+                raise ValueError("cannot delete")
+            time.sleep(0.01)
+            return [{"id": i, "name": "x" * 100} for i in range(50)]
+        self.server = LocalServer(handler).start(self)
+
+    def check_protocol(self, protocol):
+        metrics = Metrics()
+        calls = []
+        metrics.add_callback(calls.append)
+        client = DgtClient(self.server.url, "test_db", api_key="key", protocol=protocol, metrics=metrics)
+        self.addCleanup(client.close)
+
+        client.search_read("res.partner", [], fields=["name"])
+        with self.assertRaises(DgtException):
+            client.execute_kw("res.partner", "unlink", [[1]])
+
+        self.assertEqual([(c.model, c.method) for c in calls],
+                         [("", "authenticate"), ("res.partner", "search_read"), ("res.partner", "unlink")])
+        call = calls[1]
+        self.assertGreaterEqual(call.wait_time, 0.01)
+        self.assertGreater(call.encode_time, 0)
+        self.assertGreater(call.decode_time, 0)
+        self.assertGreater(call.request_size, 0)
+        self.assertGreater(call.response_size, 100)
+        self.assertGreaterEqual(call.wall_time, call.encode_time + call.wait_time + call.decode_time)
+        self.assertIsNone(call.error)
+        self.assertIsNotNone(calls[2].error)
+        self.assertEqual(calls[2].host, self.server.host)
+        self.assertEqual(metrics.snapshot()[("res.partner", "unlink")]["errors"], {"Fault": 1})
+
+    def test_xmlrpc(self):
+        """Test that XML-RPC calls are measured."""
+        self.check_protocol("xmlrpc")
+
+    def test_jsonrpc(self):
+        """Test that JSON-RPC calls are measured."""
+        self.check_protocol("jsonrpc")
+
+    def test_connection_refused(self):
+        """Test that a call failing before any response is recorded without phases."""
+        metrics = Metrics()
+        self.server.server_close()
+        client = DgtClient(self.server.url, "test_db", api_key="key", metrics=metrics, max_retries=0)
+        with self.assertRaises(DgtException):
+            client.authenticate()
+        entry = metrics.snapshot()[("", "authenticate")]
+        self.assertEqual(entry["call_seconds"]["count"], 1)
+        self.assertEqual(entry["wait_seconds"]["count"], 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
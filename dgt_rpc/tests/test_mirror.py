@@ -0,0 +1,190 @@
+import os
+import tempfile
+import threading
+import unittest
+
+from dgt_rpc import DgtClient, DgtException, Mirror
+from dgt_rpc.tests.server import LocalServer
+from dgt_rpc.tests.test_sync import FakeModel
+
+FIELDS = {
+    "name": {"type": "char"},
+    "date_order": {"type": "datetime"},
+    "config_id": {"type": "many2one"},
+    "amount_total": {"type": "float"},
+    "paid": {"type": "boolean"},
+    "lines": {"type": "one2many"},
+    "write_date": {"type": "datetime"},
+}
+
+MODELS = {"pos.order": {"fields": ["name", "date_order", "config_id", "amount_total", "paid", "lines"],
+                        "indexes": ["date_order"]}}
+
+
+class FakeOrders(FakeModel):
+    """FakeModel with pos.order-like records."""
+
+    def order(self, record_id, write_date, config_id=1, amount=10.0, paid=True):
+        self.records[record_id] = {
+            "id": record_id, "name": f"Order {record_id}", "write_date": write_date,
+            "date_order": f"2024-03-0{record_id % 9 + 1} 12:00:00",
+            "config_id": [config_id, f"POS {config_id}"] if config_id else False,
+            "amount_total": amount, "paid": paid, "lines": [record_id * 10, record_id * 10 + 1],
+        }
+
+    def handle(self, model, method, args, kwargs):
+        if method == "fields_get":
+            return FIELDS
+        return super().handle(model, method, args, kwargs)
+
+
+class TestMirror(unittest.TestCase):
+    """Test cases for the SQLite mirror."""
+
+    def setUp(self):
+        """Start a local server and open a mirror in a temporary directory."""
+        self.orders = FakeOrders()
+        for i in range(1, 6):
+            self.orders.order(i, f"2024-03-01 10:00:0{i}", config_id=i % 2 + 1, amount=i * 10.0)
+        self.server = LocalServer(self.orders.handle).start(self)
+        self.client = DgtClient(self.server.url, "test_db", api_key="key")
+        self.addCleanup(self.client.close)
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.path = os.path.join(directory.name, "mirror.db")
+
+    def open_mirror(self):
+        mirror = Mirror(self.client, self.path, models=MODELS, page_size=2)
+        self.addCleanup(mirror.close)
+        return mirror
+
+    def test_refresh_and_query(self):
+        """Test that records are copied with converted values and queried locally."""
+        mirror = self.open_mirror()
+        self.assertEqual(mirror.refresh(), {"pos.order": (5, 0)})
+
+        records = mirror.search_read("pos.order", [("config_id", "=", 2)], order="amount_total desc")
+        self.assertEqual([r["id"] for r in records], [5, 3, 1])
+        self.assertEqual(records[0]["config_id"], 2)
+        self.assertEqual(records[0]["lines"], [50, 51])
+        self.assertIs(records[0]["paid"], True)
+
+        rows = mirror.query("SELECT config_id, SUM(amount_total) AS total FROM pos_order "
+                            "GROUP BY config_id ORDER BY config_id")
+        self.assertEqual(rows, [{"config_id": 1, "total": 60.0}, {"config_id": 2, "total": 90.0}])
+        indexes = [r["name"] for r in mirror.query("SELECT name FROM sqlite_master WHERE type = 'index'")]
+        self.assertIn("pos_order_config_id", indexes)
+        self.assertIn("pos_order_date_order", indexes)
+
+    def test_incremental(self):
+        """Test that refreshes apply changes and deletions and survive reopening."""
+        self.open_mirror().refresh()
+        self.orders.order(2, "2024-03-02 09:00:00", amount=99.0)
+        del self.orders.records[4]
+        self.orders.calls.clear()
+
+        mirror = self.open_mirror()
+        self.assertEqual(mirror.refresh(), {"pos.order": (1, 1)})
+        self.assertEqual(self.orders.calls.count("search_read"), 1)
+        self.assertEqual(mirror.search_read("pos.order", [("id", "=", 2)], fields=["amount_total"]),
+                         [{"id": 2, "amount_total": 99.0}])
+        self.assertEqual(mirror.search_count("pos.order"), 4)
+
+    def test_domains(self):
+        """Test the translation of domains to SQL."""
+        self.orders.order(6, "2024-03-01 10:00:06", config_id=False, paid=False)
+        mirror = self.open_mirror()
+        mirror.refresh()
+
+        def ids(domain):
+            return [r["id"] for r in mirror.search_read("pos.order", domain, fields=["name"])]
+
+        self.assertEqual(ids(["|", ("amount_total", ">=", 50), ("id", "in", [1, 2])]), [1, 2, 5])
+        self.assertEqual(ids([("config_id", "=", False)]), [6])
+        self.assertEqual(ids([("paid", "=", False)]), [6])
+        self.assertEqual(ids(["!", ("name", "ilike", "order 1")]), [2, 3, 4, 5, 6])
+        self.assertEqual(ids([("id", "in", [])]), [])
+        self.assertEqual(mirror.search_read("pos.order", [], fields=["name"], offset=1, limit=2),
+                         [{"id": 2, "name": "Order 2"}, {"id": 3, "name": "Order 3"}])
+        with self.assertRaises(DgtException):
+            ids([("state", "=", "paid")])
+        with self.assertRaises(DgtException):
+            mirror.search_read("pos.order", order="name; DROP TABLE pos_order")
+
+    def test_like_is_case_sensitive(self):
+        """Test that 'like' matches case, unlike 'ilike', and keeps wildcards."""
+        self.orders.records[2]["name"] = "ORDER 2 [rush]*"
+        mirror = self.open_mirror()
+        mirror.refresh()
+
+        def ids(domain):
+            return [r["id"] for r in mirror.search_read("pos.order", domain, fields=["name"])]
+
+        self.assertEqual(ids([("name", "like", "Order")]), [1, 3, 4, 5])
+        self.assertEqual(ids([("name", "ilike", "order")]), [1, 2, 3, 4, 5])
+        self.assertEqual(ids([("name", "like", "order")]), [])
+        self.assertEqual(ids([("name", "not like", "Order")]), [2])
+        self.assertEqual(ids([("name", "like", "Or_er 3")]), [3])
+        self.assertEqual(ids([("name", "like", "Order%4")]), [4])
+        self.assertEqual(ids([("name", "like", "[rush]*")]), [2])
+        self.assertEqual(ids([("name", "like", "[r")]), [2])
+
+    def test_negative_operators_keep_unset_values(self):
+        """Test that '!=' and 'not ilike' match records where the field is not set, as Odoo does."""
+        self.orders.order(6, "2024-03-01 10:00:06", config_id=False)
+        self.orders.records[6]["name"] = False
+        mirror = self.open_mirror()
+        mirror.refresh()
+
+        def ids(domain):
+            return [r["id"] for r in mirror.search_read("pos.order", domain, fields=["name"])]
+
+        self.assertEqual(ids([("config_id", "!=", 2)]), [2, 4, 6])
+        self.assertEqual(ids([("config_id", "!=", False)]), [1, 2, 3, 4, 5])
+        self.assertEqual(ids([("name", "not ilike", "order 1")]), [2, 3, 4, 5, 6])
+        self.assertEqual(ids([("name", "not like", "Order")]), [6])
+
+    def test_interrupted_refresh(self):
+        """Test that a failing refresh keeps the pages committed before the failure."""
+        mirror = self.open_mirror()
+        handle = self.orders.handle
+
+        def failing(model, method, args, kwargs):
+            if method == "search_read" and self.orders.calls.count("search_read") == 2:
+                raise ValueError("connection lost")
+            return handle(model, method, args, kwargs)
+
+        self.server.handler = failing
+        with self.assertRaises(DgtException):
+            mirror.refresh()
+        self.assertEqual(mirror.search_count("pos.order"), 2)
+
+        self.server.handler = handle
+        # The 2 records committed before the failure are read again with the 3 others
+        self.assertEqual(mirror.refresh(), {"pos.order": (5, 0)})
+        self.assertEqual(mirror.search_count("pos.order"), 5)
+
+    def test_added_fields(self):
+        """Test that new fields are added to the table and filled by the next refresh."""
+        Mirror(self.client, self.path, models={"pos.order": {"fields": ["name"]}}).refresh()
+        mirror = self.open_mirror()
+        self.assertEqual(mirror.refresh(), {"pos.order": (5, 0)})
+        self.assertEqual(mirror.search_read("pos.order", [("id", "=", 1)], fields=["amount_total"]),
+                         [{"id": 1, "amount_total": 10.0}])
+
+    def test_concurrent_readers(self):
+        """Test that queries from several threads use their own connections."""
+        mirror = self.open_mirror()
+        mirror.refresh()
+        counts = []
+        threads = [threading.Thread(target=lambda: counts.append(mirror.search_count("pos.order")))
+                   for _ in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(counts, [5] * 4)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,137 @@
+import contextlib
+import io
+import unittest
+import time
+import xmlrpc.client
+
+from dgt_rpc import DgtClient, DgtException
+from dgt_rpc.pool import ConnectionPool, PooledTransport
+from dgt_rpc.tests.server import LocalServer
+
+
+class TestConnectionPool(unittest.TestCase):
+    """Test cases for the keep-alive connection pool."""
+
+    def setUp(self):
+        """Start a local XML-RPC server counting TCP connections."""
+        self.server = LocalServer().start(self)
+        self.url = self.server.url
+        self.host = self.server.host
+
+    def test_connection_reused_across_calls(self):
+        """Test that repeated calls share one TCP connection."""
+        with DgtClient(self.url, db="test_db", api_key="key") as client:
+            for _ in range(20):
+                result = client.execute_kw("res.partner", "search", [[]])
+                self.assertEqual(result, ["res.partner", "search"])
+
+            self.assertEqual(self.server.connections, 1)
+            self.assertEqual(client.pool.created, 1)
+            self.assertEqual(client.pool.idle_count(), 1)
+
+    def test_shared_pool_between_clients(self):
+        """Test that two clients on the same host share connections."""
+        pool = ConnectionPool()
+        client1 = DgtClient(self.url, db="db1", api_key="key", pool=pool)
+        client2 = DgtClient(self.url, db="db2", api_key="key", pool=pool)
+
+        client1.execute_kw("res.partner", "search", [[]])
+        client2.execute_kw("res.partner", "search", [[]])
+
+        self.assertEqual(self.server.connections, 1)
+        client1.close()
+        self.assertEqual(pool.idle_count(), 1)
+
+    def test_verbose_is_per_call(self):
+        """Test that a verbose call does not make later calls on a shared transport verbose."""
+        transport = PooledTransport(ConnectionPool())
+        endpoint = f"{self.url}/xmlrpc/2/object"
+        verbose = xmlrpc.client.ServerProxy(endpoint, transport=transport, verbose=True)
+        quiet = xmlrpc.client.ServerProxy(endpoint, transport=transport)
+
+        output = io.StringIO()
+        with contextlib.redirect_stdout(output):
+            verbose.execute_kw("test_db", 1, "key", "res.partner", "search", [[]], {})
+        self.assertIn("body:", output.getvalue())
+
+        output = io.StringIO()
+        with contextlib.redirect_stdout(output):
+            self.assertEqual(quiet.execute_kw("test_db", 1, "key", "res.partner", "search", [[]], {}),
+                             ["res.partner", "search"])
+        self.assertEqual(output.getvalue(), "")
+        self.assertEqual(self.server.connections, 1)
+
+    def test_idle_eviction(self):
+        """Test that connections idle for too long are closed."""
+        client = DgtClient(self.url, db="test_db", api_key="key",
+                           pool=ConnectionPool(idle_timeout=0.01))
+        client.execute_kw("res.partner", "search", [[]])
+        time.sleep(0.05)
+        client.execute_kw("res.partner", "search", [[]])
+
+        self.assertEqual(self.server.connections, 2)
+
+    def test_stale_connection_replaced(self):
+        """Test that a connection closed by the server is not reused."""
+        client = DgtClient(self.url, db="test_db", api_key="key")
+        client.execute_kw("res.partner", "search", [[]])
+
+        # Simulate the server dropping the keep-alive connection
+        conn = client.pool._idle[("http", self.host)][0][0]
+        conn.sock.close()
+        conn.sock = None
+
+        self.assertEqual(client.execute_kw("res.partner", "read", [[1]]), ["res.partner", "read"])
+        self.assertEqual(client.pool.created, 2)
+
+    def test_per_host_limit(self):
+        """Test that acquiring beyond the per-host limit times out."""
+        pool = ConnectionPool(max_per_host=1, acquire_timeout=0.05)
+        host = self.host
+        conn, reused = pool.acquire("http", host)
+        self.assertFalse(reused)
+
+        with self.assertRaises(DgtException):
+            pool.acquire("http", host)
+
+        pool.release("http", host, conn, reusable=False)
+        conn, _ = pool.acquire("http", host)
+        pool.release("http", host, conn, reusable=False)
+
+    def test_max_size_bounds_idle_connections(self):
+        """Test that the pool never keeps more idle connections than max_size."""
+        pool = ConnectionPool(max_size=2, max_per_host=5)
+        host = self.host
+        conns = [pool.acquire("http", host)[0] for _ in range(4)]
+        for conn in conns:
+            conn.connect()
+            pool.release("http", host, conn)
+
+        self.assertEqual(pool.idle_count(), 2)
+        pool.close()
+        self.assertEqual(pool.idle_count(), 0)
+
+    def test_max_connections_over_all_hosts(self):
+        """Test the global limit, which closes idle connections to other hosts to make room."""
+        pool = ConnectionPool(max_per_host=5, max_connections=2, acquire_timeout=0.05)
+        other = LocalServer().start(self).host
+        conn1, _ = pool.acquire("http", self.host)
+        conn2, _ = pool.acquire("http", other)
+        self.assertEqual(pool.active_count, 2)
+
+        with self.assertRaises(DgtException):
+            pool.acquire("http", self.host)
+
+        conn2.connect()
+        pool.release("http", other, conn2)
+        conn3, reused = pool.acquire("http", self.host)
+        self.assertFalse(reused)
+        self.assertEqual(pool.idle_count(), 0)
+
+        pool.release("http", self.host, conn1, reusable=False)
+        pool.release("http", self.host, conn3, reusable=False)
+        self.assertEqual(pool.active_count, 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
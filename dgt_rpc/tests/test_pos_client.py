@@ -2,6 +2,7 @@ import unittest
 from unittest.mock import patch, MagicMock
 import sys
 import os
+import xmlrpc.client
 
 # Add the parent directory to sys.path
 sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../..')))
@@ -130,6 +131,28 @@ class TestDgtPOSClient(unittest.TestCase):
         # Check that the result is correct
         self.assertEqual(result, mock_orders)
 
+    def test_get_pos_orders_many(self):
+        """Test fetching orders for many POS configurations concurrently."""
+        def execute_kw(db, uid, key, model, method, args, kwargs):
+            if args[0] == 2:
+                raise xmlrpc.client.Fault(1, "POS 2 is broken")
+            return {'all': [{'id': args[0] * 100}]}
+        self.models_mock.execute_kw.side_effect = execute_kw
+        
+        pos_configs = [{'id': 1}, {'id': 2}, 3]
+        results = list(self.pos_client.get_pos_orders_many(pos_configs, "retail_db", max_workers=2))
+        
+        # Every configuration gets exactly one result, in completion order
+        self.assertEqual(len(results), 3)
+        by_id = {r.pos_config['id'] if isinstance(r.pos_config, dict) else r.pos_config: r for r in results}
+        self.assertEqual(by_id[1].orders, {'all': [{'id': 100}]})
+        self.assertEqual(by_id[3].orders, {'all': [{'id': 300}]})
+        
+        # The failing configuration does not abort the batch
+        self.assertFalse(by_id[2].ok)
+        self.assertIsInstance(by_id[2].error, DgtException)
+        self.assertIn("POS 2 is broken", str(by_id[2].error))
+
 
 if __name__ == '__main__':
     unittest.main() 
\ No newline at end of file
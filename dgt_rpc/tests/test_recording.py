@@ -0,0 +1,106 @@
+import os
+import tempfile
+import unittest
+from unittest.mock import patch
+
+from dgt_rpc import DgtClient, DgtException, TrafficRecorder, Replayer
+from dgt_rpc.recording import read_recording, percentile
+from dgt_rpc.tests.server import LocalServer
+
+
+class TestRecording(unittest.TestCase):
+    """Test cases for TrafficRecorder and Replayer."""
+
+    def setUp(self):
+        """Start a local server and prepare a recording path."""
+        def handler(model, method, args, kwargs):
+            if method == "unlink":
+                raise ValueError("cannot delete")
+            return [{"id": i, "name": "x" * 100} for i in range(20)]
+        self.server = LocalServer(handler).start(self)
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.path = os.path.join(directory.name, "calls.jsonl.gz")
+
+    def make_client(self, **kwargs):
+        client = DgtClient(self.server.url, "test_db", api_key="secret-key", max_retries=0, **kwargs)
+        self.addCleanup(client.close)
+        return client
+
+    def test_record(self):
+        """Test that calls are recorded with timings and sizes and without credentials."""
+        with TrafficRecorder(self.path) as recorder:
+            client = self.make_client(interceptors=[recorder])
+            client.search_read("res.partner", [["active", "=", True]], fields=["name"])
+            client.execute_kw("res.users", "create", [{"login": "a", "password": "hunter2"}],
+                              {"context": {"api_key": "abc"}})
+            client.execute_kw("ir.config_parameter", "set_param", ["web.base.url", "https://pos"],
+                              {"context": {"key": "kept"}})
+            with self.assertRaises(DgtException):
+                client.execute_kw("res.partner", "unlink", [[1]])
+
+        calls = list(read_recording(self.path))
+        self.assertEqual([(c["model"], c["method"]) for c in calls],
+                         [("res.partner", "search_read"), ("res.users", "create"),
+                          ("ir.config_parameter", "set_param"), ("res.partner", "unlink")])
+        self.assertEqual(calls[0]["db"], "test_db")
+        sent = self.server.calls[0]
+        self.assertEqual((calls[0]["args"], calls[0]["kwargs"]), (sent[3], sent[4]))
+        self.assertGreater(calls[0]["size"], 100)
+        self.assertGreater(calls[0]["duration"], 0)
+        self.assertLessEqual(calls[0]["t"], calls[1]["t"])
+        self.assertIsNone(calls[0]["error"])
+        self.assertEqual(calls[1]["args"], [{"login": "a", "password": "***"}])
+        self.assertEqual(calls[1]["kwargs"], {"context": {"api_key": "***"}})
+        self.assertEqual(calls[2]["kwargs"], {"context": {"key": "kept"}})
+        self.assertEqual(calls[3]["error"], "DgtException")
+        with open(self.path, "rb") as f:
+            content = f.read()
+        self.assertNotIn(b"secret-key", content)
+
+    def test_replay(self):
+        """Test that a recording is replayed and reported per model and method."""
+        with TrafficRecorder(self.path) as recorder:
+            client = self.make_client(interceptors=[recorder])
+            for _ in range(5):
+                client.execute_kw("res.partner", "read", [[1, 2]], {"fields": ["name"]})
+            client.execute_kw("res.partner", "write", [[1], {"name": "y"}])
+            with self.assertRaises(DgtException):
+                client.execute_kw("res.partner", "unlink", [[1]])
+        recorded = len(self.server.calls)
+
+        report = Replayer(self.make_client(), speed=None, concurrency=4).run(self.path)
+        self.assertEqual(report.calls, 7)
+        self.assertEqual(self.server.calls[recorded:].count(
+            ("test_db", "res.partner", "read", [[1, 2]], {"fields": ["name"]})), 5)
+        summary = report.summary()
+        self.assertEqual(summary[("res.partner", "read")]["calls"], 5)
+        self.assertEqual(summary[("res.partner", "unlink")]["errors"], 1)
+        self.assertEqual(summary[("*", "*")]["calls"], 7)
+        self.assertLessEqual(summary[("*", "*")]["p50"], summary[("*", "*")]["max"])
+        self.assertIn("res.partner.read", str(report))
+
+        report = Replayer(self.make_client(), speed=None, read_only=True).run(self.path)
+        self.assertEqual((report.calls, report.skipped), (5, 2))
+
+    @patch("dgt_rpc.recording.time.sleep")
+    def test_pacing(self, mock_sleep):
+        """Test that calls are spaced as recorded, divided by the speed."""
+        calls = [
+            {"t": 10.0 + offset, "model": "res.partner", "method": "read", "args": [[1]], "kwargs": {}}
+            for offset in (0.0, 2.0, 4.0)
+        ]
+        with patch("dgt_rpc.recording.time.monotonic", return_value=100.0):
+            Replayer(self.make_client(), speed=2.0, concurrency=1).run(calls)
+        self.assertEqual([call.args[0] for call in mock_sleep.call_args_list], [1.0, 2.0])
+
+    def test_percentile(self):
+        """Test the nearest-rank percentile."""
+        values = list(range(1, 101))
+        self.assertEqual(percentile(values, 0.5), 50)
+        self.assertEqual(percentile(values, 0.99), 99)
+        self.assertIsNone(percentile([], 0.5))
+
+
+if __name__ == "__main__":
+    unittest.main()
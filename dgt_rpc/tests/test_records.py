@@ -0,0 +1,118 @@
+import unittest
+from unittest.mock import patch, MagicMock
+
+from dgt_rpc import DgtClient, DgtException, FieldsCache, RecordSet
+from dgt_rpc import records
+
+
+class TestRecordSet(unittest.TestCase):
+    """Test cases for lazy recordsets."""
+
+    def setUp(self):
+        """Set up a client whose server knows three partners."""
+        self.client = DgtClient(url="https://test.dgtera.com", db="test_db", api_key="test_api_key")
+        self.common_mock = MagicMock()
+        self.models_mock = MagicMock()
+        self.common_mock.authenticate.return_value = 1
+        self.rows = {i: {"id": i, "name": f"Partner {i}", "city": f"City {i}"} for i in (1, 2, 3)}
+
+        def execute_kw(db, uid, key, model, method, args, kwargs):
+            if method == "fields_get":
+                return {"id": {"type": "integer"}, "name": {"type": "char"}, "city": {"type": "char"}}
+            # Odoo's read takes [ids]
+            if not all(isinstance(i, int) for i in args[0]):
+                raise ValueError(f"Invalid read arguments {args!r}")
+            return [
+                {"id": i, **{f: self.rows[i][f] for f in kwargs["fields"]}}
+                for i in args[0] if i in self.rows
+            ]
+        self.models_mock.execute_kw.side_effect = execute_kw
+
+        patcher1 = patch.object(self.client, '_get_common_connection', return_value=self.common_mock)
+        patcher2 = patch.object(self.client, '_get_models_connection', return_value=self.models_mock)
+        self.addCleanup(patcher1.stop)
+        self.addCleanup(patcher2.stop)
+        patcher1.start()
+        patcher2.start()
+
+    def reads(self):
+        return [(call.args[5], call.args[6]) for call in self.models_mock.execute_kw.call_args_list
+                if call.args[4] == "read"]
+
+    def test_field_prefetched_for_whole_set(self):
+        """Test that a loop over a set reads each field once for all records."""
+        partners = self.client.browse("res.partner", [1, 2, 3])
+        self.assertIsInstance(partners, RecordSet)
+        self.assertEqual(self.reads(), [])
+
+        names = [(p.id, p.name, p.city) for p in partners]
+
+        self.assertEqual(names, [(i, f"Partner {i}", f"City {i}") for i in (1, 2, 3)])
+        self.assertEqual(self.reads(), [
+            ([[1, 2, 3]], {"fields": ["name"]}),
+            ([[1, 2, 3]], {"fields": ["city"]}),
+        ])
+
+    def test_same_arguments_as_client_read(self):
+        """Test that recordsets read through client.read, sending [ids] like Odoo expects."""
+        self.client.read("res.partner", [1, 2], fields=["name"])
+        self.client.browse("res.partner", [1, 2])[0].name
+        self.assertEqual(self.reads(), [([[1, 2]], {"fields": ["name"]})] * 2)
+
+    def test_values_cached_on_the_set(self):
+        """Test that loaded values are reused by records and subsets of a set."""
+        partners = self.client.browse("res.partner", [1, 2, 3])
+        self.assertEqual(partners[2].name, "Partner 3")
+        self.assertEqual(partners[:2].mapped("name"), ["Partner 1", "Partner 2"])
+        self.assertEqual(partners[0]["name"], "Partner 1")
+        self.assertEqual(len(self.reads()), 1)
+        self.assertEqual(self.reads()[0][0], [[3, 1, 2]])
+
+        partners.invalidate(["name"])
+        self.rows[1]["name"] = "Renamed"
+        self.assertEqual(partners[0].name, "Renamed")
+        self.assertEqual(len(self.reads()), 2)
+
+    def test_filtered_and_read(self):
+        """Test explicit prefetching and filtering."""
+        partners = self.client.browse("res.partner", [1, 2, 3]).read(["name", "city"])
+        city_2 = partners.filtered(lambda p: p.city == "City 2")
+        self.assertEqual(city_2.ids, [2])
+        self.assertEqual(city_2[0].name, "Partner 2")
+        self.assertEqual(len(self.reads()), 2)
+        self.assertEqual(repr(city_2), "res.partner(2,)")
+
+    def test_prefetch_limit(self):
+        """Test that a single read loads at most PREFETCH_MAX records."""
+        with patch.object(records, "PREFETCH_MAX", 2):
+            partners = self.client.browse("res.partner", [1, 2, 3])
+            self.assertEqual([p.name for p in partners], ["Partner 1", "Partner 2", "Partner 3"])
+        self.assertEqual([args for args, _ in self.reads()], [[[1, 2]], [[3]]])
+
+    def test_missing_record(self):
+        """Test that reading a deleted record raises."""
+        record = self.client.browse("res.partner", 42)[0]
+        with self.assertRaises(DgtException):
+            record.name
+
+    def test_unknown_field_with_fields_cache(self):
+        """Test that unknown fields raise AttributeError without a read when metadata is cached."""
+        self.client.fields_cache = FieldsCache()
+        partner = self.client.browse("res.partner", [1])[0]
+        self.assertFalse(hasattr(partner, "nmae"))
+        self.assertEqual(partner.name, "Partner 1")
+        self.assertEqual(self.reads(), [([[1]], {"fields": ["name"]})])
+
+    def test_unknown_field_without_fields_cache(self):
+        """Test that unknown fields raise AttributeError, checked against one fields_get per set."""
+        partners = self.client.browse("res.partner", [1, 2])
+        self.assertFalse(hasattr(partners[0], "nmae"))
+        self.assertEqual(getattr(partners[1], "nmae", None), None)
+        self.assertEqual([p.name for p in partners], ["Partner 1", "Partner 2"])
+        self.assertEqual(self.reads(), [([[1, 2]], {"fields": ["name"]})])
+        methods = [call.args[4] for call in self.models_mock.execute_kw.call_args_list]
+        self.assertEqual(methods.count("fields_get"), 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
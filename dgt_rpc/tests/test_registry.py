@@ -0,0 +1,95 @@
+import unittest
+from unittest.mock import patch
+
+from dgt_rpc import ClientRegistry, DgtPOSClient
+from dgt_rpc.tests.server import LocalServer
+
+
+class TestClientRegistry(unittest.TestCase):
+    """Test cases for the ClientRegistry class."""
+
+    def setUp(self):
+        """Start two local servers standing in for tenant hosts."""
+        self.servers = [LocalServer().start(self), LocalServer().start(self)]
+        self.registry = ClientRegistry()
+        self.addCleanup(self.registry.close)
+
+    def test_clients_reused_per_tenant(self):
+        """Test that a tenant always gets the same client and authenticates once."""
+        url = self.servers[0].url
+        client = self.registry.get(url, "tenant_1", api_key="key")
+        self.assertIsInstance(client, DgtPOSClient)
+        self.assertIs(self.registry.get(url + "/", "tenant_1", api_key="key"), client)
+        self.assertIsNot(self.registry.get(url, "tenant_1", api_key="other"), client)
+        self.assertIsNot(self.registry.get(url, "tenant_2", api_key="key"), client)
+        self.assertEqual(len(self.registry), 3)
+
+    def test_timeout(self):
+        """Test that shared transports get the client timeout, 120 seconds by default like DgtClient."""
+        url = self.servers[0].url
+        client = self.registry.get(url, "tenant_1", api_key="key")
+        self.assertEqual(client.transport.timeout, 120)
+        self.assertEqual(client.transport.timeout, DgtPOSClient(url, "tenant_1", api_key="key").transport.timeout)
+        self.assertEqual(client.timeout, 120)
+
+        registry = ClientRegistry(timeout=5)
+        self.addCleanup(registry.close)
+        client = registry.get(url, "tenant_1", api_key="key")
+        self.assertEqual(client.transport.timeout, 5)
+        self.assertEqual(client.transport.http.timeout, 5)
+        client.execute_kw("pos.order", "search", [[]])
+
+    def test_transport_and_pool_shared_per_host(self):
+        """Test that tenants of one server share connections."""
+        pos_configs = [
+            {"url": server.url, "database": f"tenant_{i}", "api_key": "key"}
+            for i in range(5) for server in self.servers
+        ]
+        for pos in pos_configs:
+            self.registry.for_pos(pos).execute_kw("pos.order", "search", [[]])
+
+        clients = [self.registry.for_pos(pos) for pos in pos_configs]
+        self.assertIs(clients[0].transport, clients[2].transport)
+        self.assertIsNot(clients[0].transport, clients[1].transport)
+        self.assertIs(clients[0].pool, clients[1].pool)
+        self.assertEqual([server.connections for server in self.servers], [1, 1])
+        self.assertEqual(self.registry.stats()["servers"], 2)
+
+        self.assertEqual(clients[0].uid, 7)
+        self.assertEqual({call[0] for call in self.servers[0].calls},
+                         {f"tenant_{i}" for i in range(5)})
+
+    def test_idle_tenants_evicted(self):
+        """Test that unused tenants are dropped but their UID is remembered."""
+        url = self.servers[0].url
+        with patch("dgt_rpc.registry.time.monotonic", return_value=0):
+            old = self.registry.get(url, "tenant_1", api_key="key")
+            old.authenticate()
+        with patch("dgt_rpc.registry.time.monotonic", return_value=500):
+            self.registry.get(url, "tenant_2", api_key="key")
+        with patch("dgt_rpc.registry.time.monotonic", return_value=700):
+            self.assertEqual(self.registry.evict_idle(), 1)
+            self.assertEqual(len(self.registry), 1)
+
+            new = self.registry.get(url, "tenant_1", api_key="key")
+            self.assertIsNot(new, old)
+            with patch.object(new, "_get_common_connection") as common:
+                self.assertEqual(new.authenticate(), 7)
+            common.return_value.authenticate.assert_not_called()
+
+    def test_max_clients(self):
+        """Test that the least recently used tenant is evicted beyond max_clients."""
+        registry = ClientRegistry(max_clients=2)
+        url = self.servers[0].url
+        first = registry.get(url, "tenant_1", api_key="key")
+        registry.get(url, "tenant_2", api_key="key")
+        registry.get(url, "tenant_1", api_key="key")
+        registry.get(url, "tenant_3", api_key="key")
+
+        self.assertEqual(len(registry), 2)
+        self.assertIs(registry.get(url, "tenant_1", api_key="key"), first)
+        self.assertEqual(registry.stats()["evicted"], 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
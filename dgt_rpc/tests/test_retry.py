@@ -0,0 +1,164 @@
+import socket
+import unittest
+import xmlrpc.client
+from unittest.mock import patch, MagicMock
+
+from dgt_rpc import DgtClient, DgtException, RetryPolicy, CircuitBreaker, CircuitOpenError
+
+
+def protocol_error(status, headers=None):
+    return xmlrpc.client.ProtocolError("localhost/xmlrpc/2/object", status, "Error", headers or {})
+
+
+class TestRetryPolicy(unittest.TestCase):
+    """Test cases for the RetryPolicy class."""
+
+    def test_backoff(self):
+        """Test that delays grow exponentially up to the maximum."""
+        policy = RetryPolicy(delay=1, backoff=2, max_delay=5, jitter=False)
+        self.assertEqual([policy.get_delay(attempt) for attempt in range(4)], [1, 2, 4, 5])
+
+    def test_jitter(self):
+        """Test that jittered delays stay between zero and the backoff delay."""
+        policy = RetryPolicy(delay=1, backoff=2)
+        for attempt in range(4):
+            for _ in range(20):
+                self.assertTrue(0 <= policy.get_delay(attempt) <= 2 ** attempt)
+
+    def test_retry_after(self):
+        """Test that a Retry-After header is honoured up to the maximum delay."""
+        policy = RetryPolicy(max_delay=10)
+        self.assertEqual(policy.get_delay(0, protocol_error(503, {"Retry-After": "3"})), 3)
+        self.assertEqual(policy.get_delay(0, protocol_error(429, {"retry-after": "60"})), 10)
+
+    def test_should_retry(self):
+        """Test that only idempotent methods are retried on ambiguous failures."""
+        policy = RetryPolicy(max_retries=2)
+        self.assertTrue(policy.should_retry("read", socket.timeout(), 0))
+        self.assertTrue(policy.should_retry("search", protocol_error(502), 1))
+        self.assertFalse(policy.should_retry("search", protocol_error(502), 2))
+        self.assertFalse(policy.should_retry("read", protocol_error(500), 0))
+        self.assertFalse(policy.should_retry("read", xmlrpc.client.Fault(1, "error"), 0))
+        self.assertFalse(policy.should_retry("write", socket.timeout(), 0))
+        self.assertTrue(policy.should_retry("write", ConnectionRefusedError(), 0))
+        self.assertTrue(RetryPolicy(methods=None).should_retry("write", socket.timeout(), 0))
+
+    @patch("dgt_rpc.retry.time.sleep")
+    def test_call(self, mock_sleep):
+        """Test that a call is repeated until it succeeds."""
+        func = MagicMock(side_effect=[ConnectionResetError(), protocol_error(503), "ok"])
+        self.assertEqual(RetryPolicy(jitter=False).call(func, "read"), "ok")
+        self.assertEqual(func.call_count, 3)
+        self.assertEqual([call.args[0] for call in mock_sleep.call_args_list], [1, 2])
+
+    @patch("dgt_rpc.retry.time.sleep")
+    def test_call_gives_up(self, mock_sleep):
+        """Test that the last error is raised once retries are exhausted."""
+        func = MagicMock(side_effect=socket.timeout("timed out"))
+        with self.assertRaises(socket.timeout):
+            RetryPolicy(max_retries=2).call(func, "read")
+        self.assertEqual(func.call_count, 3)
+
+
+class TestCircuitBreaker(unittest.TestCase):
+    """Test cases for the CircuitBreaker class."""
+
+    def test_open_half_open_close(self):
+        """Test the transitions of a host's circuit."""
+        breaker = CircuitBreaker(failure_threshold=2, recovery_timeout=30)
+        with patch("dgt_rpc.retry.time.monotonic", return_value=100):
+            breaker.record_failure("a")
+            self.assertEqual(breaker.state("a"), "closed")
+            breaker.record_failure("a")
+            self.assertEqual(breaker.state("a"), "open")
+            self.assertEqual(breaker.state("b"), "closed")
+            with self.assertRaises(CircuitOpenError):
+                breaker.before_call("a")
+            breaker.before_call("b")
+
+        with patch("dgt_rpc.retry.time.monotonic", return_value=131):
+            breaker.before_call("a")
+            self.assertEqual(breaker.state("a"), "half_open")
+            with self.assertRaises(CircuitOpenError):
+                breaker.before_call("a")
+            breaker.record_failure("a")
+            self.assertEqual(breaker.state("a"), "open")
+
+        with patch("dgt_rpc.retry.time.monotonic", return_value=162):
+            breaker.before_call("a")
+            breaker.record_success("a")
+            self.assertEqual(breaker.state("a"), "closed")
+            breaker.before_call("a")
+
+    @patch("dgt_rpc.retry.time.sleep")
+    def test_fails_fast(self, mock_sleep):
+        """Test that an open circuit rejects calls without making them."""
+        breaker = CircuitBreaker(failure_threshold=3)
+        policy = RetryPolicy(max_retries=5)
+        func = MagicMock(side_effect=ConnectionRefusedError())
+        with self.assertRaises(CircuitOpenError):
+            policy.call(func, "read", "a", breaker)
+        self.assertEqual(func.call_count, 3)
+
+        with self.assertRaises(CircuitOpenError):
+            policy.call(func, "read", "a", breaker)
+        self.assertEqual(func.call_count, 3)
+
+    def test_fault_closes_circuit(self):
+        """Test that a server error counts as the server being up."""
+        breaker = CircuitBreaker(failure_threshold=2)
+        breaker.record_failure("a")
+        func = MagicMock(side_effect=xmlrpc.client.Fault(1, "error"))
+        with self.assertRaises(xmlrpc.client.Fault):
+            RetryPolicy().call(func, "read", "a", breaker)
+        breaker.record_failure("a")
+        self.assertEqual(breaker.state("a"), "closed")
+
+
+class TestClientRetries(unittest.TestCase):
+    """Test cases for retries of client calls."""
+
+    def setUp(self):
+        """Set up a client with a mocked connection."""
+        self.client = DgtClient("https://example.com", "test_db", api_key="key", retry_delay=0)
+        self.client.uid = 1
+        self.models = MagicMock()
+        patcher = patch.object(self.client, "_get_models_connection", return_value=self.models)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_parameters(self):
+        """Test that the constructor parameters configure the default policy."""
+        client = DgtClient("https://example.com", "test_db", timeout=30, max_retries=5, retry_delay=2)
+        self.assertEqual(client.timeout, 30)
+        self.assertEqual(client.transport.timeout, 30)
+        self.assertEqual(client.retry_policy.max_retries, 5)
+        self.assertEqual(client.retry_policy.delay, 2)
+
+    def test_read_retried(self):
+        """Test that a read is retried after a gateway error."""
+        self.models.execute_kw.side_effect = [protocol_error(502), [{"id": 1}]]
+        self.assertEqual(self.client.execute_kw("res.partner", "read", [[1]]), [{"id": 1}])
+        self.assertEqual(self.models.execute_kw.call_count, 2)
+
+    def test_write_not_retried(self):
+        """Test that a write is not repeated after a timeout."""
+        self.models.execute_kw.side_effect = socket.timeout("timed out")
+        with self.assertRaises(DgtException):
+            self.client.execute_kw("res.partner", "write", [[1], {"name": "A"}])
+        self.assertEqual(self.models.execute_kw.call_count, 1)
+
+    def test_circuit_open(self):
+        """Test that an open circuit surfaces as a DgtException."""
+        self.client.circuit_breaker = CircuitBreaker(failure_threshold=1)
+        self.client.retry_policy = RetryPolicy(max_retries=0)
+        self.models.execute_kw.side_effect = ConnectionRefusedError()
+        with self.assertRaises(DgtException):
+            self.client.execute_kw("res.partner", "read", [[1]])
+        with self.assertRaises(CircuitOpenError):
+            self.client.execute_kw("res.partner", "read", [[1]])
+        self.assertEqual(self.models.execute_kw.call_count, 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
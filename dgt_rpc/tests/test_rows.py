@@ -0,0 +1,116 @@
+import sys
+import unittest
+
+from dgt_rpc import DgtClient
+from dgt_rpc.rows import row_class, to_rows
+from dgt_rpc.tests.server import LocalServer
+
+RECORDS = [
+    {"id": 1, "name": "Order 1", "amount_total": 10.5, "config_id": [3, "POS 3"], "class": "a", "x-y": 1},
+    {"id": 2, "name": "Order 2", "amount_total": 20.0, "config_id": False, "class": "b", "x-y": 2},
+]
+
+
+class TestRows(unittest.TestCase):
+    """Test cases for the compact row types."""
+
+    def check_access(self, row_type):
+        rows = to_rows("pos.order", [dict(r) for r in RECORDS], row_type)
+        row = rows[0]
+        self.assertEqual(row.name, "Order 1")
+        self.assertEqual(row[0], 1)
+        self.assertEqual(row["config_id"], [3, "POS 3"])
+        self.assertEqual(row["class"], "a")
+        self.assertEqual(row["x-y"], 1)
+        self.assertEqual(row.get("missing", 0), 0)
+        self.assertIn("amount_total", row)
+        self.assertEqual(list(row.keys()), list(RECORDS[0]))
+        self.assertEqual(row._asdict(), RECORDS[0])
+        self.assertEqual([r._asdict() for r in rows], RECORDS)
+        self.assertIs(type(rows[1]), type(row))
+        self.assertEqual(row[-1], 1)
+        self.assertEqual(list(row), list(RECORDS[0].values()))
+        self.assertIsNone(row.get(0))
+        with self.assertRaises(KeyError):
+            row["missing"]
+        with self.assertRaises(IndexError):
+            row[len(RECORDS[0])]
+        with self.assertRaises(TypeError):
+            row[[0]]
+        return row
+
+    def test_slots(self):
+        """Test attribute, index and key access of __slots__ rows."""
+        row = self.check_access("slots")
+        self.assertFalse(hasattr(row, "__dict__"))
+        self.assertEqual(row[1:3], ("Order 1", 10.5))
+        self.assertEqual(type(row).__name__, "PosOrderRow")
+
+    def test_tuple(self):
+        """Test attribute, index and key access of named tuple rows."""
+        row = self.check_access("tuple")
+        self.assertIsInstance(row, tuple)
+        self.assertEqual(row[1:3], ("Order 1", 10.5))
+
+    def test_shared_schema(self):
+        """Test that one class is generated per model, fields and row type."""
+        names = ("id", "name")
+        self.assertIs(row_class("res.partner", names), row_class("res.partner", list(names)))
+        self.assertIsNot(row_class("res.partner", names), row_class("res.partner", names, "tuple"))
+        self.assertIsNot(row_class("res.partner", names), row_class("res.users", names))
+
+    def test_smaller_than_dict(self):
+        """Test that rows take less memory than dictionaries."""
+        record = RECORDS[0]
+        for row_type in ("slots", "tuple"):
+            row = to_rows("pos.order", [record], row_type)[0]
+            self.assertLess(sys.getsizeof(row), sys.getsizeof(record))
+
+    def test_uneven_records(self):
+        """Test that records missing fields of the first one get None."""
+        rows = to_rows("res.partner", [{"id": 1, "name": "a"}, {"id": 2}], "slots")
+        self.assertIsNone(rows[1].name)
+
+    def test_unchanged(self):
+        """Test that dict output and unknown row types are handled."""
+        records = [dict(RECORDS[0])]
+        self.assertIs(to_rows("pos.order", records, None), records)
+        self.assertEqual(to_rows("pos.order", [], "tuple"), [])
+        with self.assertRaises(ValueError):
+            to_rows("pos.order", records, "frozen")
+        rows = to_rows("pos.order", records, "slots")
+        self.assertIsInstance(records[0], dict)
+        self.assertEqual(rows[0], to_rows("pos.order", [dict(RECORDS[0])], "slots")[0])
+
+
+class TestClientRows(unittest.TestCase):
+    """Test cases for the row_type option of the client."""
+
+    def setUp(self):
+        """Start a local server returning records."""
+        def handler(model, method, args, kwargs):
+            domain = args[0] if method == "search_read" else []
+            start = domain[-1][2] if domain else 0
+            return [{"id": i, "name": f"Partner {i}"} for i in range(start + 1, min(start + 3, 6) + 1)]
+        self.server = LocalServer(handler).start(self)
+        self.client = DgtClient(self.server.url, "test_db", api_key="key")
+        self.addCleanup(self.client.close)
+
+    def test_search_read_and_read(self):
+        """Test that search_read and read return rows when asked to."""
+        rows = self.client.search_read("res.partner", [], fields=["name"], row_type="tuple")
+        self.assertEqual([row.name for row in rows], ["Partner 1", "Partner 2", "Partner 3"])
+        rows = self.client.read("res.partner", [1, 2, 3], fields=["name"], row_type="slots")
+        self.assertEqual(rows[2].name, "Partner 3")
+        self.assertIsInstance(self.client.read("res.partner", [1])[0], dict)
+
+    def test_iter_search_read(self):
+        """Test that keyset paging works on rows."""
+        rows = list(self.client.iter_search_read("res.partner", [], page_size=3, row_type="slots"))
+        self.assertEqual(rows[0].name, "Partner 1")
+        self.assertEqual(len(rows), 6)
+        self.assertEqual(self.server.calls[-1][3][0][-1], ["id", ">", 6])
+
+
+if __name__ == "__main__":
+    unittest.main()
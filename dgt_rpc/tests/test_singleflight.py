@@ -0,0 +1,91 @@
+import threading
+import time
+import unittest
+from concurrent.futures import ThreadPoolExecutor
+from unittest.mock import patch, MagicMock
+
+from dgt_rpc import DgtClient, DgtException, SingleFlight
+
+
+class TestSingleFlight(unittest.TestCase):
+    """Test cases for the SingleFlight class."""
+
+    def setUp(self):
+        """Set up a client whose server calls block until released."""
+        self.single_flight = SingleFlight()
+        self.client = DgtClient("https://example.com", "test_db", api_key="key",
+                                single_flight=self.single_flight)
+        self.client.uid = 1
+        self.release = threading.Event()
+        self.models = MagicMock()
+        patcher = patch.object(self.client, "_get_models_connection", return_value=self.models)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def blocking(self, result=None, error=None):
+        """Make server calls wait for self.release, then return result or raise error."""
+        def execute_kw(*args):
+            self.release.wait(5)
+            if error is not None:
+                raise error
+            return [{"id": 1, "name": "POS 1"}] if result is None else result
+        self.models.execute_kw.side_effect = execute_kw
+
+    def run_concurrently(self, calls):
+        """Run calls in threads, releasing the server once the followers are waiting."""
+        with ThreadPoolExecutor(len(calls)) as executor:
+            futures = [executor.submit(call) for call in calls]
+            deadline = time.monotonic() + 5
+            while self.single_flight.shared < len(calls) - 1 and time.monotonic() < deadline:
+                time.sleep(0.001)
+            self.release.set()
+            return [future.exception() or future.result() for future in futures]
+
+    def test_identical_calls_share_one_request(self):
+        """Test that concurrent identical reads send a single request."""
+        self.blocking()
+        results = self.run_concurrently(
+            [lambda: self.client.execute_kw("pos.config", "get_pos_data", ["retail_db", False])] * 8
+        )
+        self.assertEqual(self.models.execute_kw.call_count, 1)
+        self.assertEqual(results, [[{"id": 1, "name": "POS 1"}]] * 8)
+        self.assertEqual(self.single_flight.stats(), {"calls": 1, "shared": 7})
+        self.assertEqual(self.single_flight.in_flight(), 0)
+
+        results[1][0]["name"] = "changed"
+        self.assertEqual(results[2][0]["name"], "POS 1")
+
+    def test_error_shared(self):
+        """Test that every caller receives the error of the shared request."""
+        self.blocking(error=ConnectionResetError("reset"))
+        self.client.retry_policy.max_retries = 0
+        results = self.run_concurrently(
+            [lambda: self.client.execute_kw("res.partner", "search", [[]])] * 4
+        )
+        self.assertEqual(self.models.execute_kw.call_count, 1)
+        self.assertTrue(all(isinstance(result, DgtException) for result in results))
+
+    def test_different_calls_not_shared(self):
+        """Test that calls with different arguments are all sent."""
+        self.release.set()
+        self.blocking()
+        self.client.execute_kw("res.partner", "search", [[]])
+        self.client.execute_kw("res.partner", "search", [[]], {"limit": 1})
+        self.client.execute_kw("res.partner", "search", [[]])
+        self.assertEqual(self.models.execute_kw.call_count, 3)
+        self.assertEqual(self.single_flight.stats(), {"calls": 3, "shared": 0})
+
+    def test_writes_not_shared(self):
+        """Test that writes are never coalesced."""
+        self.blocking(result=True)
+        calls = [lambda: self.client.execute_kw("res.partner", "write", [[1], {"name": "A"}])] * 3
+        with ThreadPoolExecutor(3) as executor:
+            futures = [executor.submit(call) for call in calls]
+            self.release.set()
+            self.assertEqual([future.result() for future in futures], [True] * 3)
+        self.assertEqual(self.models.execute_kw.call_count, 3)
+        self.assertEqual(self.single_flight.stats(), {"calls": 0, "shared": 0})
+
+
+if __name__ == "__main__":
+    unittest.main()
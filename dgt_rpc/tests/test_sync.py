@@ -0,0 +1,186 @@
+import os
+import tempfile
+import unittest
+
+from dgt_rpc import DgtClient, IncrementalSync, MemoryCheckpointStore, FileCheckpointStore
+from dgt_rpc.sync import to_ranges, from_ranges
+from dgt_rpc.tests.server import LocalServer
+
+OPERATORS = {
+    "=": lambda a, b: a == b,
+    ">": lambda a, b: a > b,
+    ">=": lambda a, b: a >= b,
+}
+
+
+def domain_arg(args):
+    """
+    The domain of Odoo's execute_kw arguments ``[domain]``.
+
+    Fails like Odoo would on any other nesting, such as ``[[domain]]``.
+    """
+    domain = args[0]
+    for item in domain:
+        if item in ("|", "&", "!"):
+            continue
+        if not (isinstance(item, list) and len(item) == 3 and isinstance(item[0], str)):
+            raise ValueError(f"Invalid domain term {item!r}")
+    return domain
+
+
+def ids_arg(args):
+    """The IDs of Odoo's execute_kw arguments ``[ids]``, failing on any other nesting."""
+    ids = args[0]
+    if not isinstance(ids, list) or not all(isinstance(i, int) for i in ids):
+        raise ValueError(f"Invalid IDs {ids!r}")
+    return ids
+
+
+def matches(record, domain):
+    """Evaluate a domain in Polish notation with an implicit '&' between terms."""
+    def evaluate(position):
+        term = domain[position]
+        if term in ("|", "&"):
+            left, position = evaluate(position + 1)
+            right, position = evaluate(position)
+            return (left or right) if term == "|" else (left and right), position
+        field, operator, value = term
+        return OPERATORS[operator](record[field], value), position + 1
+
+    position = 0
+    while position < len(domain):
+        result, position = evaluate(position)
+        if not result:
+            return False
+    return True
+
+
+class FakeModel:
+    """An in-memory model answering the calls IncrementalSync makes."""
+
+    def __init__(self):
+        self.records = {}
+        self.calls = []
+
+    def write(self, record_id, write_date, name="x"):
+        self.records[record_id] = {"id": record_id, "name": name, "write_date": write_date}
+
+    def handle(self, model, method, args, kwargs):
+        self.calls.append(method)
+        if method == "read":
+            return [self.records[i] for i in ids_arg(args) if i in self.records]
+        records = [r for r in self.records.values() if matches(r, domain_arg(args))]
+        if method == "search_count":
+            return len(records)
+        if method == "search":
+            return sorted(r["id"] for r in records)[:kwargs.get("limit")]
+        records.sort(key=lambda r: (r["write_date"], r["id"]))
+        return records[:kwargs.get("limit")]
+
+
+class TestIncrementalSync(unittest.TestCase):
+    """Test cases for IncrementalSync."""
+
+    def setUp(self):
+        """Start a local server over a fake model."""
+        self.model = FakeModel()
+        for i in range(1, 6):
+            self.model.write(i, f"2024-03-01 10:00:0{i}")
+        self.server = LocalServer(self.model.handle).start(self)
+        self.client = DgtClient(self.server.url, "test_db", api_key="key")
+        self.addCleanup(self.client.close)
+        self.store = MemoryCheckpointStore()
+
+    def make_sync(self, **kwargs):
+        return IncrementalSync(self.client, self.store, page_size=2, **kwargs)
+
+    def test_initial_and_incremental(self):
+        """Test that only records written since the checkpoint are fetched."""
+        sync = self.make_sync()
+        batches = list(sync.changes("pos.order"))
+        self.assertEqual([[r["id"] for r in b.records] for b in batches], [[1, 2], [3, 4], [5]])
+        self.assertEqual(self.store.get("test_db/pos.order"),
+                         {"write_date": "2024-03-01 10:00:05", "id": 5, "ids": [[1, 5]]})
+
+        self.model.write(2, "2024-03-01 11:00:00", name="changed")
+        self.model.write(6, "2024-03-01 11:00:00")
+        self.model.calls.clear()
+        result = sync.sync("pos.order")
+        self.assertEqual([(r["id"], r["name"]) for r in result.records], [(2, "changed"), (6, "x")])
+        self.assertEqual(result.deleted, [])
+        self.assertNotIn("search", self.model.calls)
+
+        self.assertEqual(sync.sync("pos.order").records, [])
+
+    def test_deletions(self):
+        """Test that deleted records are reported from an ID reconciliation."""
+        sync = self.make_sync()
+        sync.sync("pos.order")
+        del self.model.records[3]
+        self.model.write(7, "2024-03-01 12:00:00")
+        result = sync.sync("pos.order")
+        self.assertEqual([r["id"] for r in result.records], [7])
+        self.assertEqual(result.deleted, [3])
+        self.assertEqual(self.store.get("test_db/pos.order")["ids"], [[1, 2], [4, 5], [7, 7]])
+
+    def test_missed_records(self):
+        """Test that records committed with an old write_date are read from the reconciliation."""
+        sync = self.make_sync()
+        sync.sync("pos.order")
+        self.model.write(8, "2024-03-01 09:00:00")
+        self.assertEqual([r["id"] for r in sync.sync("pos.order").records], [8])
+
+    def test_resume(self):
+        """Test that an interrupted sync resumes after the last processed batch."""
+        sync = self.make_sync()
+        changes = sync.changes("pos.order")
+        next(changes)
+        next(changes)
+        changes.close()
+        self.assertTrue(self.store.get("test_db/pos.order")["partial"])
+
+        result = self.make_sync().sync("pos.order")
+        # Records delivered before the interruption come again, to be applied as upserts
+        self.assertEqual([r["id"] for r in result.records], [3, 4, 5, 1, 2])
+        self.assertEqual(self.store.get("test_db/pos.order"),
+                         {"write_date": "2024-03-01 10:00:05", "id": 5, "ids": [[1, 5]]})
+
+    def test_resume_reads_missed_records(self):
+        """Test that a resumed sync delivers records committed behind the watermark."""
+        sync = self.make_sync()
+        changes = sync.changes("pos.order")
+        next(changes)
+        next(changes)
+        changes.close()
+        self.model.write(8, "2024-03-01 09:00:00")
+
+        result = self.make_sync().sync("pos.order")
+        self.assertIn(8, [r["id"] for r in result.records])
+        self.assertEqual(self.store.get("test_db/pos.order")["ids"], [[1, 5], [8, 8]])
+        self.assertEqual(self.make_sync().sync("pos.order").records, [])
+
+    def test_overlap(self):
+        """Test that the overlap delivers recently written records again."""
+        sync = self.make_sync(overlap=2)
+        sync.sync("pos.order")
+        self.assertEqual([r["id"] for r in sync.sync("pos.order").records], [3, 4, 5])
+
+    def test_file_store(self):
+        """Test that checkpoints survive in a file."""
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        path = os.path.join(directory.name, "checkpoints.json")
+        IncrementalSync(self.client, FileCheckpointStore(path)).sync("pos.order", name="all")
+        store = FileCheckpointStore(path)
+        self.assertEqual(store.get("test_db/pos.order/all")["id"], 5)
+        self.assertEqual(IncrementalSync(self.client, store).sync("pos.order", name="all").records, [])
+
+    def test_ranges(self):
+        """Test the compact encoding of ID sets."""
+        self.assertEqual(to_ranges([5, 1, 2, 3, 9, 10]), [[1, 3], [5, 5], [9, 10]])
+        self.assertEqual(from_ranges([[1, 3], [5, 5]]), {1, 2, 3, 5})
+        self.assertEqual(to_ranges([]), [])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,62 @@
+import unittest
+
+from dgt_rpc import DgtClient, DgtException
+from dgt_rpc.transport import JsonRpcTransport, XmlRpcTransport
+from dgt_rpc.tests.server import LocalServer
+
+
+class TestTransports(unittest.TestCase):
+    """Test cases for the pluggable XML-RPC and JSON-RPC transports."""
+
+    def setUp(self):
+        """Start a local server answering on both protocols."""
+        self.server = LocalServer(
+            handler=lambda model, method, args, kwargs: [{"id": 1, "model": model, "limit": kwargs.get("limit")}]
+        ).start(self)
+
+    def test_default_protocol_is_xmlrpc(self):
+        """Test that clients use XML-RPC unless told otherwise."""
+        client = DgtClient(self.server.url, db="test_db", api_key="key")
+        self.assertIsInstance(client.transport, XmlRpcTransport)
+
+    def test_protocols_return_same_results(self):
+        """Test that both protocols send the same call and decode the same result."""
+        results = []
+        for protocol in ("xmlrpc", "jsonrpc"):
+            client = DgtClient(self.server.url, db="test_db", api_key="key", protocol=protocol)
+            results.append(client.search_read("res.partner", [("id", ">", 0)], fields=["name"]))
+
+        self.assertEqual(results[0], results[1])
+        self.assertEqual(results[1], [{"id": 1, "model": "res.partner", "limit": None}])
+        self.assertEqual(self.server.calls[0], self.server.calls[1])
+
+    def test_jsonrpc_reuses_connections(self):
+        """Test that the JSON-RPC transport uses the keep-alive pool."""
+        client = DgtClient(self.server.url, db="test_db", api_key="key", protocol="jsonrpc")
+        self.assertIsInstance(client.transport, JsonRpcTransport)
+        for _ in range(5):
+            client.execute_kw("res.partner", "search", [[]])
+
+        self.assertEqual(self.server.connections, 1)
+        self.assertEqual(client.uid, 7)
+
+    def test_jsonrpc_error(self):
+        """Test that JSON-RPC errors are raised as DgtException."""
+        def handler(model, method, args, kwargs):
+            raise ValueError("Invalid field 'foo'")
+        self.server.handler = handler
+        client = DgtClient(self.server.url, db="test_db", api_key="key", protocol="jsonrpc")
+
+        with self.assertRaises(DgtException) as context:
+            client.execute_kw("res.partner", "read", [[1]])
+
+        self.assertEqual(str(context.exception), "Odoo Server Error: Invalid field 'foo'")
+
+    def test_unknown_protocol(self):
+        """Test that an unknown protocol name is rejected."""
+        with self.assertRaises(ValueError):
+            DgtClient(self.server.url, protocol="soap")
+
+
+if __name__ == '__main__':
+    unittest.main()